@@ -5,11 +5,20 @@ from pydantic import BaseModel
 from datetime import datetime
 import shutil, os, json, re
 import subprocess
+import uuid
 
-from run_pipeline import process_single_pdf
+from run_pipeline import warm_models
+from jobs import JobManager
+from utils.result_cache import get_result_cache
+from layer3_llm.llm_cache import get_llm_cache
+from layer3_llm.llm_client import get_llm_client
+from category_classification import index_registry_stats
 
 app = FastAPI()
 
+# Background pipeline worker processes (see jobs.py)
+job_manager = JobManager()
+
 
 # Models
 class MetaPayload(BaseModel):
@@ -25,6 +34,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Warm shared models once per process
+@app.on_event("startup")
+def warm_shared_models():
+    try:
+        warm_models()
+    except Exception:
+        # Models are loaded lazily on first upload instead
+        traceback.print_exc()
+
+    # Pipeline worker processes warm their own copies
+    job_manager.start()
+
+@app.on_event("shutdown")
+def stop_workers():
+    job_manager.shutdown()
+
 # Root 
 @app.get("/")
 def root():
@@ -33,23 +58,62 @@ def root():
         "service": "Keyword Extraction & Automation API"
     }
 
+# Category index stats (build time / memory)
+@app.get("/category-index")
+def category_index_stats():
+    return {"indexes": index_registry_stats()}
+
 
-# Upload PDF
-@app.post("/upload")
-async def upload(file: UploadFile = File(...)):
+# LLM client health (circuit breaker state, retries, failures)
+@app.get("/llm/status")
+def llm_status():
+    return get_llm_client().status()
+
+# Cache stats (hits / misses / size)
+@app.get("/cache")
+def cache_stats():
+    return {
+        "results": get_result_cache().stats(),
+        "llm": get_llm_cache().stats(),
+    }
+
+
+# Upload PDF (queued; poll /jobs/{job_id} for the result)
+# Sync handler: FastAPI runs it in the threadpool, so the file copy
+# doesn't block the event loop
+@app.post("/upload", status_code=202)
+def upload(file: UploadFile = File(...)):
+    # One folder per upload so concurrent files with the same name don't
+    # clash; the job removes it once the pipeline is done
+    upload_dir = os.path.join("temp", uuid.uuid4().hex)
     try:
-        os.makedirs("temp", exist_ok=True)
-        path = f"temp/{file.filename}"
+        os.makedirs(upload_dir, exist_ok=True)
+        path = os.path.join(upload_dir, os.path.basename(file.filename))
 
         with open(path, "wb") as f:
             shutil.copyfileobj(file.file, f)
 
-        return process_single_pdf(path)
+        job_id = job_manager.submit(path, filename=file.filename, cleanup_dir=upload_dir)
+        return {"job_id": job_id, "status": "QUEUED"}
 
     except Exception as e:
         traceback.print_exc()
+        shutil.rmtree(upload_dir, ignore_errors=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+# Job status / result
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return job
+
+# Worker pool overview
+@app.get("/jobs")
+def job_stats():
+    return job_manager.stats()
+
 # Save Draft
 @app.post("/draft")
 def save_draft(payload: MetaPayload):
@@ -0,0 +1,123 @@
+"""
+Layer 1 per-field microbenchmark.
+
+Times each extractor on raw text (every call preprocesses the text itself)
+and on one shared BrochureText (what extract_metadata does).
+
+Run from backend/:
+    python -m benchmarks.bench_layer1                    # synthetic brochures
+    python -m benchmarks.bench_layer1 brochures/*.pdf    # real PDFs (text layer)
+    python -m benchmarks.bench_layer1 --repeat 50 notes.txt
+"""
+import sys
+import time
+import random
+import argparse
+
+from layer1_text.brochure_text import BrochureText
+from layer1_text.metadata_extraction import (
+    extract_metadata,
+    extract_program_title,
+    extract_program_date,
+    extract_venue,
+    extract_cost,
+    extract_trainer,
+    extract_organiser,
+    detect_hrdc,
+)
+
+FIELDS = [
+    ("title", extract_program_title),
+    ("date", extract_program_date),
+    ("venue", extract_venue),
+    ("cost", extract_cost),
+    ("trainer", extract_trainer),
+    ("organiser", extract_organiser),
+    ("hrdc", detect_hrdc),
+]
+
+FILLER = (
+    "participants will learn practical tools for planning execution and review "
+    "of projects with case studies group work and reflection sessions"
+).split()
+
+SNIPPETS = [
+    "Course Title: Strategic Leadership for Managers",
+    "Monday, 21ST July 2025", "Tuesday, 22ND July 2025",
+    "Venue", "Sunway Resort Hotel, Petaling Jaya",
+    "Early bird fee RM 1,800 per pax", "Normal fee RM 2,200 per pax",
+    "TRAINER PROFILE", "Aisyah Rahman", "She has 20 years of experience",
+    "About Us", "Mindzallera Sdn Bhd, with the support of HRD Corp",
+    "Level 12, Menara Example", "Jalan Ampang, Kuala Lumpur",
+    "HRD Corp claimable",
+]
+
+
+def synthetic_texts(n, seed=3):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        lines = [" ".join(rng.choice(FILLER) for _ in range(rng.randint(3, 12))) for _ in range(400)]
+        for s in SNIPPETS:
+            lines.insert(rng.randint(0, len(lines)), s)
+        texts.append("\n".join(lines))
+    return texts
+
+
+def load_texts(paths):
+    texts = []
+    for path in paths:
+        if path.lower().endswith(".pdf"):
+            from utils.text_extraction import extract_text_with_fallback
+            text, _ = extract_text_with_fallback(path)
+        else:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                text = f.read()
+        texts.append(text)
+    return texts
+
+
+def time_per_call(fn, args_list, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for a in args_list:
+            fn(a)
+    return (time.perf_counter() - start) / (repeat * len(args_list))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="PDF or text files (default: synthetic brochures)")
+    parser.add_argument("--docs", type=int, default=20, help="synthetic brochures when no paths are given")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    texts = load_texts(args.paths) if args.paths else synthetic_texts(args.docs)
+    avg_chars = sum(len(t) for t in texts) // max(1, len(texts))
+    print(f"[Bench] {len(texts)} documents, avg {avg_chars} chars, repeat={args.repeat}")
+
+    prep = time_per_call(BrochureText, texts, args.repeat)
+    print(f"{'preprocess':<12} {prep * 1e6:10.1f} us")
+
+    print(f"{'field':<12} {'raw text':>12} {'shared':>12}")
+    for name, fn in FIELDS:
+        raw = time_per_call(fn, texts, args.repeat)
+
+        # A fresh BrochureText per round so memoised results don't skew timings
+        shared = 0.0
+        for _ in range(args.repeat):
+            docs = [BrochureText(t) for t in texts]
+            start = time.perf_counter()
+            for d in docs:
+                fn(d)
+            shared += time.perf_counter() - start
+        shared /= args.repeat * len(texts)
+
+        print(f"{name:<12} {raw * 1e6:10.1f}us {shared * 1e6:10.1f}us")
+
+    total = time_per_call(extract_metadata, texts, args.repeat)
+    print(f"{'metadata':<12} {total * 1e6:10.1f}us  (extract_metadata, preprocessing included)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+Layer 3 throughput benchmark against the fake LLM backend (no API key).
+
+Run from backend/:
+    python -m benchmarks.bench_layer3 --requests 200 --concurrency 1,4,8 --latency-ms 400
+    python -m benchmarks.bench_layer3 --pack-size 5            # packed batch mode
+    python -m benchmarks.bench_layer3 --pdf-dir brochures      # end-to-end process_single_pdf
+    python -m benchmarks.bench_layer3 --replay cache/recorded.jsonl
+
+Record real responses for replay with LLM_RECORD_PATH=<file> LLM_BACKEND=gemini.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+# Must be set before Layer 3 modules read their config
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ["LLM_CACHE"] = "0"
+os.environ["RESULT_CACHE"] = "0"
+
+from layer3_llm import llm_client
+from layer3_llm.backends import FakeBackend, create_backend
+from layer3_llm.llm_client import LLMClient, CircuitBreaker, set_llm_client
+from layer3_llm.gemini_fallback import (
+    gemini_fallback,
+    gemini_fallback_batch,
+    CONFIDENCE_KEYS,
+    GEMINI_SKIPPED_FLAG,
+    GEMINI_ERROR_FLAG,
+)
+
+WORDS = (
+    "leadership strategic workshop programme participants module safety "
+    "project management agile finance excel analytics communication team "
+    "hotel kuala lumpur venue trainer fee rm organised by sdn bhd certified"
+).split()
+
+
+# ======================================================
+# WORKLOAD
+# ======================================================
+
+def synthetic_items(n, seed=7):
+    """
+    n (meta, text) pairs with 1-6 low-confidence fields and ~6k chars of text.
+    """
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        meta = {"Flags": ""}
+        for key in CONFIDENCE_KEYS:
+            meta[key] = "High"
+        for key in rng.sample(CONFIDENCE_KEYS, rng.randint(1, len(CONFIDENCE_KEYS))):
+            meta[key] = rng.choice(["Low", "Medium"])
+
+        lines = [f"Brochure {i} {rng.choice(WORDS).title()} Course"]
+        for _ in range(120):
+            lines.append(" ".join(rng.choice(WORDS) for _ in range(8)))
+        lines.insert(rng.randint(1, 100), f"Venue: Grand Hotel {i}")
+        lines.insert(rng.randint(1, 100), f"Fee: RM {rng.randint(5, 40)}00 per pax")
+        lines.insert(rng.randint(1, 100), f"Date: {rng.randint(1, 28)} July 2026")
+        items.append((meta, "\n".join(lines)))
+    return items
+
+
+def install_client(args):
+    """
+    Fresh client per run so breaker state and counters don't carry over.
+    """
+    if os.environ["LLM_BACKEND"] == "fake":
+        backend = FakeBackend(
+            replay_path=args.replay,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            seed=args.seed,
+        )
+    else:
+        backend = create_backend()
+
+    breaker = CircuitBreaker(failure_threshold=args.breaker_failures)
+    return set_llm_client(
+        LLMClient(timeout=args.timeout, max_retries=args.retries, breaker=breaker, backend=backend)
+    )
+
+
+# ======================================================
+# RUNS
+# ======================================================
+
+def run_layer3(args, concurrency):
+    client = install_client(args)
+    items = synthetic_items(args.requests, args.seed)
+
+    if args.pack_size > 0:
+        # Packed batch mode: one chunk of pack_size brochures per worker task
+        chunks = [items[i:i + args.pack_size] for i in range(0, len(items), args.pack_size)]
+
+        def task(chunk):
+            start = time.perf_counter()
+            gemini_fallback_batch(chunk, pack_size=args.pack_size)
+            return time.perf_counter() - start
+        work = chunks
+    else:
+        def task(item):
+            start = time.perf_counter()
+            gemini_fallback(*item)
+            return time.perf_counter() - start
+        work = items
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(task, work))
+    wall = time.perf_counter() - start
+
+    metas = [meta for meta, _ in items]
+    report(concurrency, len(items), wall, latencies, client, metas)
+
+
+def run_end_to_end(args, concurrency):
+    from run_pipeline import process_single_pdf, warm_models
+
+    pdfs = [
+        os.path.join(args.pdf_dir, f)
+        for f in sorted(os.listdir(args.pdf_dir))
+        if f.lower().endswith(".pdf")
+    ]
+    if not pdfs:
+        print(f"No PDFs in {args.pdf_dir}")
+        return
+
+    client = install_client(args)
+    warm_models()
+
+    stage_times = {}
+
+    def task(path):
+        timings = {}
+        process_single_pdf(path, timings=timings, use_cache=False)
+        for k, v in timings.items():
+            stage_times.setdefault(k, []).append(v)
+        return timings.get("total", 0.0)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(task, pdfs))
+    wall = time.perf_counter() - start
+
+    report(concurrency, len(pdfs), wall, latencies, client)
+    for k in sorted(stage_times):
+        print(f"    {k:<10} mean {statistics.mean(stage_times[k]):.3f}s")
+
+
+def report(concurrency, n, wall, latencies, client, metas=None):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    status = client.status()
+
+    line = (
+        f"concurrency={concurrency:<3} docs={n:<5} wall={wall:7.2f}s "
+        f"throughput={n / wall:7.2f} docs/s  task p50={p50:.3f}s p95={p95:.3f}s  "
+        f"llm_calls={status['calls']} retries={status['retries']} "
+        f"short_circuited={status['short_circuited']} breaker={status['breaker']['state']}"
+    )
+    if metas is not None:
+        skipped = sum(GEMINI_SKIPPED_FLAG in m["Flags"] for m in metas)
+        errors = sum(GEMINI_ERROR_FLAG in m["Flags"] for m in metas)
+        line += f" skipped={skipped} errors={errors}"
+    print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="synthetic brochures for the Layer 3 run")
+    parser.add_argument("--concurrency", default="1,4,8", help="comma-separated worker counts")
+    parser.add_argument("--pack-size", type=int, default=0, help="brochures per packed request (0 = one request each)")
+    parser.add_argument("--pdf-dir", default="", help="run process_single_pdf over these PDFs instead")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--replay", default="", help="JSONL recorded with LLM_RECORD_PATH")
+    parser.add_argument("--timeout", type=float, default=llm_client.LLM_TIMEOUT_SECONDS)
+    parser.add_argument("--retries", type=int, default=llm_client.LLM_MAX_RETRIES)
+    parser.add_argument("--breaker-failures", type=int, default=llm_client.BREAKER_FAILURE_THRESHOLD)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    print(f"[Bench] backend={os.environ['LLM_BACKEND']} latency={args.latency_ms}ms "
+          f"jitter={args.jitter_ms}ms error_rate={args.error_rate} pack_size={args.pack_size}")
+
+    for concurrency in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+        if args.pdf_dir:
+            run_end_to_end(args, concurrency)
+        else:
+            run_layer3(args, concurrency)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,10 @@
 # category_classification/__init__.py
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
 from .category_loader import load_categories_from_docx
 from .brochure_representation import build_weighted_brochure_text
-from .category_index import CategoryIndex
+from .category_index import CategoryIndex, DEFAULT_MODEL_NAME
+from .index_registry import get_category_index, index_registry_stats, clear_index_registry
 from .threshold import compute_confidence
 
 def classify_brochure_category(
@@ -13,6 +14,7 @@ def classify_brochure_category(
     top_k: int = 5,
     use_gemini: bool = False,
     gemini_callable=None,  # function(brochure_summary, candidates) -> dict
+    model_name: str = DEFAULT_MODEL_NAME,
 ) -> Tuple[str, str]:
     """
     Classifies a brochure. 
@@ -20,9 +22,8 @@ def classify_brochure_category(
     2. Computes a confidence score.
     3. If confidence is Low/Medium and use_gemini is True, falls back to Gemini for reranking.
     """
-    # 1. Load data and build index
-    categories = load_categories_from_docx(docx_path)
-    index = CategoryIndex(categories)
+    # 1. Get the warm, process-wide index (built once per catalog + model)
+    index = get_category_index(docx_path, model_name)
 
     # 2. Pre-process text (Applying the 3x title boost and 2x agenda boost)
     weighted_text = build_weighted_brochure_text(meta, brochure_text)
@@ -30,6 +31,42 @@ def classify_brochure_category(
     # 3. Retrieve candidates using Hybrid Search
     cands = index.retrieve_topk(weighted_text, k=top_k)
 
+    return _decide_category(cands, weighted_text, use_gemini, gemini_callable)
+
+
+def classify_brochure_categories(
+    items: List[Tuple[Dict, str]],
+    docx_path: str,
+    top_k: int = 5,
+    batch_size: int = 64,
+    use_gemini: bool = False,
+    gemini_callable=None,
+    model_name: str = DEFAULT_MODEL_NAME,
+) -> List[Tuple[str, str]]:
+    """
+    Batch version of classify_brochure_category.
+    items: list of (meta, brochure_text) pairs.
+    Returns one (category, confidence) tuple per item, in input order.
+    Weighted texts are encoded and scored batch_size at a time.
+    """
+    if not items:
+        return []
+
+    index = get_category_index(docx_path, model_name)
+    weighted = [build_weighted_brochure_text(meta, text) for meta, text in items]
+
+    results = []
+    for start in range(0, len(weighted), batch_size):
+        chunk = weighted[start:start + batch_size]
+        cands_batch = index.retrieve_topk_batch(chunk, k=top_k, batch_size=batch_size)
+
+        for weighted_text, cands in zip(chunk, cands_batch):
+            results.append(_decide_category(cands, weighted_text, use_gemini, gemini_callable))
+
+    return results
+
+
+def _decide_category(cands: List[Dict], weighted_text: str, use_gemini: bool, gemini_callable) -> Tuple[str, str]:
     if not cands:
         return ("Uncategorized", "Low")
 
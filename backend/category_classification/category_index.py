@@ -9,6 +9,8 @@ from .category_loader import Category
 
 _TOKEN_RE = re.compile(r"[a-z0-9]+")
 
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+
 STOP = {
     "training", "program", "course", "workplace", "roles", "role", "employee", "staff",
     "learn", "learning", "session", "module", "participants", "skills", "skill", "basic",
@@ -21,14 +23,11 @@ def tokenize(text: str) -> List[str]:
     # CHANGE: Changed len(t) > 2 to len(t) >= 2 to allow "AI"
     return [t for t in toks if t not in STOP and len(t) >= 2]
 
-def cosine(a: np.ndarray, b: np.ndarray) -> float:
-    denom = (np.linalg.norm(a) * np.linalg.norm(b)) + 1e-9
-    return float(np.dot(a, b) / denom)
-
 
 class CategoryIndex:
-    def __init__(self, categories: List[Category], model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, categories: List[Category], model_name: str = DEFAULT_MODEL_NAME):
         self.categories = categories
+        self.model_name = model_name
         self.model = SentenceTransformer(model_name)
 
         # BM25 corpus
@@ -37,7 +36,31 @@ class CategoryIndex:
         self.bm25 = BM25Okapi(self.cat_tokens)
 
         # Embeddings
-        self.cat_vecs = self.model.encode(self.cat_blobs, normalize_embeddings=True)
+        self.cat_vecs = np.asarray(
+            self.model.encode(self.cat_blobs, normalize_embeddings=True),
+            dtype=np.float32
+        )
+
+    def memory_footprint(self) -> Dict[str, int]:
+        """
+        Approximate resident size in bytes of the index components.
+        """
+        model_bytes = 0
+        try:
+            model_bytes = sum(p.numel() * p.element_size() for p in self.model.parameters())
+        except Exception:
+            pass
+
+        vec_bytes = int(getattr(self.cat_vecs, "nbytes", 0))
+        blob_bytes = sum(len(b) for b in self.cat_blobs)
+        token_bytes = sum(len(t) for toks in self.cat_tokens for t in toks)
+
+        return {
+            "model_bytes": int(model_bytes),
+            "vectors_bytes": vec_bytes,
+            "corpus_bytes": blob_bytes + token_bytes,
+            "total_bytes": int(model_bytes) + vec_bytes + blob_bytes + token_bytes,
+        }
 
     def retrieve_topk(self, brochure_text: str, k: int = 5, bm25_pool: int = 40, sim_pool: int = 60) -> List[Dict]:
         """
@@ -46,40 +69,90 @@ class CategoryIndex:
           - embedding pool for semantic recall
           - union then rerank by mostly semantic score
         """
-        q_tokens = tokenize(brochure_text)
-        bm25_scores = np.array(self.bm25.get_scores(q_tokens), dtype=float)
-
-        # BM25 pool
-        bm25_idx = np.argsort(-bm25_scores)[:min(bm25_pool, len(self.categories))]
-
-        # Embedding pool
-        bro_vec = self.model.encode([brochure_text], normalize_embeddings=True)[0]
-        sims_all = np.array([cosine(bro_vec, v) for v in self.cat_vecs], dtype=float)
-        sim_idx = np.argsort(-sims_all)[:min(sim_pool, len(self.categories))]
-
-        # UNION pool
-        pool_idx = np.array(sorted(set(bm25_idx.tolist()) | set(sim_idx.tolist())), dtype=int)
+        return self.retrieve_topk_batch([brochure_text], k=k, bm25_pool=bm25_pool, sim_pool=sim_pool)[0]
+
+    def retrieve_topk_batch(
+        self,
+        texts: List[str],
+        k: int = 5,
+        bm25_pool: int = 40,
+        sim_pool: int = 60,
+        batch_size: int = 64,
+    ) -> List[List[Dict]]:
+        """
+        Same UNION pool retrieval as retrieve_topk, for N brochures at once.
+        Category vectors are already L2-normalised, so similarity for the
+        whole batch is a single (N x C) matrix product; pools and the final
+        top-k use partial selection instead of full sorts.
+        """
+        if not texts:
+            return []
+
+        n_cats = len(self.categories)
+        if n_cats == 0:
+            return [[] for _ in texts]
+
+        # BM25 scores (N x C)
+        bm25_scores = np.array(
+            [self.bm25.get_scores(tokenize(t)) for t in texts],
+            dtype=float
+        )
+
+        # Semantic scores (N x C)
+        bro_vecs = self.model.encode(
+            list(texts),
+            batch_size=batch_size,
+            normalize_embeddings=True
+        )
+        sims_all = (np.asarray(bro_vecs, dtype=np.float32) @ self.cat_vecs.T).astype(float)
+
+        # UNION pool as a boolean mask
+        pool = np.zeros((len(texts), n_cats), dtype=bool)
+        rows = np.arange(len(texts))[:, None]
+        pool[rows, _topk_unordered(bm25_scores, bm25_pool)] = True
+        pool[rows, _topk_unordered(sims_all, sim_pool)] = True
 
         # Normalize BM25 within pool
-        pool_bm25 = bm25_scores[pool_idx]
-        pool_bm25_norm = pool_bm25 / pool_bm25.max() if pool_bm25.max() > 0 else pool_bm25
-
-        pool_sims = sims_all[pool_idx]
+        pool_bm25_max = np.where(pool, bm25_scores, -np.inf).max(axis=1, keepdims=True)
+        scale = np.where(pool_bm25_max > 0, pool_bm25_max, 1.0)
+        bm25_norm = bm25_scores / scale
 
         # Mostly semantic
-        combo = 0.15 * pool_bm25_norm + 0.85 * pool_sims
+        combo = 0.15 * bm25_norm + 0.85 * sims_all
+        combo = np.where(pool, combo, -np.inf)
+
+        top = _topk_unordered(combo, k)
 
-        order = np.argsort(-combo)[:k]
         out = []
-        for j in order:
-            i = int(pool_idx[j])
-            c = self.categories[i]
-            out.append({
-                "domain": c.domain,
-                "category": c.name,
-                "score": float(combo[j]),
-                "sim": float(pool_sims[j]),
-                "bm25": float(pool_bm25_norm[j]),
-                "blob": c.blob
-            })
+        for r in range(len(texts)):
+            idx = top[r]
+            idx = idx[np.argsort(-combo[r, idx])]
+
+            cands = []
+            for i in idx:
+                if not np.isfinite(combo[r, i]):
+                    continue
+                c = self.categories[int(i)]
+                cands.append({
+                    "domain": c.domain,
+                    "category": c.name,
+                    "score": float(combo[r, i]),
+                    "sim": float(sims_all[r, i]),
+                    "bm25": float(bm25_norm[r, i]),
+                    "blob": c.blob
+                })
+            out.append(cands)
         return out
+
+
+def _topk_unordered(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Column indices of the k largest values per row (unordered), via argpartition.
+    """
+    n = scores.shape[1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.intp)
+    if k == n:
+        return np.broadcast_to(np.arange(n), scores.shape)
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
@@ -3,10 +3,9 @@ import json
 import re
 from typing import List, Dict, Optional
 
-import google.generativeai as genai
-
-genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+from layer3_llm.llm_client import get_llm_client
 MODEL_NAME = os.environ.get("GEMINI_MODEL", "gemini-flash-latest")
+GENERATION_CONFIG = {"temperature": 0, "top_p": 0.1}
 
 
 def _extract_json(text: str) -> Optional[dict]:
@@ -57,13 +56,10 @@ def choose_category_with_gemini(brochure_summary: str, candidates: List[Dict]) -
     allowed = {c["category"] for c in candidates}
     prompt = build_prompt(brochure_summary, candidates)
 
-    model = genai.GenerativeModel(MODEL_NAME)
-    resp = model.generate_content(
-        prompt,
-        generation_config={"temperature": 0, "top_p": 0.1}
+    text = get_llm_client().generate(
+        prompt, MODEL_NAME, GENERATION_CONFIG,
+        validate=lambda t: isinstance(_extract_json(t), dict)
     )
-
-    text = getattr(resp, "text", "") or ""
     data = _extract_json(text)
 
     if not isinstance(data, dict):
@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .category_loader import load_categories_from_docx
+from .category_index import CategoryIndex, DEFAULT_MODEL_NAME
+
+
+class _IndexEntry:
+    """
+    One registry slot. The per-entry lock makes sure two threads asking for
+    the same catalog at the same time only build the index once, and
+    guards the hit counter.
+    """
+
+    def __init__(self, docx_path: str, model_name: str):
+        self.docx_path = docx_path
+        self.model_name = model_name
+        self.lock = threading.Lock()
+        self.index: Optional[CategoryIndex] = None
+        self.build_seconds = 0.0
+        self.built_at = None
+        self.hits = 0
+
+    def get(self) -> CategoryIndex:
+        with self.lock:
+            if self.index is None:
+                print(f"[CategoryIndex] Building index for {os.path.basename(self.docx_path)} ({self.model_name})")
+                start = time.perf_counter()
+                categories = load_categories_from_docx(self.docx_path)
+                self.index = CategoryIndex(categories, model_name=self.model_name)
+                self.build_seconds = time.perf_counter() - start
+                self.built_at = time.time()
+                print(f"[CategoryIndex] Ready in {self.build_seconds:.2f}s")
+            else:
+                self.hits += 1
+            return self.index
+
+    def stats(self) -> Dict:
+        out = {
+            "docx_path": self.docx_path,
+            "model_name": self.model_name,
+            "built": self.index is not None,
+            "build_seconds": round(self.build_seconds, 3),
+            "built_at": self.built_at,
+            "hits": self.hits,
+        }
+        if self.index is not None:
+            out["categories"] = len(self.index.categories)
+            out["memory"] = self.index.memory_footprint()
+        return out
+
+
+_REGISTRY: Dict[Tuple[str, str], _IndexEntry] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def _key(docx_path: str, model_name: str) -> Tuple[str, str]:
+    return (os.path.abspath(docx_path), model_name)
+
+
+def get_category_index(docx_path: str, model_name: str = DEFAULT_MODEL_NAME) -> CategoryIndex:
+    """
+    Return the process-wide CategoryIndex for (catalog, model), building it
+    lazily on first use. Safe to call from several threads.
+    """
+    key = _key(docx_path, model_name)
+
+    with _REGISTRY_LOCK:
+        entry = _REGISTRY.get(key)
+        if entry is None:
+            entry = _IndexEntry(key[0], model_name)
+            _REGISTRY[key] = entry
+
+    return entry.get()
+
+
+def index_registry_stats() -> List[Dict]:
+    """
+    Build time, hit count and memory footprint of every registered index.
+    """
+    with _REGISTRY_LOCK:
+        entries = list(_REGISTRY.values())
+    return [e.stats() for e in entries]
+
+
+def clear_index_registry() -> None:
+    """
+    Drop all cached indexes (e.g. after the LMS catalog document changed).
+    """
+    with _REGISTRY_LOCK:
+        _REGISTRY.clear()
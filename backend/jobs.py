@@ -0,0 +1,232 @@
+import os
+import time
+import uuid
+import queue
+import shutil
+import threading
+import traceback
+from collections import OrderedDict
+
+from run_pipeline import process_single_pdf, warm_models
+from utils.worker_pool import WorkerPool
+
+
+# CONFIG
+# Pipeline worker processes. Processes, not threads: PyMuPDF (fitz) is not
+# thread-safe, so two documents must never be rendered in one process
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+
+# Start method for job workers. "spawn" because the API process is
+# multi-threaded when the pool starts, which fork does not handle safely
+JOB_START_METHOD = os.environ.get("JOB_START_METHOD", "spawn")
+
+# How often the dispatcher checks for new jobs / finished workers
+JOB_POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", 0.25))
+
+# Finished jobs kept for status polling (oldest dropped first)
+MAX_FINISHED_JOBS = int(os.environ.get("MAX_FINISHED_JOBS", 500))
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+
+
+def _run_pipeline_job(pdf_path):
+    """
+    Worker-side job: the payload plus the per-stage timings, which can't
+    be filled in the parent's dict across the process boundary.
+    """
+    timings = {}
+    result = process_single_pdf(pdf_path, timings=timings)
+    return result, timings
+
+
+class JobManager:
+    """
+    Runs process_single_pdf off the API event loop.
+
+    submit() returns a job id immediately; a dispatcher thread hands jobs
+    to a WorkerPool of JOB_WORKERS warm processes (at most one job per
+    worker, so a RUNNING job is one a worker holds) and get() reports
+    status, per-layer timings and the final payload. A job that times out
+    or takes its worker down is FAILED and the worker replaced.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, max_finished=MAX_FINISHED_JOBS,
+                 start_method=JOB_START_METHOD):
+        self.workers = max(1, int(workers))
+        self.max_finished = max_finished
+        self.start_method = start_method
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = queue.Queue()   # (job_id, pdf_path, cleanup_dir)
+        self._stopping = threading.Event()
+        self._drain = False
+        self._thread = None
+
+    def start(self):
+        """
+        Start the dispatcher and warm the workers (also done on first submit).
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch, name="pipeline-jobs", daemon=True)
+                self._thread.start()
+
+    def submit(self, pdf_path, filename=None, cleanup_dir=None):
+        """
+        cleanup_dir: directory (e.g. the upload's temp folder) removed once
+        the job has finished, whatever its outcome.
+        """
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": QUEUED,
+            "file": filename or os.path.basename(pdf_path),
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "timings": {},
+            "result": None,
+            "error": "",
+        }
+
+        with self._lock:
+            self._jobs[job_id] = job
+            self._prune()
+
+        self.start()
+        self._pending.put((job_id, pdf_path, cleanup_dir))
+        return job_id
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            out = dict(job)
+            out["timings"] = dict(job["timings"])
+
+        if out["status"] == QUEUED:
+            out["queue_position"] = self._queue_position(job_id)
+        return out
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"workers": self.workers, "jobs": counts}
+
+    def shutdown(self, wait=False):
+        """
+        Stop the dispatcher and its workers. Queued jobs are dropped;
+        running ones are killed unless wait=True.
+        """
+        self._drain = wait
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=None if wait else 10)
+
+        while True:
+            try:
+                _, _, cleanup_dir = self._pending.get_nowait()
+            except queue.Empty:
+                break
+            if cleanup_dir:
+                shutil.rmtree(cleanup_dir, ignore_errors=True)
+
+    # --------------------------------------------------
+    # Dispatcher
+    # --------------------------------------------------
+    def _new_pool(self):
+        return WorkerPool(_run_pipeline_job, self.workers, initializer=warm_models,
+                          start_method=self.start_method, keep_warm=True)
+
+    def _dispatch(self):
+        pool = self._new_pool()
+        in_flight = {}   # task id -> (job_id, cleanup_dir)
+
+        try:
+            while True:
+                if self._stopping.is_set():
+                    # shutdown(wait=True) lets running jobs finish
+                    if not (self._drain and in_flight):
+                        break
+                else:
+                    self._fill(pool, in_flight)
+
+                try:
+                    finished = pool.poll(timeout=JOB_POLL_SECONDS)
+                except Exception as e:
+                    # Workers could not start (e.g. model load failed):
+                    # fail what they held and try again with a fresh pool
+                    traceback.print_exc()
+                    for job_id, cleanup_dir in in_flight.values():
+                        self._finish(job_id, None, {}, FAILED, str(e), cleanup_dir)
+                    in_flight.clear()
+                    pool.close()
+                    self._stopping.wait(5)
+                    pool = self._new_pool()
+                    continue
+
+                for task_id, _, ok, value in finished:
+                    job_id, cleanup_dir = in_flight.pop(task_id)
+                    if ok:
+                        result, timings = value
+                        self._finish(job_id, result, timings, DONE, "", cleanup_dir)
+                    else:
+                        print(f"[Jobs] Job {job_id} failed: {value}")
+                        self._finish(job_id, None, {}, FAILED, str(value), cleanup_dir)
+        finally:
+            pool.close()
+            for job_id, cleanup_dir in in_flight.values():
+                self._finish(job_id, None, {}, FAILED, "Server shutting down", cleanup_dir)
+
+    def _fill(self, pool, in_flight):
+        # At most one job per worker: the rest stay QUEUED here
+        while len(in_flight) < pool.size:
+            try:
+                job_id, pdf_path, cleanup_dir = self._pending.get_nowait()
+            except queue.Empty:
+                return
+            if self._mark_running(job_id):
+                in_flight[pool.submit(pdf_path)] = (job_id, cleanup_dir)
+            elif cleanup_dir:
+                shutil.rmtree(cleanup_dir, ignore_errors=True)
+
+    def _mark_running(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            job["status"] = RUNNING
+            job["started_at"] = time.time()
+            return True
+
+    def _finish(self, job_id, result, timings, status, error, cleanup_dir=None):
+        if cleanup_dir:
+            shutil.rmtree(cleanup_dir, ignore_errors=True)
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["status"] = status
+            job["result"] = result
+            job["error"] = error
+            job["finished_at"] = time.time()
+            job["timings"].update(timings)
+            job["timings"]["queued"] = round(job["started_at"] - job["created_at"], 3)
+
+    def _queue_position(self, job_id):
+        with self._lock:
+            queued = [j for j, job in self._jobs.items() if job["status"] == QUEUED]
+        return queued.index(job_id) + 1 if job_id in queued else 0
+
+    def _prune(self):
+        finished = [j for j, job in self._jobs.items() if job["status"] in (DONE, FAILED)]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
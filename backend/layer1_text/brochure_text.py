@@ -0,0 +1,58 @@
+from layer1_text.patterns import WHITESPACE_RUN
+
+
+class BrochureText:
+    """
+    Brochure text preprocessed once for all Layer 1 extractors.
+
+        raw               original text
+        lines             stripped, non-empty lines
+        lower_lines       lines, lowercased
+        line_offsets      offset of each line's first character in raw
+        lower             raw, lowercased
+        normalized        raw with whitespace runs collapsed to one space
+        normalized_lower  normalized, lowercased
+
+    results memoises per-document values shared between extractors
+    (e.g. the program title the organiser rules exclude).
+    """
+
+    __slots__ = (
+        "raw", "lines", "lower_lines", "line_offsets",
+        "lower", "normalized", "normalized_lower", "results",
+    )
+
+    def __init__(self, text):
+        self.raw = text or ""
+
+        lines = []
+        offsets = []
+        pos = 0
+        for chunk in self.raw.splitlines(keepends=True):
+            stripped = chunk.strip()
+            if stripped:
+                lines.append(stripped)
+                offsets.append(pos + (len(chunk) - len(chunk.lstrip())))
+            pos += len(chunk)
+
+        self.lines = lines
+        self.lower_lines = [l.lower() for l in lines]
+        self.line_offsets = offsets
+
+        self.lower = self.raw.lower()
+        self.normalized = WHITESPACE_RUN.sub(" ", self.raw)
+        self.normalized_lower = self.normalized.lower()
+
+        self.results = {}
+
+    def __len__(self):
+        return len(self.raw)
+
+
+def as_brochure_text(text):
+    """
+    Accepts raw text or an existing BrochureText.
+    """
+    if isinstance(text, BrochureText):
+        return text
+    return BrochureText(text)
@@ -1,46 +1,137 @@
-import fitz
 from PIL import Image
 import imagehash
 import io
 import os
+import threading
+from collections import OrderedDict
+
+from utils.pdf_session import PdfSession, pdf_session
 
 
 HRDC_LOGO_PATH = "assets/hrdc_logo.png"
-HRDC_HASH_THRESHOLD = 10  
+HRDC_HASH_THRESHOLD = 25
+
+# Only the first pages carry the certification logo
+HRDC_SCAN_PAGES = 2
+
+# Metadata prefilter: skip icons, full-page photos and odd shapes
+# before decoding anything
+LOGO_MIN_SIDE = 24
+LOGO_MAX_SIDE = 3000
+LOGO_MAX_ASPECT_DEVIATION = 3.0
+
+# Per-document answers remembered for plain file paths
+PATH_MEMO_SIZE = 256
+
+
+class HrdcLogoDetector:
+    """
+    pHash matcher for the HRDC logo.
+    The reference hash is computed once; answers are memoised per
+    document (on the PdfSession, or by path + size + mtime).
+    """
+
+    def __init__(self, logo_path=HRDC_LOGO_PATH, threshold=HRDC_HASH_THRESHOLD, pages=HRDC_SCAN_PAGES):
+        ref_img = Image.open(logo_path).convert("RGB")
+        self.ref_hash = imagehash.phash(ref_img)
+        self.ref_aspect = ref_img.width / max(ref_img.height, 1)
+        self.threshold = threshold
+        self.pages = pages
+
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def detect(self, pdf):
+        """
+        pdf: file path or PdfSession. Returns True if the logo is found.
+        """
+        if isinstance(pdf, PdfSession):
+            if "hrdc_logo" not in pdf.results:
+                if pdf.closed:
+                    pdf.results["hrdc_logo"] = self._detect_path(pdf.pdf_path)
+                else:
+                    pdf.results["hrdc_logo"] = self._scan(pdf)
+            return pdf.results["hrdc_logo"]
+
+        return self._detect_path(pdf)
+
+    def _detect_path(self, pdf_path):
+        try:
+            st = os.stat(pdf_path)
+            key = (os.path.abspath(pdf_path), st.st_size, st.st_mtime_ns)
+        except OSError:
+            key = None
+
+        if key is not None:
+            with self._lock:
+                if key in self._memo:
+                    self._memo.move_to_end(key)
+                    return self._memo[key]
+
+        with pdf_session(pdf_path) as session:
+            found = self._scan(session)
+
+        if key is not None:
+            with self._lock:
+                self._memo[key] = found
+                while len(self._memo) > PATH_MEMO_SIZE:
+                    self._memo.popitem(last=False)
+        return found
+
+    def plausible_size(self, width, height):
+        if min(width, height) < LOGO_MIN_SIDE or max(width, height) > LOGO_MAX_SIDE:
+            return False
+        aspect = width / height
+        deviation = max(aspect / self.ref_aspect, self.ref_aspect / aspect)
+        return deviation <= LOGO_MAX_ASPECT_DEVIATION
+
+    def _scan(self, session):
+        doc = session.doc
+        seen = set()
 
+        for page_idx in range(min(self.pages, session.page_count)):
+            for img in session.page_images(page_idx):
+                # (xref, smask, width, height, bpc, colorspace, ...)
+                xref, width, height = img[0], img[2], img[3]
 
-def detect_hrdc_logo(pdf_path):
-    import fitz
-    import os
-    import io
-    from PIL import Image
-    import imagehash
+                # Same image placed several times → hash it once
+                if xref in seen:
+                    continue
+                seen.add(xref)
 
-    HRDC_LOGO_PATH = "assets/hrdc_logo.png"
-    HRDC_HASH_THRESHOLD = 25
+                if not self.plausible_size(width, height):
+                    continue
 
-    ref_img = Image.open(HRDC_LOGO_PATH).convert("RGB")
-    ref_hash = imagehash.phash(ref_img)
+                try:
+                    base = doc.extract_image(xref)
+                    img_pil = Image.open(io.BytesIO(base["image"])).convert("RGB")
+                    distance = abs(self.ref_hash - imagehash.phash(img_pil))
 
-    doc = fitz.open(pdf_path)
+                    if distance <= self.threshold:
+                        return True
+                except Exception:
+                    continue
+        return False
 
-    for page_idx, page in enumerate(doc[:2]):
-        images = page.get_images(full=True)
 
-        for img in images:
-            xref = img[0]
-            base = doc.extract_image(xref)
-            image_bytes = base["image"]
+_DETECTOR = None
+_DETECTOR_LOCK = threading.Lock()
 
-            try:
-                img_pil = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-                img_hash = imagehash.phash(img_pil)
-                distance = abs(ref_hash - img_hash)
 
+def get_hrdc_detector():
+    """
+    Process-wide detector (reference hash loaded on first use).
+    """
+    global _DETECTOR
+    with _DETECTOR_LOCK:
+        if _DETECTOR is None:
+            _DETECTOR = HrdcLogoDetector()
+        return _DETECTOR
 
-                if distance <= HRDC_HASH_THRESHOLD:
-                    return True
-            except Exception as e:
-                continue
-    return False
 
+def detect_hrdc_logo(pdf):
+    """
+    pdf: file path or an open PdfSession.
+    With a session the answer is memoised in session.results.
+    """
+    return get_hrdc_detector().detect(pdf)
@@ -1,5 +1,15 @@
 # EXTRACT METADATA FROM TRAINING PROGRAM BROCHURES
-import re
+from layer1_text.brochure_text import as_brochure_text
+from layer1_text.patterns import (
+    TITLE_LABEL, TITLE_LABEL_SPLIT, STACKED_TITLE_HEAD, STACKED_TITLE_TAIL,
+    AGENDA_DATE, ORDINAL_SUFFIX, DAY_NUMBER, MONTH_YEAR, DATE_RANGE, SINGLE_DATE,
+    VENUE_HOTEL, VENUE_LABEL_PREFIX,
+    TRAINER_PROFILE_HEADING, BIO_START, REGION_TRAINER_HEADING, ROLE_VALUE_SPLIT,
+    PERSON_BAD_CHARS, PERSON_WORD, PERSON_LIKE, SENTENCE_WORDS, COPYRIGHT,
+    OWNERSHIP_PHRASE, ADDRESS_WORDS,
+)
+from utils.keywords import KEYWORDS, ROLE_LABELS, GENERIC_TRAINER_ROLE
+from utils.price_index import PriceIndex
 
 meta = {
     "Program Title": None,
@@ -13,12 +23,6 @@ meta = {
     "Flags": ""
 }
 
-MONTHS = (
-    "january|february|march|april|may|june|july|august|"
-    "september|october|november|december|"
-    "jan|feb|mar|apr|jun|jul|aug|sep|oct|nov|dec"
-)
-
 TITLE_BLOCKLIST = [
     "limited to", "average rating", "hrd", "claimable",
     "programme", "program", "course overview",
@@ -57,8 +61,11 @@ AUDIENCE_LABELS = {
     "managers"
 }
 
+# Connectors allowed inside names (bin/binti, ...)
+NAME_CONNECTORS = {"bin","binti","a/l","a/p","van","von","de","da","di"}
+
 def clean_lines(text):
-    return [l.strip() for l in text.splitlines() if l.strip()]
+    return as_brochure_text(text).lines
 
 def looks_like_person(name: str) -> bool:
     name = name.strip()
@@ -69,34 +76,22 @@ def looks_like_person(name: str) -> bool:
         return False
 
     # reject digits / symbols (kills "100%", "HRD Corp", etc.)
-    if re.search(r"[\d%$@#/]", name):
-        return False
-
-    lower = name.lower()
-
-    # reject common non-name words that appear in headings/topics
-    TOPIC_BLOCK = {
-        "risk","management","allocation","negotiation","strategy","planning",
-        "chatgpt","ai","office","productivity","contract","leadership",
-        "development","programme","program","course","session","module",
-        "overview","outcomes","objectives","agenda","introduction"
-    }
-    if any(w in TOPIC_BLOCK for w in re.findall(r"[a-z]+", lower)):
+    if PERSON_BAD_CHARS.search(name):
         return False
 
-    # reject role/label words
-    ROLE_BLOCK = {"trainer","speaker","facilitator","profile","expert","management"}
-    if any(w in lower for w in ROLE_BLOCK):
+    # reject common non-name words that appear in headings/topics,
+    # and role/label words (utils/keywords.py)
+    hits = KEYWORDS.scan(name)
+    if "person_topic" in hits or "person_role" in hits:
         return False
 
     # must look like proper-cased words (Name Surname), allow connectors like bin/binti
-    allowed_connectors = {"bin","binti","a/l","a/p","van","von","de","da","di"}
     caps_ok = 0
     for w in words:
         wl = w.lower().strip(".,()")
-        if wl in allowed_connectors:
+        if wl in NAME_CONNECTORS:
             continue
-        if not re.match(r"^[A-Z][a-z]+(?:[-'][A-Z][a-z]+)?\.?$", w.strip(",.")):
+        if not PERSON_WORD.match(w.strip(",.")):
             return False
         caps_ok += 1
 
@@ -118,13 +113,13 @@ def looks_like_heading(s: str) -> bool:
     #   SINGAPORE TRAINER
     #   REGIONAL TRAINER
     #   LEAD TRAINER
-    if re.match(r"^[A-Z]{2,}\s+TRAINER$", s):
+    if REGION_TRAINER_HEADING.match(s):
         return True
 
     return False
 
 def is_person_like(s):
-    return bool(re.match(r"^[A-Z][a-z]+(?:\s[A-Z][a-z]+){1,2}$", s))
+    return bool(PERSON_LIKE.match(s))
 
 def is_label(s):
     return s.lower() in {
@@ -156,23 +151,30 @@ def looks_like_sentence(s):
     return (
         s.endswith(".")
         or s.count(" ") >= 6
-        or re.search(r"\b(is|are|will|can|to|for|with|that)\b", s.lower())
+        or SENTENCE_WORDS.search(s.lower())
     )
 
 def looks_like_copyright(s):
-    return bool(re.search(r"(©|copyright|all rights reserved)", s.lower()))
+    return bool(COPYRIGHT.search(s.lower()))
 
 def looks_like_audience_label(s):
     return s.lower() in AUDIENCE_LABELS
 
 # PROGRAM TITLE
 def extract_program_title(text):
-    lines = clean_lines(text)
+    # Memoised: the organiser rules need the title too
+    doc = as_brochure_text(text)
+    if "title" not in doc.results:
+        doc.results["title"] = _extract_program_title(doc)
+    return doc.results["title"]
+
+def _extract_program_title(doc):
+    lines = doc.lines
 
     # High confidence: explicit label
     for i, line in enumerate(lines):
-        if re.search(r"(course title|program title)", line, re.I):
-            parts = re.split(r"[:\-]", line, 1)
+        if TITLE_LABEL.search(line):
+            parts = TITLE_LABEL_SPLIT.split(line, 1)
             if len(parts) == 2 and len(parts[1].strip()) > 5:
                 return parts[1].strip(), "High"
             for j in range(i + 1, i + 4):
@@ -182,31 +184,24 @@ def extract_program_title(text):
     # Medium confidence: poster-style stacked title
     for i in range(len(lines) - 1):
         if (
-            re.match(r"^[A-Z][A-Za-z ]+$", lines[i])
-            and re.match(r"^and [A-Za-z ]+$", lines[i + 1], re.I)
+            STACKED_TITLE_HEAD.match(lines[i])
+            and STACKED_TITLE_TAIL.match(lines[i + 1])
         ):
             return f"{lines[i]} {lines[i + 1]}", "Medium"
 
     return "Not detected", "Low"
 
-# PROGRAM DATE
 # PROGRAM DATE
 def extract_program_date(text):
-    normalized = re.sub(r"\s+", " ", text)
-    lines = clean_lines(text)
+    normalized = as_brochure_text(text).normalized
 
     # Agenda-style date headers (e.g. Monday, 21ST July 2025)
-    agenda_dates = re.findall(
-        rf"(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday),?\s*"
-        rf"\d{{1,2}}(?:st|nd|rd|th)?\s+(?:{MONTHS})\s+\d{{4}}",
-        normalized,
-        re.I
-    )
+    agenda_dates = AGENDA_DATE.findall(normalized)
 
     if agenda_dates:
         # Normalize ordinals: 21ST → 21
         cleaned = [
-            re.sub(r"(\d{{1,2}})(st|nd|rd|th)", r"\1", d, flags=re.I)
+            ORDINAL_SUFFIX.sub(r"\1", d)
             for d in agenda_dates
         ]
 
@@ -217,15 +212,11 @@ def extract_program_date(text):
             return unique[0], "High"
 
         days = [
-            re.search(r"(\d{1,2})", d).group(1)
+            DAY_NUMBER.search(d).group(1)
             for d in unique
         ]
 
-        m_my = re.search(
-            rf"(?:{MONTHS})\s+\d{{4}}",
-            unique[0],
-            re.I
-        )
+        m_my = MONTH_YEAR.search(unique[0])
         if not m_my:
             return unique[0], "High"
 
@@ -233,20 +224,12 @@ def extract_program_date(text):
         return f"{days[0]}–{days[-1]} {month_year}", "High"
 
     # Full date range with year
-    m = re.search(
-        rf"\d{{1,2}}\s*[-–—-]\s*\d{{1,2}}\s+(?:{MONTHS})\s+\d{{4}}",
-        normalized,
-        re.I
-    )
+    m = DATE_RANGE.search(normalized)
     if m:
         return m.group(0), "High"
 
     # Single date with year
-    m2 = re.search(
-        rf"\d{{1,2}}\s+(?:{MONTHS})\s+\d{{4}}",
-        normalized,
-        re.I
-    )
+    m2 = SINGLE_DATE.search(normalized)
     if m2:
         return m2.group(0), "Medium"
 
@@ -254,32 +237,33 @@ def extract_program_date(text):
 
 # VENUE
 def clean_venue_text(text):
-    return re.sub(r"^venue\s*[:\-]\s*", "", text, flags=re.I).strip()
+    return VENUE_LABEL_PREFIX.sub("", text).strip()
 
 def extract_venue(text):
-    lines = clean_lines(text)
+    doc = as_brochure_text(text)
+    lines = doc.lines
 
     # High confidence: hotel / known venue
     for line in lines:
-        if re.search(r"(ritz[- ]carlton|marriott|hotel)", line, re.I):
+        if VENUE_HOTEL.search(line):
             return clean_venue_text(line), "High"
 
     # High confidence: explicit venue label
-    for i, line in enumerate(lines):
-        if line.lower() == "venue":
+    for i, line in enumerate(doc.lower_lines):
+        if line == "venue":
             for j in range(i + 1, min(i + 6, len(lines))):
                 if lines[j] != ":":
                     return clean_venue_text(lines[j]), "High"
 
     # Medium confidence: INSEAD fallback
-    if "insead" in text.lower():
+    if "insead" in doc.lower:
         return "INSEAD campus, Singapore / Malaysia", "Medium"
 
     return "Not detected", "Low"
 
 # HRDC (TEXT ONLY)
 def detect_hrdc(text):
-    t = text.lower()
+    t = as_brochure_text(text).lower
     patterns = [
         "hrdc",
         "hrdf",
@@ -291,6 +275,16 @@ def detect_hrdc(text):
     return any(p in t for p in patterns)
 
 # COST 
+def price_mentions(text):
+    """
+    PriceIndex of the lowercased, whitespace-normalised text (built once
+    per document).
+    """
+    doc = as_brochure_text(text)
+    if "prices" not in doc.results:
+        doc.results["prices"] = PriceIndex.from_text(doc.normalized_lower)
+    return doc.results["prices"]
+
 def extract_cost(text):
     """
     Layer 1 COST RULES (enterprise-safe)
@@ -302,79 +296,43 @@ def extract_cost(text):
     5) Lowest visible price (fallback)
     """
 
-    t = re.sub(r"\s+", " ", text.lower())
+    prices = price_mentions(text)
 
     # PROMO / EARLY BIRD 
-    promo = re.search(
-        r"(promo fee|promotional fee|promo price|early bird).{0,60}"
-        r"(rm|usd)\s?([\d,]+(?:\.\d{2})?)",
-        t,
-        re.I
-    )
+    promo = prices.after_anchor("promo")
     if promo:
-        return promo.group(3).replace(",", ""), promo.group(2).upper(), "High"
+        return promo.amount, promo.currency, "High"
 
     # NON-MEMBER PRICE 
-    non_member = re.search(
-        r"(non[- ]member).{0,60}"
-        r"(rm|usd)\s?([\d,]+(?:\.\d{2})?)",
-        t,
-        re.I
-    )
+    non_member = prices.after_anchor("non_member")
     if non_member:
-        return non_member.group(3).replace(",", ""), non_member.group(2).upper(), "High"
+        return non_member.amount, non_member.currency, "High"
 
     # WITHOUT ACCOMMODATION
-    wa = re.search(
-        r"(rm|usd)\s?([\d,]+(?:\.\d{2})?).{0,60}"
-        r"without (hotel )?accommodation",
-        t,
-        re.I
-    )
+    wa = prices.first_with("without_accommodation")
     if wa:
-        return wa.group(2).replace(",", ""), wa.group(1).upper(), "High"
+        return wa.amount, wa.currency, "High"
 
     # PER PAX
-    pax = re.search(
-        r"(rm|usd)\s?([\d,]+(?:\.\d{2})?)\s*(per pax|per person)",
-        t,
-        re.I
-    )
+    pax = prices.first_with("per_pax")
     if pax:
-        return pax.group(2).replace(",", ""), pax.group(1).upper(), "Medium"
+        return pax.amount, pax.currency, "Medium"
 
     # FALLBACK — LOWEST VISIBLE PRICE
-    prices = re.findall(
-        r"(rm|usd)\s?([\d,]+(?:\.\d{2})?)",
-        t,
-        re.I
-    )
-
-    parsed = []
-    for cur, amt in prices:
-        try:
-            parsed.append((cur.upper(), float(amt.replace(",", ""))))
-        except ValueError:
-            pass
-
-    if parsed:
-        currency, amount = sorted(parsed, key=lambda x: x[1])[0]
-        return str(amount), currency, "Low"
+    lowest = prices.lowest()
+    if lowest:
+        return str(lowest.value()), lowest.currency, "Low"
 
     return "N/A", "N/A", "Low"
 
 # TRAINER 
 def extract_trainer(text):
-    lines = clean_lines(text)
-
-    ROLE_LABELS = [
-        r"lead trainer", r"course leader", r"courseleader", r"facilitator", 
-        r"speaker", r"conducted by", r"presented by", r"trainer profile", r"\btrainer\b"
-    ]
+    doc = as_brochure_text(text)
+    lines = doc.lines
 
     # TRAINER PROFILE SECTION (strong signal)
     for i, line in enumerate(lines):
-        if re.fullmatch(r"(trainer profile|trainer profiles)", line, re.I):
+        if TRAINER_PROFILE_HEADING.fullmatch(line):
             candidates = []
             for j in range(i + 1, i + 8):
                 if j >= len(lines):
@@ -386,7 +344,7 @@ def extract_trainer(text):
                     continue
 
                 # Stop when bio text starts
-                if re.search(r"\b(is|has|was)\b", candidate.lower()):
+                if BIO_START.search(candidate.lower()):
                     break
 
                 if looks_like_person(candidate):
@@ -400,15 +358,19 @@ def extract_trainer(text):
 
     # ROLE-BASED FALLBACK
     for i, line in enumerate(lines):
+        roles = KEYWORDS.scan(line).get("role")
+        if not roles:
+            continue
+
         for role in ROLE_LABELS:
-            if re.search(rf"\b{role}\b", line, re.I):
+            if role in roles:
 
                 # 🚫 Generic trainer must look like heading
-                if role == r"\btrainer\b" and not looks_like_heading(line):
+                if role == GENERIC_TRAINER_ROLE and not looks_like_heading(line):
                     continue
 
                 # Same-line case
-                parts = re.split(r"[:\-–—]", line, 1)
+                parts = ROLE_VALUE_SPLIT.split(line, 1)
                 if len(parts) == 2 and looks_like_person(parts[1]):
                     return parts[1].strip(), "High"
 
@@ -425,15 +387,17 @@ def extract_trainer(text):
 
 # ORGANISER 
 def extract_organiser(text):
-    lines = clean_lines(text)
+    doc = as_brochure_text(text)
+    lines = doc.lines
+    lower_lines = doc.lower_lines
 
     # Get program title to block false positives
-    title, _ = extract_program_title(text)
+    title, _ = extract_program_title(doc)
     title_lower = title.lower() if title != "Not detected" else None
 
     # ABOUT section ownership
-    for i, line in enumerate(lines):
-        if line.lower().startswith("about"):
+    for i, line in enumerate(lower_lines):
+        if line.startswith("about"):
             for j in range(i + 1, i + 4):
                 if j < len(lines):
                     candidate = lines[j].strip()
@@ -451,7 +415,7 @@ def extract_organiser(text):
 
     # Explicit ownership phrases
     for line in lines:
-        if re.search(r"(organised by|organized by|hosted by|payable to)", line, re.I):
+        if OWNERSHIP_PHRASE.search(line):
             candidate = line.split("by", 1)[-1].strip()
             if title_lower and title_lower in candidate.lower():
                 continue
@@ -460,11 +424,11 @@ def extract_organiser(text):
                 return candidate, "High"
 
     # Address ownership block
-    for i, line in enumerate(lines):
-        if re.search(r"(address|jalan|road|street|level|floor)", line.lower()):
+    for i, line in enumerate(lower_lines):
+        if ADDRESS_WORDS.search(line):
             for k in range(i - 1, max(i - 4, -1), -1):
                 candidate = lines[k]
-                if title_lower and title_lower in candidate.lower():
+                if title_lower and title_lower in lower_lines[k]:
                     continue
 
                 if looks_like_org_generic(candidate) and not is_label(candidate):
@@ -472,8 +436,8 @@ def extract_organiser(text):
 
     # Repetition dominance
     freq = {}
-    for line in lines:
-        if title_lower and title_lower in line.lower():
+    for line, line_lower in zip(lines, lower_lines):
+        if title_lower and title_lower in line_lower:
             continue
 
         if looks_like_org_generic(line) and len(line.split()) <= 4:
@@ -489,13 +453,16 @@ def extract_organiser(text):
 
 # MASTER
 def extract_metadata(text):
-    title, title_conf = extract_program_title(text)
-    date, date_conf = extract_program_date(text)
-    venue, venue_conf = extract_venue(text)
+    # Split / lowercase / normalise once for all extractors
+    doc = as_brochure_text(text)
+
+    title, title_conf = extract_program_title(doc)
+    date, date_conf = extract_program_date(doc)
+    venue, venue_conf = extract_venue(doc)
 
-    cost_amount, cost_currency, cost_conf = extract_cost(text)
-    trainer, trainer_conf = extract_trainer(text)
-    organiser, organiser_conf = extract_organiser(text)
+    cost_amount, cost_currency, cost_conf = extract_cost(doc)
+    trainer, trainer_conf = extract_trainer(doc)
+    organiser, organiser_conf = extract_organiser(doc)
 
 
     flags = []
@@ -535,7 +502,7 @@ def extract_metadata(text):
         "Training Organiser": organiser,
         "Organiser Confidence": organiser_conf,
 
-        "HRDC Certified": "Yes" if detect_hrdc(text) else "No",
+        "HRDC Certified": "Yes" if detect_hrdc(doc) else "No",
         "Flags": "; ".join(flags) if flags else "OK"
     }
 
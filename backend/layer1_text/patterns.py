@@ -0,0 +1,75 @@
+# PRECOMPILED LAYER 1 PATTERNS
+# Shared by every Layer 1 extractor so no regex is rebuilt per call / per line.
+import re
+
+MONTHS = (
+    "january|february|march|april|may|june|july|august|"
+    "september|october|november|december|"
+    "jan|feb|mar|apr|jun|jul|aug|sep|oct|nov|dec"
+)
+
+WEEKDAYS = "monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+
+# ======================================================
+# PROGRAM TITLE
+# ======================================================
+TITLE_LABEL = re.compile(r"(course title|program title)", re.I)
+TITLE_LABEL_SPLIT = re.compile(r"[:\-]")
+STACKED_TITLE_HEAD = re.compile(r"^[A-Z][A-Za-z ]+$")
+STACKED_TITLE_TAIL = re.compile(r"^and [A-Za-z ]+$", re.I)
+
+# ======================================================
+# PROGRAM DATE
+# ======================================================
+# Agenda-style date headers (e.g. Monday, 21ST July 2025)
+AGENDA_DATE = re.compile(
+    rf"(?:{WEEKDAYS}),?\s*"
+    rf"\d{{1,2}}(?:st|nd|rd|th)?\s+(?:{MONTHS})\s+\d{{4}}",
+    re.I
+)
+ORDINAL_SUFFIX = re.compile(r"(\d{{1,2}})(st|nd|rd|th)", re.I)
+DAY_NUMBER = re.compile(r"(\d{1,2})")
+MONTH_YEAR = re.compile(rf"(?:{MONTHS})\s+\d{{4}}", re.I)
+DATE_RANGE = re.compile(rf"\d{{1,2}}\s*[-–—-]\s*\d{{1,2}}\s+(?:{MONTHS})\s+\d{{4}}", re.I)
+SINGLE_DATE = re.compile(rf"\d{{1,2}}\s+(?:{MONTHS})\s+\d{{4}}", re.I)
+
+# ======================================================
+# VENUE
+# ======================================================
+VENUE_HOTEL = re.compile(r"(ritz[- ]carlton|marriott|hotel)", re.I)
+VENUE_LABEL_PREFIX = re.compile(r"^venue\s*[:\-]\s*", re.I)
+
+# ======================================================
+# COST
+# ======================================================
+# Currency mentions and their promo / non-member / accommodation / per pax
+# context come from utils/price_index.py (one pass, shared by all layers)
+
+# ======================================================
+# TRAINER
+# ======================================================
+TRAINER_PROFILE_HEADING = re.compile(r"(trainer profile|trainer profiles)", re.I)
+BIO_START = re.compile(r"\b(is|has|was)\b")
+REGION_TRAINER_HEADING = re.compile(r"^[A-Z]{2,}\s+TRAINER$")
+ROLE_VALUE_SPLIT = re.compile(r"[:\-–—]")
+# Role labels themselves are matched by utils/keywords.py (KEYWORDS "role")
+
+# ======================================================
+# PERSON / ORGANISATION HEURISTICS
+# ======================================================
+PERSON_BAD_CHARS = re.compile(r"[\d%$@#/]")
+PERSON_WORD = re.compile(r"^[A-Z][a-z]+(?:[-'][A-Z][a-z]+)?\.?$")
+PERSON_LIKE = re.compile(r"^[A-Z][a-z]+(?:\s[A-Z][a-z]+){1,2}$")
+SENTENCE_WORDS = re.compile(r"\b(is|are|will|can|to|for|with|that)\b")
+COPYRIGHT = re.compile(r"(©|copyright|all rights reserved)")
+
+# ======================================================
+# ORGANISER (applied to lowercased lines)
+# ======================================================
+OWNERSHIP_PHRASE = re.compile(r"(organised by|organized by|hosted by|payable to)", re.I)
+ADDRESS_WORDS = re.compile(r"(address|jalan|road|street|level|floor)")
+
+# ======================================================
+# WHITESPACE
+# ======================================================
+WHITESPACE_RUN = re.compile(r"\s+")
@@ -1,9 +1,12 @@
 # nlp_fallback.py  (Layer 2: Layout-aware inference)
 import re
 import pytesseract
-from PIL import Image
-import fitz
-import io
+
+from utils.pdf_session import PdfSession, pdf_session
+from utils.layout_page import LayoutPage, LazyPages
+from utils.keywords import KEYWORDS
+from utils.price_index import PriceIndex
+from layer2_layout.spatial_index import SpatialIndex
 
 # CONSTANTS
 DATE_REGEX = r"""
@@ -25,27 +28,14 @@ DATE_REGEX = r"""
 )
 """
 
-VENUE_KEYWORDS = [
-    "hall", "hotel", "centre", "center",
-    "campus", "auditorium"
-]
+DATE_RE = re.compile(DATE_REGEX, re.I)
+DATE_CONTINUATION_RE = re.compile(r"(\d{4}|to|-)")
 
-TITLE_SIGNAL_WORDS = [
-    "training", "workshop", "programme", "program",
-    "course", "leadership", "management", "digital",
-    "advanced", "introduction", "fundamentals",
-    "resilience", "sustainability"
-]
+# Keyword lists (venue, title signal, cost signal, organiser hints, ...)
+# live in utils/keywords.py and are matched by one shared KEYWORDS scan
 
 LABEL_WORDS = ["title", "date", "venue"]
 
-COST_SIGNAL_WORDS = [
-    "promo", "promotion", "special", "early bird",
-    "fees", "fee", "price", "cost"
-]
-
-CURRENCY_REGEX = r"(rm|usd)\s?([\d,]+(?:\.\d{2})?)"
-
 OCR_BLOCKLIST = {
     "CORPORATE LEADERS",
     "WHO SHOULD ATTEND",
@@ -56,14 +46,6 @@ OCR_BLOCKLIST = {
     "REGISTRATION"
 }
 
-ORGANISER_HINT_WORDS = [
-    "organised by",
-    "organized by",
-    "conducted by",
-    "delivered by",
-    "hosted by"
-]
-
 DOMAIN_ORGANISER_MAP = {
     "sarawakskills.edu.my": "Sarawak Skills",
     "insead.edu": "INSEAD Executive Education",
@@ -73,15 +55,19 @@ DOMAIN_ORGANISER_MAP = {
 # HELPER FUNCTIONS
 def normalize_blocks(blocks):
     """
-    Normalize layout blocks into dict format:
+    Normalize layout blocks into a LayoutPage whose blocks read as:
     {
         "bbox": (x0, y0, x1, y1),
         "text": str,
         "size": float
     }
 
-    Supports multiple input block shapes safely.
+    A LayoutPage (native extraction) is used as is; other input block
+    shapes are converted safely.
     """
+    if isinstance(blocks, LayoutPage):
+        return blocks
+
     normalized = []
 
     for b in blocks:
@@ -129,11 +115,10 @@ def normalize_blocks(blocks):
                 "size": float(size)
             })
 
-    return normalized
+    return LayoutPage.from_blocks(normalized)
 
 def has_title_signal(text: str) -> bool:
-    t = text.lower()
-    return any(w in t for w in TITLE_SIGNAL_WORDS)
+    return KEYWORDS.has(text, "title_signal")
 
 def looks_like_brand_header(text: str) -> bool:
     words = text.split()
@@ -143,13 +128,7 @@ def is_label(text: str) -> bool:
     return text.lower().strip() in LABEL_WORDS
 
 def is_non_title_line(text: str) -> bool:
-    text_upper = text.upper()
-    blacklist = [
-        "ABOUT", "OVERVIEW", "OBJECTIVES", "WHO SHOULD ATTEND",
-        "REGISTRATION", "FORM", "CONTACT", "EMAIL", "PHONE",
-        "SDN BHD", "FEES", "PACKAGE", "PARTICIPANT"
-    ]
-    return any(word in text_upper for word in blacklist)
+    return KEYWORDS.has(text, "non_title")
 
 def looks_incomplete(title: str) -> bool:
     triggers = [":", "FOR", "ON", "AND"]
@@ -158,27 +137,17 @@ def looks_incomplete(title: str) -> bool:
 def is_training_program(title: str) -> bool:
     if not title:
         return False
-    t = title.lower()
+    hits = KEYWORDS.scan(title)
 
     # conference indicators → NOT training
-    if any(w in t for w in [
-        "conference", "summit", "forum",
-        "congress", "symposium", "expo"
-    ]):
+    if "conference" in hits:
         return False
 
     # training indicators
-    return any(w in t for w in [
-        "training", "workshop", "course",
-        "programme", "program", "masterclass"
-    ])
+    return "training" in hits
 
 def has_trainer_section(blocks):
-    for b in blocks:
-        t = b["text"].upper()
-        if "TRAINER PROFILE" in t or "FACULTY PROFILE" in t:
-            return True
-    return False
+    return any(KEYWORDS.has(b["text"], "trainer_section") for b in blocks)
 
 def clean_org_name(text):
     text = text.strip()
@@ -187,18 +156,17 @@ def clean_org_name(text):
     return text
 
 # OCR 
-def get_page_image(pdf_path, page_number=0, dpi=200):
-    doc = fitz.open(pdf_path)
-    page = doc[page_number]
-
-    mat = fitz.Matrix(dpi / 72, dpi / 72)
-    pix = page.get_pixmap(matrix=mat)
-
-    img_bytes = pix.tobytes("png")
-    doc.close()
+def get_page_image(pdf, page_number=0, dpi=200):
+    """
+    pdf: file path or an open PdfSession.
+    With a session the rendered image is cached, so each page is
+    rasterised once per document.
+    """
+    if isinstance(pdf, PdfSession):
+        return pdf.page_image(page_number, dpi)
 
-    img = Image.open(io.BytesIO(img_bytes))
-    return img.convert("RGBA")
+    with pdf_session(pdf) as session:
+        return session.page_image(page_number, dpi).copy()
 
 def ocr_image_region(image):
     return pytesseract.image_to_string(image, config="--psm 6")
@@ -232,26 +200,39 @@ def ocr_full_page(page_image):
     return pytesseract.image_to_string(page_image, config="--psm 6")
 
 # LABEL → VALUE INFERENCE
-def find_value_near_label(blocks, label_block):
-    lx0, ly0, lx1, ly1 = label_block["bbox"]
+def find_value_near_label(blocks, label_block, index=None):
+    idx = find_block_near_label(blocks, label_block, index)
+    return blocks[idx]["text"] if idx is not None else None
 
-    candidates = []
+def find_block_near_label(blocks, label_block, index=None):
+    """
+    Index of the value block right of / below the label (or None).
+    index: SpatialIndex of blocks (built here if omitted).
+    """
+    if index is None:
+        index = SpatialIndex(blocks)
 
-    for b in blocks:
-        bx0, by0, bx1, by1 = b["bbox"]
+    bbox = label_block["bbox"]
 
-        # RIGHT of label
-        if bx0 > lx1 and abs(by0 - ly0) < 40:
-            candidates.append((bx0 - lx1, b["text"]))
+    # RIGHT of label
+    right = index.right_of(bbox, max_dy=40)
+    candidates = [(gap, blocks[i]["text"], i) for gap, i in right]
 
-        # BELOW label
-        elif by0 > ly1 and abs(bx0 - lx0) < 40:
-            candidates.append((by0 - ly1, b["text"]))
+    # BELOW label (blocks already counted as "right" keep that distance)
+    taken = {i for _, i in right}
+    candidates += [(gap, blocks[i]["text"], i) for gap, i in index.below(bbox, max_dx=40) if i not in taken]
 
-    return min(candidates)[1] if candidates else None
+    return min(candidates)[2] if candidates else None
+
+def block_prices(blocks):
+    """
+    PriceIndex over layout blocks; each mention carries the block's
+    bbox / font size and its keyword classes as context.
+    """
+    return PriceIndex.from_blocks(blocks, classify=KEYWORDS.scan)
 
 # TITLE INFERENCE (POSTER STYLE)
-def infer_program_title(blocks):
+def infer_program_title(blocks, index=None):
     if not blocks:
         return None
 
@@ -261,6 +242,13 @@ def infer_program_title(blocks):
 
     max_font = max(b["size"] for b in valid_blocks)
 
+    if index is None:
+        index = SpatialIndex(blocks)
+
+    # Checked once per block, shared by every candidate's row merge
+    non_title = [is_non_title_line(b["text"]) for b in blocks]
+    stops_merge = non_title.__getitem__
+
     best_score = -1
     best_title = None
 
@@ -269,25 +257,16 @@ def infer_program_title(blocks):
 
         if b["size"] < (max_font * 0.8):
             continue
-        if is_non_title_line(text):
+        if non_title[i]:
             continue
 
         y0 = b["bbox"][1]
         position_weight = 1.0 if y0 < 350 else 0.2
 
+        # Following lines of the same size stacked right under it
         merged_lines = [text]
-        curr_y = b["bbox"][3]
-
-        for j in range(i + 1, len(blocks)):
-            nxt = blocks[j]
-            if abs(nxt["bbox"][1] - curr_y) > 15:
-                break
-            if abs(nxt["size"] - b["size"]) > 1.0:
-                break
-            if is_non_title_line(nxt["text"]):
-                break
-            merged_lines.append(nxt["text"].strip())
-            curr_y = nxt["bbox"][3]
+        for j in index.row_run(i, max_gap=15, max_size_delta=1.0, stop=stops_merge):
+            merged_lines.append(blocks[j]["text"].strip())
 
         merged_text = " ".join(merged_lines)
 
@@ -313,18 +292,20 @@ def infer_program_title(blocks):
     return best_title
 
 # DATE INFERENCE
-def infer_program_date(blocks):
+def infer_program_date(blocks, index=None):
+    if index is None:
+        index = SpatialIndex(blocks)
+
     candidates = []
 
     for i, b in enumerate(blocks):
-        if re.search(DATE_REGEX, b["text"], re.I):
+        if DATE_RE.search(b["text"]):
             date_text = b["text"].strip()
 
-            if i + 1 < len(blocks):
-                nxt = blocks[i + 1]
-                if abs(nxt["bbox"][1] - b["bbox"][3]) < 20:
-                    if re.search(r"(\d{4}|to|-)", nxt["text"]):
-                        date_text += " " + nxt["text"].strip()
+            # Continuation line right under it (e.g. "to 23 July 2025")
+            j = index.next_line(i, max_gap=20)
+            if j is not None and DATE_CONTINUATION_RE.search(blocks[j]["text"]):
+                date_text += " " + blocks[j]["text"].strip()
 
             score = 1000 - b["bbox"][1]
             candidates.append((score, date_text))
@@ -336,47 +317,46 @@ def infer_program_venue(blocks):
     candidates = []
 
     for b in blocks:
-        text = b["text"].lower()
-        if any(k in text for k in VENUE_KEYWORDS):
+        if KEYWORDS.has(b["text"], "venue"):
             score = 1000 - b["bbox"][1]
             candidates.append((score, b["text"]))
 
     return max(candidates)[1] if candidates else None
 
 # COST INFERENCE (LAYOUT)
-def infer_cost_from_layout(blocks):
-    candidates = []
-
-    for b in blocks:
-        text = b["text"].lower()
+def infer_cost_from_layout(blocks, prices=None):
+    """
+    prices: PriceIndex of these blocks (block_prices), built here if omitted.
+    """
+    if prices is None:
+        prices = block_prices(blocks)
 
-        if not re.search(CURRENCY_REGEX, text, re.I):
-            continue
+    candidates = []
 
-        # Extract currency + amount
-        m = re.search(CURRENCY_REGEX, text, re.I)
-        if not m:
+    for i, b in enumerate(blocks):
+        mentions = prices.in_block(i)
+        if not mentions:
             continue
 
-        currency = m.group(1).upper()
-        amount = m.group(2).replace(",", "")
+        # First currency mention of the block
+        m = mentions[0]
 
         # ---------- SCORING ----------
         score = 0
 
         # Visual importance
-        score += b["size"] * 2
-        score += max(0, 1000 - b["bbox"][1])  # higher = better
+        score += m.size * 2
+        score += max(0, 1000 - m.bbox[1])  # higher = better
 
         # Promo / emphasis
-        if any(w in text for w in COST_SIGNAL_WORDS):
+        if "cost_signal" in m.context:
             score += 800
 
         # Penalise "normal price" / crossed-out prices
-        if "normal" in text or "was" in text:
+        if "cost_penalty" in m.context:
             score -= 400
 
-        candidates.append((score, amount, currency))
+        candidates.append((score, m.amount, m.currency))
 
     if not candidates:
         return None
@@ -443,26 +423,43 @@ def infer_organiser_from_domain(text):
 def layout_fallback(meta, layout_pages, pdf_path):
     """
     Layer 2: Layout + OCR fallback
-    layout_pages: List[List[raw_block]]
+    layout_pages: sequence of pages (LayoutPage, or List[raw_block]);
+                  may be a LazyPages sequence, read page by page on demand
     raw_block format: [x0, y0, x1, y1, text, size]
+    pdf_path: file path or an open PdfSession (used for OCR page images)
     """
 
     if not layout_pages:
         return meta
 
+    # One session for the whole layer so OCR page images are rendered once
+    with pdf_session(pdf_path) as session:
+        return _layout_fallback(meta, layout_pages, session)
+
+
+def _layout_fallback(meta, layout_pages, session):
+
     if not isinstance(meta.get("Flags"), str):
         meta["Flags"] = ""
 
     # ==============================
-    # NORMALIZE ALL PAGES FIRST
+    # NORMALIZE PAGES ON FIRST USE
     # ==============================
-    normalized_pages = [
-        normalize_blocks(page) for page in layout_pages
-    ]
+    # Title / date / venue / cost only read page 0; later pages are
+    # extracted and normalized only if the trainer or organiser scans
+    # get that far
+    normalized_pages = LazyPages(
+        len(layout_pages), lambda i: normalize_blocks(layout_pages[i])
+    )
 
     # Use first page for label-based inference
     page0 = normalized_pages[0]
 
+    # Currency mentions and spatial index of page 0, shared by the label
+    # and poster-style rules
+    page0_prices = block_prices(page0)
+    page0_index = SpatialIndex(page0)
+
     # ==============================
     # LABEL → VALUE (TABLE STYLE)
     # ==============================
@@ -470,33 +467,33 @@ def layout_fallback(meta, layout_pages, pdf_path):
         label = b["text"].strip().lower()
 
         if label == "title" and meta.get("Program Title Confidence") != "High":
-            value = find_value_near_label(page0, b)
+            value = find_value_near_label(page0, b, page0_index)
             if value:
                 meta["Program Title"] = value.strip()
                 meta["Program Title Confidence"] = "Medium"
                 meta["Flags"] += ";LAYOUT_TITLE_LABEL"
 
         elif label == "date" and meta.get("Program Date Confidence") != "High":
-            value = find_value_near_label(page0, b)
+            value = find_value_near_label(page0, b, page0_index)
             if value:
                 meta["Program Date"] = value.strip()
                 meta["Program Date Confidence"] = "Medium"
                 meta["Flags"] += ";LAYOUT_DATE_LABEL"
 
         elif label == "venue" and meta.get("Venue Confidence") != "High":
-            value = find_value_near_label(page0, b)
+            value = find_value_near_label(page0, b, page0_index)
             if value:
                 meta["Venue"] = value.strip()
                 meta["Venue Confidence"] = "Medium"
                 meta["Flags"] += ";LAYOUT_VENUE_LABEL"
 
         elif label in {"cost", "fee", "fees", "price"} and meta.get("Cost Confidence") != "High":
-            value = find_value_near_label(page0, b)
-            if value:
-                m = re.search(r"(rm|usd)\s?([\d,]+(?:\.\d{2})?)", value, re.I)
-                if m:
-                    meta["Cost Amount"] = m.group(2).replace(",", "")
-                    meta["Cost Currency"] = m.group(1).upper()
+            idx = find_block_near_label(page0, b, page0_index)
+            if idx is not None:
+                mentions = page0_prices.in_block(idx)
+                if mentions:
+                    meta["Cost Amount"] = mentions[0].amount
+                    meta["Cost Currency"] = mentions[0].currency
                     meta["Cost Confidence"] = "Medium"
                     meta["Flags"] += ";LAYOUT_COST_LABEL"
 
@@ -504,14 +501,14 @@ def layout_fallback(meta, layout_pages, pdf_path):
     # POSTER-STYLE FALLBACKS
     # ==============================
     if meta.get("Program Title Confidence") == "Low":
-        title = infer_program_title(page0)
+        title = infer_program_title(page0, page0_index)
         if title:
             meta["Program Title"] = title.strip()
             meta["Program Title Confidence"] = "Medium"
             meta["Flags"] += ";LAYOUT_TITLE"
 
     if meta.get("Program Date Confidence") == "Low":
-        date = infer_program_date(page0)
+        date = infer_program_date(page0, page0_index)
         if date:
             meta["Program Date"] = date.strip()
             meta["Program Date Confidence"] = "Medium"
@@ -525,7 +522,7 @@ def layout_fallback(meta, layout_pages, pdf_path):
             meta["Flags"] += ";LAYOUT_VENUE"
 
     if meta.get("Cost Confidence") == "Low":
-        cost = infer_cost_from_layout(page0)
+        cost = infer_cost_from_layout(page0, page0_prices)
         if cost:
             meta["Cost Amount"] = cost["amount"]
             meta["Cost Currency"] = cost["currency"]
@@ -551,7 +548,7 @@ def layout_fallback(meta, layout_pages, pdf_path):
                         break
 
                 # 2️⃣ OCR-based profile detection (INSEAD)
-                page_image = get_page_image(pdf_path, page_number=page_idx)
+                page_image = get_page_image(session, page_number=page_idx)
                 ocr_text = ocr_full_page(page_image)
 
                 if (
@@ -606,12 +603,10 @@ def layout_fallback(meta, layout_pages, pdf_path):
         if not organiser:
             for page_blocks in normalized_pages:
                 for b in page_blocks:
-                    t = b["text"].lower()
-                    for hint in ORGANISER_HINT_WORDS:
-                        if hint in t:
-                            candidate = b["text"].split(hint, 1)[-1]
-                            organiser = clean_org_name(candidate)
-                            break
+                    hint = KEYWORDS.first(b["text"], "organiser_hint")
+                    if hint:
+                        candidate = b["text"].split(hint, 1)[-1]
+                        organiser = clean_org_name(candidate)
                     if organiser:
                         break
                 if organiser:
@@ -619,7 +614,7 @@ def layout_fallback(meta, layout_pages, pdf_path):
 
         # ---- 2️⃣ OCR header/footer of page 1 ----
         if not organiser:
-            page_image0 = get_page_image(pdf_path, page_number=0)
+            page_image0 = get_page_image(session, page_number=0)
             ocr_text = ocr_header_footer(page_image0)
 
             organiser = infer_organiser_from_domain(ocr_text)
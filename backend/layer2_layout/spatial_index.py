@@ -0,0 +1,134 @@
+import math
+
+from utils.layout_page import LayoutPage
+
+
+# ======================================================
+# SPATIAL INDEX OVER LAYOUT BLOCKS
+# ======================================================
+
+# Grid cell size in PDF points; matches the label → value tolerance
+GRID_CELL = 40.0
+
+
+class SpatialIndex:
+    """
+    Grid over one page's blocks (a LayoutPage or {text, bbox, size} dicts).
+
+    Blocks are bucketed by the row (y0) and column (x0) cell of their
+    top-left corner, so "right of" / "below" queries only look at the
+    cells inside the tolerance band instead of every block on the page.
+    Flow queries (next line, row merge) use precomputed links between
+    consecutive blocks.
+    """
+
+    def __init__(self, blocks, cell=GRID_CELL):
+        self.blocks = blocks
+        self.cell = cell
+
+        if isinstance(blocks, LayoutPage):
+            self.x0, self.y0, self.x1, self.y1, self.size = blocks.columns()
+        else:
+            self.x0 = [b["bbox"][0] for b in blocks]
+            self.y0 = [b["bbox"][1] for b in blocks]
+            self.x1 = [b["bbox"][2] for b in blocks]
+            self.y1 = [b["bbox"][3] for b in blocks]
+            self.size = [b["size"] for b in blocks]
+
+        self._rows = {}
+        self._cols = {}
+        for i in range(len(blocks)):
+            self._rows.setdefault(self._cell(self.y0[i]), []).append(i)
+            self._cols.setdefault(self._cell(self.x0[i]), []).append(i)
+
+        self._runs = {}
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def _cell(self, v):
+        return math.floor(v / self.cell)
+
+    def _band(self, buckets, center, tol):
+        for c in range(self._cell(center - tol), self._cell(center + tol) + 1):
+            yield from buckets.get(c, ())
+
+    # --------------------------------------------------
+    # Neighbour queries (by bbox, so any block can be the anchor)
+    # --------------------------------------------------
+    def right_of(self, bbox, max_dy=40):
+        """
+        [(gap, i)] for blocks starting right of bbox on roughly the same row
+        (x0 > bbox.x1 and |y0 - bbox.y0| < max_dy).
+        """
+        lx0, ly0, lx1, ly1 = bbox
+        return [
+            (self.x0[i] - lx1, i)
+            for i in self._band(self._rows, ly0, max_dy)
+            if self.x0[i] > lx1 and abs(self.y0[i] - ly0) < max_dy
+        ]
+
+    def below(self, bbox, max_dx=40):
+        """
+        [(gap, i)] for blocks starting below bbox in roughly the same column
+        (y0 > bbox.y1 and |x0 - bbox.x0| < max_dx).
+        """
+        lx0, ly0, lx1, ly1 = bbox
+        return [
+            (self.y0[i] - ly1, i)
+            for i in self._band(self._cols, lx0, max_dx)
+            if self.y0[i] > ly1 and abs(self.x0[i] - lx0) < max_dx
+        ]
+
+    def nearest_in_column(self, bbox, max_dx=40):
+        """
+        Closest block below bbox in the same column, or None.
+        """
+        below = self.below(bbox, max_dx)
+        return min(below)[1] if below else None
+
+    # --------------------------------------------------
+    # Reading-order queries
+    # --------------------------------------------------
+    def next_line(self, i, max_gap):
+        """
+        i + 1 if the next block starts within max_gap of block i's bottom.
+        """
+        j = i + 1
+        if j < len(self.blocks) and abs(self.y0[j] - self.y1[i]) < max_gap:
+            return j
+        return None
+
+    def row_run(self, i, max_gap=15, max_size_delta=1.0, stop=None):
+        """
+        Blocks after i that continue it as one multi-line run: each starts
+        within max_gap of the previous block's bottom, has a font size within
+        max_size_delta of block i's, and stop(j) is false.
+
+        Gaps and stop() don't depend on i, so they are evaluated once per
+        block and shared by every run query on the page.
+        """
+        ends = self._run_ends(max_gap, stop)
+        size = self.size[i]
+
+        out = []
+        for j in range(i + 1, ends[i]):
+            if abs(self.size[j] - size) > max_size_delta:
+                break
+            out.append(j)
+        return out
+
+    def _run_ends(self, max_gap, stop):
+        key = (max_gap, stop)
+        if key not in self._runs:
+            n = len(self.blocks)
+            ends = [n] * n
+            # ends[i] = first j > i whose link from j - 1 is broken
+            end = n
+            for j in range(n - 1, 0, -1):
+                linked = abs(self.y0[j] - self.y1[j - 1]) <= max_gap and not (stop and stop(j))
+                if not linked:
+                    end = j
+                ends[j - 1] = end
+            self._runs[key] = ends
+        return self._runs[key]
@@ -0,0 +1,236 @@
+import os
+import re
+import json
+import time
+import random
+import threading
+
+from layer3_llm.llm_cache import llm_cache_key
+
+
+# CONFIG
+# "gemini" (default) or "fake" (offline, replayed / synthetic responses)
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "gemini").lower()
+
+# When set, every real response is appended here as JSONL so it can be
+# replayed later by the fake backend
+LLM_RECORD_PATH = os.environ.get("LLM_RECORD_PATH", "")
+
+# Fake backend behaviour
+LLM_FAKE_REPLAY_PATH = os.environ.get("LLM_FAKE_REPLAY_PATH", "")
+LLM_FAKE_LATENCY_MS = float(os.environ.get("LLM_FAKE_LATENCY_MS", 0))
+LLM_FAKE_JITTER_MS = float(os.environ.get("LLM_FAKE_JITTER_MS", 0))
+LLM_FAKE_ERROR_RATE = float(os.environ.get("LLM_FAKE_ERROR_RATE", 0))
+LLM_FAKE_SEED = os.environ.get("LLM_FAKE_SEED")
+
+
+class FakeBackendError(RuntimeError):
+    """Injected failure from the fake backend (LLM_FAKE_ERROR_RATE)."""
+
+
+# ======================================================
+# GEMINI
+# ======================================================
+
+class GeminiBackend:
+    """
+    google-generativeai behind the backend interface:
+        generate(prompt, model_name, generation_config, timeout) -> str
+
+    The SDK is imported and configured on first use, so importing Layer 3
+    no longer needs GOOGLE_API_KEY.
+    """
+
+    name = "gemini"
+
+    def __init__(self):
+        self._genai = None
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, model_name, generation_config=None, timeout=None):
+        model = self._model(model_name, generation_config)
+        options = {"timeout": timeout} if timeout else {}
+        resp = model.generate_content(prompt, request_options=options)
+        return getattr(resp, "text", "") or ""
+
+    def _model(self, model_name, generation_config):
+        key = (model_name, json.dumps(generation_config or {}, sort_keys=True))
+        with self._lock:
+            if self._genai is None:
+                import google.generativeai as genai
+
+                api_key = os.environ.get("GOOGLE_API_KEY")
+                if not api_key:
+                    raise RuntimeError("GOOGLE_API_KEY is not set (or use LLM_BACKEND=fake)")
+                genai.configure(api_key=api_key)
+                self._genai = genai
+
+            if key not in self._models:
+                self._models[key] = self._genai.GenerativeModel(model_name, generation_config=generation_config)
+            return self._models[key]
+
+
+# ======================================================
+# RECORDER
+# ======================================================
+
+class RecordingBackend:
+    """
+    Wraps another backend and appends each successful response to a JSONL
+    file: {"key", "model", "response"}, keyed like the LLM response cache.
+    """
+
+    def __init__(self, inner, path):
+        self.inner = inner
+        self.path = path
+        self.name = f"{inner.name}+record"
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, model_name, generation_config=None, timeout=None):
+        text = self.inner.generate(prompt, model_name, generation_config, timeout)
+
+        line = json.dumps({
+            "key": llm_cache_key(model_name, generation_config, prompt),
+            "model": model_name,
+            "response": text,
+        }, ensure_ascii=False)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        return text
+
+
+# ======================================================
+# FAKE (OFFLINE)
+# ======================================================
+
+class FakeBackend:
+    """
+    Deterministic stand-in for Gemini.
+
+    - Replays recorded responses (JSONL from RecordingBackend) by prompt key.
+    - Unrecorded prompts get a well-formed synthetic answer: every requested
+      field "Not detected" for extraction prompts, the first candidate for
+      category prompts.
+    - latency_ms (+ uniform jitter_ms) is slept per call, capped by the
+      call's timeout; error_rate of calls raise FakeBackendError.
+    """
+
+    name = "fake"
+
+    def __init__(self, replay_path=LLM_FAKE_REPLAY_PATH, latency_ms=LLM_FAKE_LATENCY_MS,
+                 jitter_ms=LLM_FAKE_JITTER_MS, error_rate=LLM_FAKE_ERROR_RATE, seed=LLM_FAKE_SEED):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+
+        self.calls = 0
+        self.replayed = 0
+        self.errors = 0
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._responses = _load_recordings(replay_path) if replay_path else {}
+
+    def generate(self, prompt, model_name, generation_config=None, timeout=None):
+        with self._lock:
+            self.calls += 1
+            delay = (self.latency_ms + self._rng.uniform(0, self.jitter_ms)) / 1000.0
+            fail = self._rng.random() < self.error_rate
+
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("fake backend: latency exceeds timeout")
+        if delay > 0:
+            time.sleep(delay)
+
+        if fail:
+            with self._lock:
+                self.errors += 1
+            raise FakeBackendError("fake backend: injected error")
+
+        text = self._responses.get(llm_cache_key(model_name, generation_config, prompt))
+        if text is not None:
+            with self._lock:
+                self.replayed += 1
+            return text
+        return synthetic_response(prompt)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "replayed": self.replayed,
+                "errors": self.errors,
+                "recordings": len(self._responses),
+                "latency_ms": self.latency_ms,
+                "jitter_ms": self.jitter_ms,
+                "error_rate": self.error_rate,
+            }
+
+
+def _load_recordings(path):
+    responses = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+                responses[entry["key"]] = entry["response"]
+            except (ValueError, KeyError, TypeError):
+                continue
+    return responses
+
+
+_SCHEMA_RE = re.compile(r"Return ONLY valid JSON[^\n]*\n(\{.*?\n\})\n", re.S)
+_CANDIDATE_RE = re.compile(r"^1\) \[[^\]]*\] (.+)$", re.M)
+
+
+def synthetic_response(prompt):
+    """
+    Well-formed JSON answer for the prompts this repo sends.
+    """
+    m = _CANDIDATE_RE.search(prompt)
+    if m and "CANDIDATE CATEGORIES" in prompt:
+        return json.dumps({
+            "category": m.group(1).strip(),
+            "confidence": "Medium",
+            "reason": "fake backend: top candidate",
+        })
+
+    m = _SCHEMA_RE.search(prompt)
+    if m:
+        try:
+            schema = json.loads(m.group(1))
+            return json.dumps(_fill_schema(schema))
+        except ValueError:
+            pass
+    return "{}"
+
+
+def _fill_schema(node):
+    if isinstance(node, dict):
+        return {k: _fill_schema(v) for k, v in node.items()}
+    return "Not detected"
+
+
+# ======================================================
+# FACTORY
+# ======================================================
+
+def create_backend(name=None):
+    name = (name or LLM_BACKEND).lower()
+    if name == "fake":
+        backend = FakeBackend()
+    elif name == "gemini":
+        backend = GeminiBackend()
+    else:
+        raise ValueError(f"Unknown LLM_BACKEND: {name}")
+
+    if LLM_RECORD_PATH:
+        backend = RecordingBackend(backend, LLM_RECORD_PATH)
+    return backend
@@ -1,9 +1,55 @@
 import os
 import json
-import re
-import google.generativeai as genai
 
-genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+from layer3_llm.llm_client import get_llm_client, CircuitOpenError
+from layer3_llm.prompt_builder import build_extraction_prompt, build_batch_prompt
+from utils.price_index import PriceIndex
+
+MODEL_NAME = "gemini-flash-latest"
+GENERATION_CONFIG = {
+    "temperature": 0,
+    "response_mime_type": "application/json"
+}
+
+# Flags marking a brochure whose Layer 3 did not run properly
+GEMINI_SKIPPED_FLAG = ";GEMINI_SKIPPED_CIRCUIT_OPEN"
+GEMINI_ERROR_FLAG = ";GEMINI_ERROR"
+
+# Fields whose confidence decides whether Layers 2-3 run (shared with
+# run_pipeline.py and the benchmarks)
+CONFIDENCE_KEYS = (
+    "Program Title Confidence",
+    "Program Date Confidence",
+    "Venue Confidence",
+    "Cost Confidence",
+    "Trainer Confidence",
+    "Organiser Confidence",
+)
+
+# Brochures packed into one Gemini request in batch mode (1 = no packing)
+LLM_PACK_SIZE = int(os.environ.get("LLM_PACK_SIZE", 5))
+
+
+def llm_degraded(meta) -> bool:
+    """
+    True if Layer 3 was skipped or failed for this brochure (its result
+    should not be cached as final).
+    """
+    flags = meta.get("Flags") or ""
+    return GEMINI_SKIPPED_FLAG in flags or GEMINI_ERROR_FLAG in flags
+
+
+def llm_review_flag(meta):
+    """
+    Review flag for the output contract when Layer 3 did not run
+    properly: LLM_SKIPPED (circuit open), LLM_ERROR, or None.
+    """
+    flags = meta.get("Flags") or ""
+    if GEMINI_SKIPPED_FLAG in flags:
+        return "LLM_SKIPPED"
+    if GEMINI_ERROR_FLAG in flags:
+        return "LLM_ERROR"
+    return None
 
 # ORGANISER NORMALISATION
 def normalize_organiser(name: str) -> str:
@@ -30,6 +76,75 @@ def normalize_organiser(name: str) -> str:
 
     return text
 
+def _is_json_object(text):
+    try:
+        return isinstance(json.loads(text), dict)
+    except ValueError:
+        return False
+
+def needs_llm(meta) -> bool:
+    return any(meta.get(k) != "High" for k in CONFIDENCE_KEYS)
+
+def apply_gemini_result(meta, data):
+    """
+    Merge one brochure's Gemini JSON into meta (only fields below High).
+    """
+    # --- Apply Gemini results conservatively ---
+    # --- Title ---
+    if meta.get("Program Title Confidence") != "High":
+        v = data.get("Program Title")
+        if v and v != "Not detected":
+            meta["Program Title"] = v
+            meta["Program Title Confidence"] = "Medium"
+            meta["Flags"] += ";GEMINI_TITLE"
+
+    # ---- DATE ----
+    if meta.get("Program Date Confidence") != "High":
+        v = data.get("Program Date")
+        if v and v != "Not detected":
+            meta["Program Date"] = v
+            meta["Program Date Confidence"] = "Medium"
+            meta["Flags"] += ";GEMINI_DATE"
+
+    # ---- VENUE ----
+    if meta.get("Venue Confidence") != "High":
+        v = data.get("Venue")
+        if v and v != "Not detected":
+            meta["Venue"] = v
+            meta["Venue Confidence"] = "Medium"
+            meta["Flags"] += ";GEMINI_VENUE"
+
+    # ---- COST (VERY GUARDED) ----
+    if meta.get("Cost Confidence") != "High":
+        v = data.get("Cost")
+        if v and v != "Not detected":
+            # Same currency parser as Layers 1/2; amount and currency
+            # come from the same mention
+            m = PriceIndex.from_text(v).first(lambda p: p.well_formed)
+            if m:
+                meta["Cost Amount"] = m.amount
+                meta["Cost Currency"] = m.currency
+                meta["Cost Confidence"] = "Medium"
+                meta["Flags"] += ";GEMINI_COST"
+
+    # ---- TRAINER ----
+    if meta.get("Trainer Confidence") != "High":
+        v = data.get("Trainer")
+        if v and v != "Not detected":
+            meta["Trainer"] = v
+            meta["Trainer Confidence"] = "Medium"
+            meta["Flags"] += ";GEMINI_TRAINER"
+
+    # ---- ORGANISER ----
+    if meta.get("Organiser Confidence") != "High":
+        v = data.get("Organiser")
+        if v and v != "Not detected":
+            meta["Training Organiser"] = normalize_organiser(v)
+            meta["Organiser Confidence"] = "Medium"
+            meta["Flags"] += ";GEMINI_ORG"
+
+    return meta
+
 def gemini_fallback(meta, text):
     """
     Layer 3: Semantic inference using Gemini.
@@ -37,139 +152,98 @@ def gemini_fallback(meta, text):
     """
 
     # ---- HARD GUARD ----
-    if all(meta.get(k) == "High" for k in [
-        "Program Title Confidence",
-        "Program Date Confidence",
-        "Venue Confidence",
-        "Cost Confidence", 
-        "Trainer Confidence",
-        "Organiser Confidence"
-    ]):
+    if not needs_llm(meta):
         return meta
 
-    prompt = f"""
-    You are a professional data entry clerk. Your goal is to extract EXACT metadata from a training brochure.
-    
-    CRITICAL RULES:
-    - Do NOT guess.
-    - Do NOT summarise.
-    - Extract ONLY if explicitly stated.
-    - Preserve original wording, currency, and numbers.
-
-    
-    CRITICAL INSTRUCTIONS:
-    1. PROGRAM TITLE: This is usually the largest text on the first page. 
-       - Capture the FULL title, including any colon-separated subtitles or theme names.
-       - Do NOT shorten or summarise.
-       - Example: If it says "PROJECT MANAGEMENT: THE AGILE WAY", do NOT just return "Project Management".
-
-    2. PROGRAM DATE: Look for the specific days of the event. 
-       - If a range is provided (e.g., 21-22 July), you MUST return the full range.S
-       - Do not return just a single day or a registration deadline.
-       - If the programme has multiple sessions in different locations, return ALL sessions in a single string, separated by semicolons.
-       - Example: "Malaysia: 3–7 June 2025; Singapore: 10–14 June 2025"
-
-    3. PROGRAM VENUE: Extract the full venue name as stated.
-        - Might be hotel names, conference centers, or online platforms.
-        - If more than one venue is listed, extract the primary one. 
-
-    4. COST: Extract the exact cost amount and currency as stated.
-        - If any of the fields are NOT found, return "Not detected" for that field
-        - If multiple costs are listed, extract the main program cost.
-        - If there is a discounted price and a normal price, extract the discounted price.
-        - If there is with and without accommodation prices, extract the without accommodation price.
-        - If there are member and non-member prices, extract the non-member price.
-
-    5. TRAINER: Extract the main trainer / speaker name(s) as stated.
-        - If multiple trainers are listed, extract all names in a single string, separated by semicolons.
-        - If no trainer names are found, return "Not detected".
-        
-    6. ORGANISER: Extract the full organiser name as stated.
-        - If no organiser is found, return "Not detected".
-        - If multiple organisers are listed, extract the primary one.
-        - Usually the organiser is found at the logo or footer section.
-
-    7. EXACTNESS: Do not summarize. Do not add words like "Conference" if they aren't part of the main title block.
-    
-    Return ONLY valid JSON:
-    {{
-        "Program Title": "...",
-        "Program Date": "...",
-        "Venue": "...",
-        "Cost": "...",
-        "Trainer": "...",
-        "Organiser": "..."
-     }}
-    Document text:
-    {text[:4000]}
-    """
+    # Ask only for the low-confidence fields, with context windows
+    # around their anchors instead of a blind text[:4000] cut
+    prompt, fields = build_extraction_prompt(meta, text)
+    print(f"[Gemini] Requesting fields: {', '.join(fields)} ({len(prompt)} chars)")
 
     try:
-        model = genai.GenerativeModel(
-            "gemini-flash-latest",
-            generation_config={
-                "temperature": 0,
-                "response_mime_type": "application/json"
-            }
+        response_text = get_llm_client().generate(
+            prompt, MODEL_NAME, GENERATION_CONFIG,
+            validate=_is_json_object
         )
 
-        response = model.generate_content(prompt)
-
-        data = json.loads(response.text)
-
-        # --- Apply Gemini results conservatively ---
-        # --- Title ---
-        if meta.get("Program Title Confidence") != "High":
-            v = data.get("Program Title")
-            if v and v != "Not detected":
-                meta["Program Title"] = v
-                meta["Program Title Confidence"] = "Medium"
-                meta["Flags"] += ";GEMINI_TITLE"
-
-        # ---- DATE ----
-        if meta.get("Program Date Confidence") != "High":
-            v = data.get("Program Date")
-            if v and v != "Not detected":
-                meta["Program Date"] = v
-                meta["Program Date Confidence"] = "Medium"
-                meta["Flags"] += ";GEMINI_DATE"
-
-        # ---- VENUE ----
-        if meta.get("Venue Confidence") != "High":
-            v = data.get("Venue")
-            if v and v != "Not detected":
-                meta["Venue"] = v
-                meta["Venue Confidence"] = "Medium"
-                meta["Flags"] += ";GEMINI_VENUE"
-
-        # ---- COST (VERY GUARDED) ----
-        if meta.get("Cost Confidence") != "High":
-            v = data.get("Cost")
-            if v and v != "Not detected":
-                m = re.search(r"(rm|usd)\s?\d+(?:,\d{3})*(?:\.\d{2})?", v, re.I)
-                if m:
-                    meta["Cost Amount"] = re.search(r"\d+(?:,\d{3})*(?:\.\d{2})?", v).group(0).replace(",", "")
-                    meta["Cost Currency"] = m.group(1).upper()
-                    meta["Cost Confidence"] = "Medium"
-                    meta["Flags"] += ";GEMINI_COST"
-
-        # ---- TRAINER ----
-        if meta.get("Trainer Confidence") != "High":
-            v = data.get("Trainer")
-            if v and v != "Not detected":
-                meta["Trainer"] = v
-                meta["Trainer Confidence"] = "Medium"
-                meta["Flags"] += ";GEMINI_TRAINER"
-
-        # ---- ORGANISER ----
-        if meta.get("Organiser Confidence") != "High":
-            v = data.get("Organiser")
-            if v and v != "Not detected":
-                meta["Training Organiser"] = normalize_organiser(v)
-                meta["Organiser Confidence"] = "Medium"
-                meta["Flags"] += ";GEMINI_ORG"
+        data = json.loads(response_text)
+
+        apply_gemini_result(meta, data)
+
+    except CircuitOpenError:
+        # Upstream is failing: keep Layer 1/2 results and move on
+        print("[Gemini] Skipped (circuit open)")
+        meta["Flags"] += GEMINI_SKIPPED_FLAG
 
     except Exception as e:
         print("[Gemini Error]", e)
+        meta["Flags"] += GEMINI_ERROR_FLAG
 
     return meta
+
+
+# ======================================================
+# BATCH MODE: SEVERAL BROCHURES PER REQUEST
+# ======================================================
+
+def _packed_validator(doc_ids):
+    def validate(text):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return False
+        return isinstance(data, dict) and all(isinstance(data.get(d), dict) for d in doc_ids)
+    return validate
+
+
+def gemini_fallback_batch(items, pack_size=LLM_PACK_SIZE):
+    """
+    Layer 3 for many brochures at once.
+
+    items: list of (meta, text). Brochures that still need Gemini are packed
+    `pack_size` at a time into one prompt with per-document JSON results.
+    If a packed response can't be parsed (or misses a document), those
+    brochures fall back to one gemini_fallback call each.
+    Returns the metas, updated in place, in input order.
+    """
+    pending = [(meta, text) for meta, text in items if needs_llm(meta)]
+    if pack_size <= 1:
+        for meta, text in pending:
+            gemini_fallback(meta, text)
+        return [meta for meta, _ in items]
+
+    for start in range(0, len(pending), pack_size):
+        pack = pending[start:start + pack_size]
+        if len(pack) == 1:
+            gemini_fallback(*pack[0])
+            continue
+
+        prompt, doc_fields = build_batch_prompt(pack)
+        doc_ids = list(doc_fields)
+        print(f"[Gemini] Packed request: {len(pack)} brochures ({len(prompt)} chars)")
+
+        try:
+            response_text = get_llm_client().generate(
+                prompt, MODEL_NAME, GENERATION_CONFIG,
+                validate=_packed_validator(doc_ids)
+            )
+            data = json.loads(response_text)
+
+        except CircuitOpenError:
+            print("[Gemini] Skipped packed request (circuit open)")
+            for meta, _ in pack:
+                meta["Flags"] += GEMINI_SKIPPED_FLAG
+            continue
+
+        except Exception as e:
+            print("[Gemini] Packed request failed, retrying one by one:", e)
+            data = None
+
+        for doc_id, (meta, text) in zip(doc_ids, pack):
+            result = data.get(doc_id) if isinstance(data, dict) else None
+            if isinstance(result, dict):
+                apply_gemini_result(meta, result)
+            else:
+                gemini_fallback(meta, text)
+
+    return [meta for meta, _ in items]
@@ -0,0 +1,83 @@
+import os
+import json
+import hashlib
+import threading
+
+from utils.disk_cache import JsonDiskCache
+
+
+# CONFIG
+LLM_CACHE_DIR = os.path.join("cache", "llm")
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_MB", 50)) * 1024 * 1024
+LLM_CACHE_TTL_SECONDS = int(float(os.environ.get("LLM_CACHE_TTL_HOURS", 24 * 30)) * 3600)
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE", "1") != "0"
+
+
+def llm_cache_key(model_name, generation_config, prompt, backend=None):
+    """
+    Key = model name + generation config + SHA-256 of the prompt text,
+    plus the backend that answered when given (so fake / replayed answers
+    never come back from the cache on a Gemini run). Recordings are keyed
+    without it: the same prompt replays whatever backend recorded it.
+    """
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    fields = {"model": model_name, "config": generation_config or {}, "prompt": prompt_hash}
+    if backend:
+        fields["backend"] = backend
+    material = json.dumps(fields, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    On-disk cache of raw LLM response text, with TTL and size-based LRU
+    eviction. Only responses that pass the caller's validation are stored.
+    """
+
+    def __init__(self, directory=LLM_CACHE_DIR, max_bytes=LLM_CACHE_MAX_BYTES, ttl_seconds=LLM_CACHE_TTL_SECONDS):
+        self.store = JsonDiskCache(directory, max_bytes, ttl_seconds=ttl_seconds)
+
+    def get(self, model_name, generation_config, prompt, backend=None):
+        return self.store.get(llm_cache_key(model_name, generation_config, prompt, backend))
+
+    def put(self, model_name, generation_config, prompt, text, backend=None):
+        self.store.put(llm_cache_key(model_name, generation_config, prompt, backend), text)
+
+    def stats(self):
+        return self.store.stats()
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_llm_cache():
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = LLMResponseCache()
+        return _CACHE
+
+
+def cached_generate(model_name, generation_config, prompt, call, validate=None, backend=None):
+    """
+    Return the response text for `prompt`, from cache when possible.
+    backend: name of the backend `call` goes to (part of the key).
+
+    call(prompt) -> str performs the real request on a miss.
+    validate(text) -> bool decides whether a fresh response is worth
+    caching (e.g. it parses as the expected JSON).
+    """
+    if not LLM_CACHE_ENABLED:
+        return call(prompt)
+
+    cache = get_llm_cache()
+    text = cache.get(model_name, generation_config, prompt, backend)
+    if text is not None:
+        print("[LLM Cache] Hit")
+        return text
+
+    text = call(prompt)
+    if text and (validate is None or validate(text)):
+        cache.put(model_name, generation_config, prompt, text, backend)
+    return text
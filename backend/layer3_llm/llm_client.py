@@ -0,0 +1,218 @@
+import os
+import time
+import random
+import threading
+
+from layer3_llm.llm_cache import cached_generate
+from layer3_llm.backends import create_backend
+
+
+# CONFIG
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", 20))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 2))
+LLM_BACKOFF_BASE = 0.5
+LLM_BACKOFF_MAX = 4.0
+
+# Consecutive failed calls before the breaker opens, and how long it
+# stays open before letting a single trial call through
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("LLM_BREAKER_FAILURES", 5))
+BREAKER_RESET_SECONDS = float(os.environ.get("LLM_BREAKER_RESET_SECONDS", 60))
+
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the LLM while the breaker is open."""
+
+
+class LLMDeadlineError(TimeoutError):
+    """Raised when retries would run past the call's deadline."""
+
+
+# CIRCUIT BREAKER
+class CircuitBreaker:
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = ""
+
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN and time.time() - self.opened_at >= self.reset_seconds:
+                self.state = HALF_OPEN
+
+            # Half-open: exactly one trial call at a time
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)[:300]
+            self._trial_in_flight = False
+
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            out = {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_seconds": self.reset_seconds,
+                "opened_at": self.opened_at,
+                "last_error": self.last_error,
+            }
+            if self.state == OPEN:
+                out["retry_in_seconds"] = round(max(0.0, self.opened_at + self.reset_seconds - time.time()), 1)
+            return out
+
+
+# CLIENT
+class LLMClient:
+    """
+    Resilient wrapper around an LLM backend (layer3_llm/backends.py,
+    Gemini by default, LLM_BACKEND=fake for offline runs):
+        - response cache (layer3_llm/llm_cache.py)
+        - per-call deadline, bounded retries with jittered backoff
+        - circuit breaker that fails fast while the upstream is down
+    """
+
+    def __init__(self, timeout=LLM_TIMEOUT_SECONDS, max_retries=LLM_MAX_RETRIES, breaker=None, backend=None):
+        self.backend = backend or create_backend()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.short_circuited = 0
+
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, model_name, generation_config=None, validate=None, timeout=None):
+        """
+        Returns the response text. Raises CircuitOpenError while the
+        breaker is open, or the last error once retries/deadline are spent.
+        """
+        def call(p):
+            return self._call(p, model_name, generation_config, timeout or self.timeout)
+
+        return cached_generate(model_name, generation_config, prompt, call,
+                               validate=validate, backend=self.backend_name)
+
+    @property
+    def backend_name(self):
+        """
+        Backend whose answers this client returns ("gemini", "fake");
+        recording doesn't change them, so it is looked through.
+        """
+        return getattr(self.backend, "inner", self.backend).name
+
+    def status(self):
+        with self._lock:
+            counters = {
+                "calls": self.calls,
+                "retries": self.retries,
+                "failures": self.failures,
+                "short_circuited": self.short_circuited,
+            }
+        out = {
+            "backend": self.backend.name,
+            "breaker": self.breaker.snapshot(),
+            "timeout_seconds": self.timeout,
+            "max_retries": self.max_retries,
+            **counters,
+        }
+        if hasattr(self.backend, "stats"):
+            out["backend_stats"] = self.backend.stats()
+        return out
+
+    def _call(self, prompt, model_name, generation_config, timeout):
+        if not self.breaker.allow():
+            with self._lock:
+                self.short_circuited += 1
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        with self._lock:
+            self.calls += 1
+
+        deadline = time.monotonic() + timeout
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                last_error = last_error or LLMDeadlineError("LLM deadline exceeded")
+                break
+
+            try:
+                text = self.backend.generate(prompt, model_name, generation_config, timeout=remaining)
+                self.breaker.record_success()
+                return text
+            except Exception as e:
+                last_error = e
+
+            if attempt == self.max_retries:
+                break
+
+            # Exponential backoff with full jitter, never past the deadline
+            backoff = random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+            if time.monotonic() + backoff >= deadline:
+                break
+            with self._lock:
+                self.retries += 1
+            time.sleep(backoff)
+
+        with self._lock:
+            self.failures += 1
+        self.breaker.record_failure(last_error)
+        raise last_error
+
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_llm_client():
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = LLMClient()
+        return _CLIENT
+
+
+def set_llm_client(client):
+    """
+    Replace the shared client (benchmarks / tests with their own backend,
+    breaker or retry settings). None goes back to the default on next use.
+    """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        _CLIENT = client
+        return client
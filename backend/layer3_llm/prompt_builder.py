@@ -0,0 +1,313 @@
+import re
+
+from layer1_text.patterns import MONTHS
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# Total characters of document context sent to the LLM
+PROMPT_CONTEXT_CHARS = 4000
+
+# The first page head (title, dates, logos) is always included
+HEAD_CHARS = 800
+
+# Characters kept before / after each anchor hit
+WINDOW_BEFORE = 150
+WINDOW_AFTER = 350
+
+# Context windows taken per field, and anchor hits scanned per field
+MAX_HITS_PER_FIELD = 4
+MAX_ANCHOR_SCAN = 200
+
+# A window must add at least this many new characters to be worth it
+MIN_WINDOW_GAIN = 80
+
+
+# ======================================================
+# FIELD SPECS
+# ======================================================
+# Each low-confidence field contributes its instructions, its JSON key and
+# the anchors used to pick context windows out of the full text.
+
+FIELD_SPECS = [
+    {
+        "key": "Program Title",
+        "confidence": "Program Title Confidence",
+        "instructions": """PROGRAM TITLE: This is usually the largest text on the first page.
+   - Capture the FULL title, including any colon-separated subtitles or theme names.
+   - Do NOT shorten or summarise.
+   - Example: If it says "PROJECT MANAGEMENT: THE AGILE WAY", do NOT just return "Project Management".
+   - Do not add words like "Conference" if they aren't part of the main title block.""",
+        "anchors": [
+            r"(course|program|programme)\s+title",
+        ],
+    },
+    {
+        "key": "Program Date",
+        "confidence": "Program Date Confidence",
+        "instructions": """PROGRAM DATE: Look for the specific days of the event.
+   - If a range is provided (e.g., 21-22 July), you MUST return the full range.
+   - Do not return just a single day or a registration deadline.
+   - If the programme has multiple sessions in different locations, return ALL sessions in a single string, separated by semicolons.
+   - Example: "Malaysia: 3–7 June 2025; Singapore: 10–14 June 2025\"""",
+        "anchors": [
+            rf"\d{{1,2}}(?:st|nd|rd|th)?\s*(?:[-–—]|to)?\s*(?:\d{{1,2}}(?:st|nd|rd|th)?\s*)?(?:{MONTHS})\b",
+            r"\b(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b",
+            r"\bdates?\b",
+        ],
+    },
+    {
+        "key": "Venue",
+        "confidence": "Venue Confidence",
+        "instructions": """PROGRAM VENUE: Extract the full venue name as stated.
+   - Might be hotel names, conference centers, or online platforms.
+   - If more than one venue is listed, extract the primary one.""",
+        "anchors": [
+            r"\bvenue\b",
+            r"\b(?:hotel|hall|centre|center|campus|auditorium)\b",
+            r"\b(?:online|virtual|zoom|microsoft teams|webex)\b",
+        ],
+    },
+    {
+        "key": "Cost",
+        "confidence": "Cost Confidence",
+        "instructions": """COST: Extract the exact cost amount and currency as stated.
+   - If multiple costs are listed, extract the main program cost.
+   - If there is a discounted price and a normal price, extract the discounted price.
+   - If there is with and without accommodation prices, extract the without accommodation price.
+   - If there are member and non-member prices, extract the non-member price.""",
+        "anchors": [
+            r"\b(?:rm|usd)\s?\d",
+            r"\b(?:fees?|price|investment|early bird|promo|per pax|per person)\b",
+        ],
+    },
+    {
+        "key": "Trainer",
+        "confidence": "Trainer Confidence",
+        "instructions": """TRAINER: Extract the main trainer / speaker name(s) as stated.
+   - If multiple trainers are listed, extract all names in a single string, separated by semicolons.""",
+        "anchors": [
+            r"\b(?:trainer|faculty|speaker|facilitator)\s+profiles?\b",
+            r"\b(?:lead trainer|course leader|trainer|speaker|facilitator)\b",
+            r"\b(?:conducted|presented|facilitated) by\b",
+        ],
+    },
+    {
+        "key": "Organiser",
+        "confidence": "Organiser Confidence",
+        "instructions": """ORGANISER: Extract the full organiser name as stated.
+   - If multiple organisers are listed, extract the primary one.
+   - Usually the organiser is found at the logo or footer section.""",
+        "anchors": [
+            r"\b(?:organi[sz]ed|hosted|delivered) by\b",
+            r"\bpayable to\b",
+            r"\babout (?:us|the organi[sz]er)\b",
+            r"\b(?:sdn\.? bhd|berhad)\b",
+            r"(?:©|copyright)",
+        ],
+    },
+]
+
+_COMPILED_ANCHORS = {
+    spec["key"]: [re.compile(a, re.I) for a in spec["anchors"]]
+    for spec in FIELD_SPECS
+}
+
+
+# ======================================================
+# FIELD SELECTION
+# ======================================================
+
+def low_confidence_fields(meta):
+    """
+    JSON keys of the fields Layer 3 should look for (confidence < High).
+    """
+    return [spec["key"] for spec in FIELD_SPECS if meta.get(spec["confidence"]) != "High"]
+
+
+# ======================================================
+# CONTEXT WINDOWS
+# ======================================================
+
+def build_context(text, fields, budget=PROMPT_CONTEXT_CHARS):
+    """
+    Compact excerpt of `text` for the requested fields:
+    the document head plus windows around each field's anchors,
+    taken round-robin across fields until the budget is spent and merged
+    back into document order.
+    """
+    text = re.sub(r"\n\s*\n+", "\n", text or "").strip()
+    if len(text) <= budget:
+        return text
+
+    spans = [(0, min(HEAD_CHARS, len(text)))]
+    used = spans[0][1]
+
+    per_field = []
+    for key in fields:
+        hits = set()
+        for pattern in _COMPILED_ANCHORS.get(key, []):
+            for m in pattern.finditer(text):
+                hits.add(m.start())
+                if len(hits) >= MAX_ANCHOR_SCAN:
+                    break
+        per_field.append(sorted(hits))
+
+    # Round-robin so one field with many hits can't starve the others;
+    # hits already covered by an earlier window are skipped
+    taken = [0] * len(per_field)
+    cursor = [0] * len(per_field)
+    progress = True
+
+    while progress and used < budget:
+        progress = False
+        for f, hits in enumerate(per_field):
+            if taken[f] >= MAX_HITS_PER_FIELD or used >= budget:
+                continue
+
+            while cursor[f] < len(hits):
+                pos = hits[cursor[f]]
+                cursor[f] += 1
+
+                start = max(0, pos - WINDOW_BEFORE)
+                end = min(len(text), pos + WINDOW_AFTER, start + (budget - used) + WINDOW_BEFORE)
+                added = _span_gain(spans, start, end)
+                if added < MIN_WINDOW_GAIN:
+                    continue
+
+                if used + added > budget:
+                    end -= (used + added - budget)
+                    added = _span_gain(spans, start, end)
+
+                spans.append((start, end))
+                used += added
+                taken[f] += 1
+                progress = True
+                break
+
+    return "\n...\n".join(text[s:e].strip() for s, e in _merge_spans(spans))
+
+
+def _merge_spans(spans):
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _span_gain(spans, start, end):
+    """
+    Characters of [start, end) not already covered by `spans`.
+    """
+    covered = 0
+    for s, e in _merge_spans(spans):
+        covered += max(0, min(e, end) - max(s, start))
+    return max(0, (end - start) - covered)
+
+
+# ======================================================
+# PROMPT
+# ======================================================
+
+def build_field_instructions(fields):
+    specs = [s for s in FIELD_SPECS if s["key"] in fields]
+    return "\n\n".join(f"{i}. {s['instructions']}" for i, s in enumerate(specs, 1))
+
+
+def build_json_schema(fields):
+    return "{\n" + ",\n".join(f'    "{f}": "..."' for f in fields) + "\n}"
+
+
+def build_extraction_prompt(meta, text, budget=PROMPT_CONTEXT_CHARS):
+    """
+    Returns (prompt, fields) asking only for the low-confidence fields,
+    with document context assembled around their anchors.
+    """
+    fields = low_confidence_fields(meta)
+    context = build_context(text, fields, budget)
+
+    prompt = f"""You are a professional data entry clerk. Your goal is to extract EXACT metadata from a training brochure.
+
+CRITICAL RULES:
+- Do NOT guess.
+- Do NOT summarise.
+- Extract ONLY if explicitly stated.
+- Preserve original wording, currency, and numbers.
+- If a field is NOT found, return "Not detected" for that field.
+
+CRITICAL INSTRUCTIONS:
+{build_field_instructions(fields)}
+
+Return ONLY valid JSON with exactly these keys:
+{build_json_schema(fields)}
+
+Document text (excerpts, "..." marks skipped parts):
+{context}"""
+
+    return prompt, fields
+
+
+# ======================================================
+# PACKED (MULTI-BROCHURE) PROMPT
+# ======================================================
+
+# Context per brochure when several share one request
+PACKED_CONTEXT_CHARS = 2500
+
+
+def build_batch_prompt(items, budget_per_doc=PACKED_CONTEXT_CHARS):
+    """
+    One prompt covering several brochures.
+
+    items: list of (meta, text).
+    Returns (prompt, doc_fields) where doc_fields maps each document id
+    ("doc1", "doc2", ...) to the fields requested for it. The expected
+    answer is a JSON object keyed by those ids.
+    """
+    doc_fields = {}
+    sections = []
+    all_fields = set()
+
+    for i, (meta, text) in enumerate(items, 1):
+        doc_id = f"doc{i}"
+        fields = low_confidence_fields(meta)
+        doc_fields[doc_id] = fields
+        all_fields.update(fields)
+
+        context = build_context(text, fields, budget_per_doc)
+        sections.append(
+            f'=== DOCUMENT "{doc_id}" ===\n'
+            f"Fields to extract: {', '.join(fields)}\n"
+            f"Document text (excerpts, \"...\" marks skipped parts):\n{context}"
+        )
+
+    ordered_fields = [s["key"] for s in FIELD_SPECS if s["key"] in all_fields]
+    schema = "{\n" + ",\n".join(
+        f'    "{doc_id}": ' + build_json_schema(fields).replace("\n", "\n    ")
+        for doc_id, fields in doc_fields.items()
+    ) + "\n}"
+    documents = "\n\n".join(sections)
+
+    prompt = f"""You are a professional data entry clerk. Your goal is to extract EXACT metadata from several training brochures.
+Each brochure is a separate document; never mix information between documents.
+
+CRITICAL RULES:
+- Do NOT guess.
+- Do NOT summarise.
+- Extract ONLY if explicitly stated in that document.
+- Preserve original wording, currency, and numbers.
+- If a field is NOT found, return "Not detected" for that field.
+
+CRITICAL INSTRUCTIONS:
+{build_field_instructions(ordered_fields)}
+
+Return ONLY valid JSON with one object per document id, each with exactly the keys listed for that document:
+{schema}
+
+{documents}"""
+
+    return prompt, doc_fields
@@ -1,5 +1,7 @@
 import os
-import pandas as pd
+import time
+from contextlib import contextmanager
+
 
 from utils.text_extraction import (
     extract_text_with_fallback,
@@ -7,11 +9,30 @@ from utils.text_extraction import (
 )
 
 from layer1_text.metadata_extraction import extract_metadata
-from layer1_text.hrdc_detection import detect_hrdc_logo
+from layer1_text.hrdc_detection import detect_hrdc_logo, get_hrdc_detector
 from layer2_layout.layout_inference import layout_fallback
-from layer3_llm.gemini_fallback import gemini_fallback
+from layer3_llm.gemini_fallback import (
+    gemini_fallback,
+    gemini_fallback_batch,
+    llm_degraded,
+    CONFIDENCE_KEYS,
+    LLM_PACK_SIZE,
+)
+from layer3_llm.llm_client import get_llm_client
 from utils.contract import to_contract
-from category_classification import classify_brochure_category
+from utils.pdf_session import PdfSession, pdf_session, source_path
+from utils.result_cache import get_result_cache, pipeline_fingerprint, RESULT_CACHE_ENABLED
+from utils.text_extraction import TEXT_EXTRACTION_MODE
+from utils.worker_pool import WorkerPool, Progress
+from utils.batch_checkpoint import BatchCheckpoint
+from utils.batch_workbook import write_workbook
+from utils.batch_manifest import BatchManifest, FORCED, plan_summary
+from category_classification import (
+    classify_brochure_category,
+    classify_brochure_categories,
+    get_category_index,
+    DEFAULT_MODEL_NAME
+)
 
 def is_high(conf):
     return conf == "High"
@@ -19,149 +40,465 @@ def is_high(conf):
 # CONFIG (Batch mode only)
 BROCHURE_FOLDER = "brochures"
 OUTPUT_EXCEL = "brochure_metadata.xlsx"
+BATCH_SHEETS = ("READY_TO_FILL", "PENDING_REVIEW")
 
+# Append-only record of finished brochures and the manifest of the files
+# they came from; a rerun only processes new / changed brochures
+# (BATCH_RESUME=0 starts over)
+BATCH_CHECKPOINT = os.path.join("output", "batch_checkpoint.jsonl")
+BATCH_RESUME = os.environ.get("BATCH_RESUME", "1") != "0"
 
-# SINGLE PDF PROCESSOR (API MODE)
-def process_single_pdf(pdf_path: str) -> dict:
+# Serial batch mode: Layer 3 runs every LLM_PACK_SIZE brochures (one packed
+# Gemini request, whose answer lands in the LLM cache), while category
+# classification and the checkpoint write happen every CLASSIFY_BATCH_SIZE
+# brochures so the embedding model encodes large batches. A crash redoes
+# at most one classification batch of local work; its Gemini answers
+# come back from the cache.
+CLASSIFY_BATCH_SIZE = int(os.environ.get("CLASSIFY_BATCH_SIZE", 256))
+
+# Worker processes for batch mode. 1 keeps the in-process runner, which
+# packs Layer 3 requests and classifies brochures in batches; more runs
+# process_single_pdf in parallel worker processes (see utils/worker_pool.py
+# for the per-file timeout and worker recycling settings)
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", 1))
+
+# LMS category catalog (shared by API and batch mode)
+CATEGORY_DOCX = "assets/LMS Categories final.docx"
+
+
+def warm_category_index():
+    """
+    Build the process-wide category index up front so the first brochure
+    does not pay for model loading and catalog encoding.
+    """
+    return get_category_index(CATEGORY_DOCX)
+
+
+def result_fingerprint():
+    """
+    Version fingerprint for cached results: pipeline version, LMS catalog
+    content, embedding model, text extraction mode and LLM backend (fake
+    or replayed Layer 3 answers must not be served to a Gemini run).
+    """
+    return pipeline_fingerprint(
+        CATEGORY_DOCX, DEFAULT_MODEL_NAME, TEXT_EXTRACTION_MODE, get_llm_client().backend_name
+    )
+
+
+def _cache_lookup(cache, pdf_path, timings=None):
+    """
+    Returns (cache_key, cached_payload_or_None).
+    """
+    with _timed(timings, "cache"):
+        key = cache.key_for(pdf_path, result_fingerprint())
+        cached = cache.get(key, source_file=os.path.basename(pdf_path))
+
+    if cached is not None:
+        print(f"[Cache] Hit for {os.path.basename(pdf_path)}")
+    return key, cached
+
+
+def warm_models():
+    """
+    Load everything that is shared across documents: the category index
+    and the HRDC reference logo hash.
+    """
+    get_hrdc_detector()
+    warm_category_index()
+
+
+@contextmanager
+def _timed(timings, key):
+    """
+    Record the wall time of a pipeline stage in timings[key] (seconds).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[key] = round(time.perf_counter() - start, 3)
+
+
+# LAYERS 1-3 (shared by API and batch mode)
+def extract_brochure_meta(pdf, timings=None, run_llm=True):
     """
     Progressive 3-layer extraction:
     Layer 1 → Text-only
     Layer 2 → Layout-aware
     Layer 3 → LLM (Gemini)
+
+    pdf: file path or an open PdfSession. All layers share one session,
+    so the PDF is opened and parsed once.
+    timings: optional dict that receives per-layer wall times (seconds).
+    run_llm: False leaves Layer 3 to the caller (batch mode packs several
+    brochures into one Gemini request, see _flush_batch).
+
+    Returns:
+        meta (dict), text (str), method (str)
     """
 
-    # Render Restart
-    safe_payload = {
-        "status": "ERROR",
-        "error": "",
-        "source_file": os.path.basename(pdf_path),
-    }
+    for d in ["temp", "output", "images", "cache", "drafts"]:
+        os.makedirs(d, exist_ok=True)
 
-    try:
-        for d in ["temp", "output", "images", "cache", "drafts"]:
-            os.makedirs(d, exist_ok=True)
+    with pdf_session(pdf) as session:
+        return _extract_layers(session, timings, run_llm)
 
-        # LAYER 1 — TEXT ONLY
-        print("[Layer 1] Text extraction")
-        text, method = extract_text_with_fallback(pdf_path)
+
+def _extract_layers(session, timings=None, run_llm=True):
+    # LAYER 1 — TEXT ONLY
+    print("[Layer 1] Text extraction")
+    with _timed(timings, "layer1"):
+        text, method = extract_text_with_fallback(session)
         meta = extract_metadata(text)
         text_hrdc = meta["HRDC Certified"] == "Yes"
 
         try:
-            logo_hrdc = detect_hrdc_logo(pdf_path)
+            logo_hrdc = detect_hrdc_logo(session)
         except Exception:
             logo_hrdc = False
             meta["Flags"] += "; HRDC_LOGO_ERROR"
 
-        if logo_hrdc or text_hrdc:
-            meta["HRDC Certified"] = "Yes"
-            meta["HRDC Confidence"] = "High" if logo_hrdc else "Medium"
-            if logo_hrdc:
-                meta["Flags"] += "; HRDC_LOGO_DETECTED"
-        else:
-            meta["HRDC Certified"] = "No"
-            meta["HRDC Confidence"] = "Low"
-
-
-        # LAYER 2 — LAYOUT AWARE
-        if any(meta.get(k) != "High" for k in [
-            "Program Title Confidence",
-            "Program Date Confidence",
-            "Venue Confidence", 
-            "Cost Confidence",
-            "Trainer Confidence",
-            "Organiser Confidence"
-        ]):
-            print("[Layer 2] Layout fallback triggered")
-            layout_pages = extract_layout_blocks_native(pdf_path)
-            meta = layout_fallback(meta, layout_pages, pdf_path)
-        else:
-            print("[Layer 2] Skipped (confidence already high)")
-
-        # LAYER 3 — LLM FALLBACK
-        if any(meta.get(k) != "High" for k in [
-            "Program Title Confidence",
-            "Program Date Confidence",
-            "Venue Confidence", 
-            "Cost Confidence",
-            "Trainer Confidence",
-            "Organiser Confidence"
-        ]):
-            print("[Layer 3] LLM (Gemini) fallback triggered")
+    if logo_hrdc or text_hrdc:
+        meta["HRDC Certified"] = "Yes"
+        meta["HRDC Confidence"] = "High" if logo_hrdc else "Medium"
+        if logo_hrdc:
+            meta["Flags"] += "; HRDC_LOGO_DETECTED"
+    else:
+        meta["HRDC Certified"] = "No"
+        meta["HRDC Confidence"] = "Low"
+
+
+    # LAYER 2 — LAYOUT AWARE
+    if any(meta.get(k) != "High" for k in CONFIDENCE_KEYS):
+        print("[Layer 2] Layout fallback triggered")
+        with _timed(timings, "layer2"):
+            layout_pages = extract_layout_blocks_native(session)
+            meta = layout_fallback(meta, layout_pages, session)
+    else:
+        print("[Layer 2] Skipped (confidence already high)")
+
+    # LAYER 3 — LLM FALLBACK
+    if not run_llm:
+        print("[Layer 3] Deferred to packed batch request")
+    elif any(meta.get(k) != "High" for k in CONFIDENCE_KEYS):
+        print("[Layer 3] LLM (Gemini) fallback triggered")
+        with _timed(timings, "layer3"):
             meta = gemini_fallback(meta, text)
+    else:
+        print("[Layer 3] Skipped (confidence already high)")
+
+    return meta, text, method
+
+
+# STANDARDISATION + JSON-SAFE OUTPUT
+def finalize_payload(meta: dict, pdf, method: str) -> dict:
+    """
+    pdf: file path or PdfSession (a closed session still carries the
+    Layer 1 HRDC logo result, so the PDF is not scanned again).
+    """
+    payload = to_contract(
+        meta,
+        source_file=os.path.basename(source_path(pdf)),
+        pdf_path=pdf,
+        method=method
+    )
+
+    # FORCE JSON-SAFE OUTPUT
+    safe_payload = {}
+    for k, v in payload.items():
+        if v is None:
+            safe_payload[k] = ""
+        elif isinstance(v, (str, int, float, bool)):
+            safe_payload[k] = v
         else:
-            print("[Layer 3] Skipped (confidence already high)")
+            safe_payload[k] = str(v)
+
+    return safe_payload
+
+
+def error_payload(pdf, error) -> dict:
+    return {
+        "status": "ERROR",
+        "error": str(error),
+        "source_file": os.path.basename(source_path(pdf)),
+    }
+
+
+# SINGLE PDF PROCESSOR (API MODE)
+def process_single_pdf(pdf_path: str, timings=None, use_cache=RESULT_CACHE_ENABLED) -> dict:
+    """
+    Layers 1-3, category classification and standardisation for one PDF.
+    Never raises: failures come back as an ERROR payload.
+    timings: optional dict that receives per-stage wall times (seconds).
+    use_cache: reuse/store results keyed by the PDF's SHA-256 and the
+    pipeline fingerprint (see utils/result_cache.py).
+    """
+
+    cache = get_result_cache() if use_cache else None
+
+    try:
+        if cache is not None:
+            cache_key, cached = _cache_lookup(cache, pdf_path, timings)
+            if cached is not None:
+                return cached
+
+        with _timed(timings, "total"), PdfSession(pdf_path) as session:
+            meta, text, method = extract_brochure_meta(session, timings)
 
-        # CATEGORY CLASSIFICATION 
-        final_cat, cat_conf = classify_brochure_category(
-            meta=meta,
-            brochure_text=text,
-            docx_path="assets/LMS Categories final.docx",
+            # CATEGORY CLASSIFICATION 
+            with _timed(timings, "category"):
+                final_cat, cat_conf = classify_brochure_category(
+                    meta=meta,
+                    brochure_text=text,
+                    docx_path=CATEGORY_DOCX,
+                    top_k=5,
+                    use_gemini=False
+                )
+            meta["LMS Category"] = final_cat
+            meta["LMS Category Confidence"] = cat_conf
+
+            with _timed(timings, "contract"):
+                payload = finalize_payload(meta, session, method)
+
+        # Don't pin a result produced while Gemini was unavailable
+        if cache is not None and not llm_degraded(meta):
+            cache.put(cache_key, payload)
+        return payload
+    
+    except Exception as e:
+        # Return the default error payload safely
+        return error_payload(pdf_path, e)
+
+
+# BATCH CLASSIFICATION + STANDARDISATION
+def _batch_layer3(pending):
+    """
+    LAYER 3 — packed LLM fallback for the pending brochures still below High.
+    """
+    needs_llm = [(meta, text) for _, meta, text, _, _ in pending
+                 if any(meta.get(k) != "High" for k in CONFIDENCE_KEYS)]
+    if needs_llm:
+        print(f"[Layer 3] LLM (Gemini) fallback for {len(needs_llm)} brochures")
+        gemini_fallback_batch(needs_llm)
+
+
+def _flush_batch(pending, emit, llm_done=0):
+    """
+    pending: list of (session, meta, text, method, cache_key) that passed
+    Layers 1-2. Sessions are already closed; only their memoised results
+    are used. The first `llm_done` have already been through Layer 3.
+    Runs Layer 3 for the rest, classifies all of them in one batch and
+    hands each final payload to emit(file, payload).
+    """
+    if not pending:
+        return
+
+    _batch_layer3(pending[llm_done:])
+
+    try:
+        categories = classify_brochure_categories(
+            [(meta, text) for _, meta, text, _, _ in pending],
+            docx_path=CATEGORY_DOCX,
             top_k=5,
-            use_gemini=False
+            batch_size=CLASSIFY_BATCH_SIZE,
         )
+    except Exception as e:
+        for session, _, _, _, _ in pending:
+            emit(session.name, error_payload(session, e))
+        pending.clear()
+        return
+
+    cache = get_result_cache() if RESULT_CACHE_ENABLED else None
+
+    for (session, meta, _, method, cache_key), (final_cat, cat_conf) in zip(pending, categories):
         meta["LMS Category"] = final_cat
         meta["LMS Category Confidence"] = cat_conf
+        try:
+            payload = finalize_payload(meta, session, method)
+        except Exception as e:
+            payload = error_payload(session, e)
 
-        # STANDARDISATION 
-        payload = to_contract(
-            meta,
-            source_file=os.path.basename(pdf_path),
-            pdf_path=pdf_path,
-            method=method
-        )
+        if cache is not None and cache_key and not llm_degraded(meta):
+            cache.put(cache_key, payload)
+        emit(session.name, payload)
 
-        # FORCE JSON-SAFE OUTPUT
-        safe_payload = {}
-        for k, v in payload.items():
-            if v is None:
-                safe_payload[k] = ""
-            elif isinstance(v, (str, int, float, bool)):
-                safe_payload[k] = v
-            else:
-                safe_payload[k] = str(v)
+    pending.clear()
 
-        return safe_payload
-    
-    except Exception as e:
-        # Fill the default error payload and return safely
-        safe_payload["error"] = str(e)
-        return safe_payload
 
 # BATCH PROCESSOR (OFFLINE MODE)
-def run_batch_pipeline():
+def batch_pdf_paths(folder=BROCHURE_FOLDER):
+    return [
+        os.path.join(folder, file)
+        for file in sorted(os.listdir(folder))
+        if file.lower().endswith(".pdf")
+    ]
+
+
+def run_batch_pipeline(workers=BATCH_WORKERS, resume=BATCH_RESUME, force=()):
     """
-    Process ALL PDFs in brochures/ and write Excel output.
+    Process new or changed PDFs in brochures/ and write Excel output.
+
+    Each finished brochure is appended to the BATCH_CHECKPOINT JSONL file
+    straight away, together with its manifest entry (size, mtime, SHA-256
+    and result fingerprint, see utils/batch_manifest.py). A rerun only
+    processes brochures that are new, changed, produced by another
+    pipeline / LMS catalog / model version, or last ended in ERROR; the
+    rest keep their previous result. The workbook is then streamed from
+    the checkpoint for the brochures currently in the folder.
+
+    workers: 1 runs in-process (see _run_batch_serial); more fans the
+    brochures out to a WorkerPool (see _run_batch_parallel).
+    resume: False ignores (and replaces) the existing checkpoint.
+    force: file name globs reprocessed regardless of the manifest, with
+    the result cache bypassed.
     """
 
-    rows = []
+    checkpoint = BatchCheckpoint(BATCH_CHECKPOINT)
+    manifest = BatchManifest.from_checkpoint(checkpoint) if resume else BatchManifest()
 
-    for file in os.listdir(BROCHURE_FOLDER):
-        if not file.lower().endswith(".pdf"):
-            continue
+    all_paths = batch_pdf_paths()
+    todo, reused = manifest.plan(all_paths, result_fingerprint(), force)
+    print(f"[Batch] {plan_summary(todo, reused)}")
 
-        pdf_path = os.path.join(BROCHURE_FOLDER, file)
-        print(f"\n[Batch] Processing {file}")
+    sources = {os.path.basename(path): state for path, state, _ in todo}
+    forced = {os.path.basename(path) for path, _, reason in todo if reason == FORCED}
+    pdf_paths = [path for path, _, _ in todo]
+    progress = Progress(len(pdf_paths))
 
-        payload = process_single_pdf(pdf_path)
-        rows.append(payload)
+    with checkpoint.open(resume=resume):
+        def emit(file, payload):
+            # Counted once the brochure's final payload is written
+            checkpoint.add(file, payload, sources.get(file))
+            progress.update(payload.get("status") != "ERROR", file)
 
-    if not rows:
+        if workers > 1 and len(pdf_paths) > 1:
+            _run_batch_parallel(pdf_paths, workers, emit, forced)
+        else:
+            _run_batch_serial(pdf_paths, emit, forced)
+
+    current = {os.path.basename(p) for p in all_paths}
+
+    # Drop superseded records (older runs, removed brochures) once they
+    # make up most of the checkpoint
+    if manifest.records + len(todo) > 2 * max(1, len(current)):
+        before, after = checkpoint.compact(current)
+        print(f"[Batch] Compacted checkpoint: {before} → {after} records")
+
+    written = write_batch_excel(checkpoint, files=current)
+    if not written:
         print("No brochures found.")
         return
 
-    df = pd.DataFrame(rows)
+    summary = progress.summary()
+    print(
+        f"\nBatch completed → {OUTPUT_EXCEL} "
+        f"({summary['done']} processed in {summary['seconds']}s, "
+        f"{summary['docs_per_sec']} docs/s; {len(reused)} reused)"
+    )
+
+
+def _run_batch_serial(pdf_paths, emit, forced=()):
+    """
+    Layers 1-2 one brochure at a time; Layer 3 (one packed Gemini request)
+    every LLM_PACK_SIZE brochures, category classification every
+    CLASSIFY_BATCH_SIZE. Payloads go to emit(file, payload) as each
+    classification batch is flushed. Files in `forced` skip the result
+    cache lookup.
+    """
+    pending = []
+    llm_done = 0     # pending[:llm_done] have been through Layer 3
+    warm_models()
+    cache = get_result_cache() if RESULT_CACHE_ENABLED else None
+
+    for pdf_path in pdf_paths:
+        file = os.path.basename(pdf_path)
+        print(f"\n[Batch] Processing {file}")
+
+        try:
+            cache_key = None
+            cached = None
+            if cache is not None and file not in forced:
+                cache_key, cached = _cache_lookup(cache, pdf_path)
+            elif cache is not None:
+                cache_key = cache.key_for(pdf_path, result_fingerprint())
+
+            if cached is not None:
+                emit(file, cached)
+            else:
+                with PdfSession(pdf_path) as session:
+                    meta, text, method = extract_brochure_meta(session, run_llm=False)
+                pending.append((session, meta, text, method, cache_key))
+        except Exception as e:
+            emit(file, error_payload(pdf_path, e))
+
+        if len(pending) - llm_done >= LLM_PACK_SIZE:
+            _batch_layer3(pending[llm_done:])
+            llm_done = len(pending)
+
+        if len(pending) >= CLASSIFY_BATCH_SIZE:
+            _flush_batch(pending, emit, llm_done)
+            llm_done = 0
 
-    ready = df[df["status"] == "READY_TO_FILL"]
-    review = df[df["status"] == "PENDING_REVIEW"]
+    _flush_batch(pending, emit, llm_done)
 
-    with pd.ExcelWriter(OUTPUT_EXCEL, engine="openpyxl") as writer:
-        ready.to_excel(writer, sheet_name="READY_TO_FILL", index=False)
-        review.to_excel(writer, sheet_name="PENDING_REVIEW", index=False)
 
-    print(f"\nBatch completed → {OUTPUT_EXCEL}")
+def process_batch_item(item):
+    """
+    WorkerPool task for batch / watch mode: item is (pdf_path, use_cache).
+    """
+    pdf_path, use_cache = item
+    return process_single_pdf(pdf_path, use_cache=use_cache)
+
+
+def _run_batch_parallel(pdf_paths, workers, emit, forced=()):
+    """
+    Full process_single_pdf per brochure in `workers` processes, each
+    warmed once (category index + HRDC reference hash). Payloads go to
+    emit(file, payload) in input order; a brochure that times out or
+    takes its worker down gets an ERROR payload. Files in `forced` run
+    without the result cache.
+    """
+    print(f"[Batch] {len(pdf_paths)} brochures on {workers} workers")
+
+    items = [
+        (path, RESULT_CACHE_ENABLED and os.path.basename(path) not in forced)
+        for path in pdf_paths
+    ]
+
+    with WorkerPool(process_batch_item, workers, initializer=warm_models) as pool:
+        for (pdf_path, _), ok, result in pool.map(items):
+            file = os.path.basename(pdf_path)
+            payload = result if ok else error_payload(pdf_path, result)
+            emit(file, payload)
+
+        print(f"[Batch] Workers: {pool.stats}")
+
+
+def write_batch_excel(checkpoint, path=OUTPUT_EXCEL, files=None):
+    """
+    READY_TO_FILL / PENDING_REVIEW workbook from the checkpoint's latest
+    payload per brochure (only those in `files` if given), streamed by
+    utils/batch_workbook.py.
+    Returns the number of brochures written out.
+    """
+    return write_workbook(checkpoint, path, BATCH_SHEETS, files)
 
 
 # ENTRY POINT
 if __name__ == "__main__":
-    run_batch_pipeline()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Batch-process brochures/ into brochure_metadata.xlsx")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--force", action="append", default=[], metavar="GLOB",
+                        help="reprocess matching file names even if unchanged (repeatable)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="ignore the checkpoint / manifest and process every brochure")
+    args = parser.parse_args()
+
+    run_batch_pipeline(
+        workers=args.workers,
+        resume=BATCH_RESUME and not args.fresh,
+        force=args.force,
+    )
@@ -0,0 +1,50 @@
+from utils.batch_checkpoint import BatchCheckpoint
+
+
+def _payload(file, status="READY_TO_FILL"):
+    return {"file": file, "status": status}
+
+
+def test_torn_last_line_is_ignored_and_next_record_starts_fresh(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = BatchCheckpoint(str(path))
+    with checkpoint.open():
+        checkpoint.add("a.pdf", _payload("a.pdf"))
+
+    # Crash in the middle of the next record
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"file": "b.pdf", "at": 1, "payl')
+
+    assert [r["file"] for r in checkpoint.records()] == ["a.pdf"]
+
+    with checkpoint.open():
+        checkpoint.add("b.pdf", _payload("b.pdf"))
+
+    assert [r["file"] for r in checkpoint.records()] == ["a.pdf", "b.pdf"]
+
+
+def test_latest_record_wins_and_compact_keeps_only_latest(tmp_path):
+    checkpoint = BatchCheckpoint(str(tmp_path / "checkpoint.jsonl"))
+    with checkpoint.open():
+        checkpoint.add("a.pdf", _payload("a.pdf", "ERROR"))
+        checkpoint.add("b.pdf", _payload("b.pdf"))
+        checkpoint.add("a.pdf", _payload("a.pdf", "PENDING_REVIEW"))
+        checkpoint.add("gone.pdf", _payload("gone.pdf"))
+
+    assert [p["status"] for p in checkpoint.latest_payloads({"a.pdf", "b.pdf"})] == [
+        "READY_TO_FILL", "PENDING_REVIEW",
+    ]
+
+    assert checkpoint.compact({"a.pdf", "b.pdf"}) == (4, 2)
+    assert [r["file"] for r in checkpoint.records()] == ["b.pdf", "a.pdf"]
+    assert not (tmp_path / "checkpoint.jsonl.tmp").exists()
+
+
+def test_open_without_resume_starts_over(tmp_path):
+    checkpoint = BatchCheckpoint(str(tmp_path / "checkpoint.jsonl"))
+    with checkpoint.open():
+        checkpoint.add("a.pdf", _payload("a.pdf"))
+    with checkpoint.open(resume=False):
+        checkpoint.add("b.pdf", _payload("b.pdf"))
+
+    assert [r["file"] for r in checkpoint.records()] == ["b.pdf"]
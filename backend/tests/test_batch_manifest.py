@@ -0,0 +1,54 @@
+import os
+
+from utils.batch_manifest import (
+    BatchManifest, CHANGED, FORCED, NEW, RETRY, VERSION, file_state,
+)
+
+
+def _write(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def _manifest_for(path, fingerprint, status="READY_TO_FILL"):
+    source = {**file_state(path), "fingerprint": fingerprint}
+    return BatchManifest({os.path.basename(path): {"source": source, "status": status}})
+
+
+def test_plan_reasons(tmp_path):
+    a = _write(tmp_path / "a.pdf", b"%PDF a")
+
+    todo, reused = BatchManifest().plan([a], "v1")
+    assert [reason for _, _, reason in todo] == [NEW]
+
+    manifest = _manifest_for(a, "v1")
+    assert manifest.plan([a], "v1") == ([], ["a.pdf"])
+    assert [r for _, _, r in manifest.plan([a], "v2")[0]] == [VERSION]
+    assert [r for _, _, r in manifest.plan([a], "v1", force=["a*"])[0]] == [FORCED]
+
+    assert [r for _, _, r in _manifest_for(a, "v1", "ERROR").plan([a], "v1")[0]] == [RETRY]
+
+    _write(tmp_path / "a.pdf", b"%PDF changed")
+    todo, _ = manifest.plan([a], "v1")
+    assert [r for _, _, r in todo] == [CHANGED]
+    assert todo[0][1]["fingerprint"] == "v1"
+
+
+def test_touched_but_identical_file_is_unchanged(tmp_path):
+    a = _write(tmp_path / "a.pdf", b"%PDF a")
+    manifest = _manifest_for(a, "v1")
+
+    st = os.stat(a)
+    os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    assert manifest.plan([a], "v1") == ([], ["a.pdf"])
+
+
+def test_hash_reused_when_size_and_mtime_match(tmp_path, monkeypatch):
+    a = _write(tmp_path / "a.pdf", b"%PDF a")
+    previous = file_state(a)
+
+    import utils.batch_manifest as bm
+    monkeypatch.setattr(bm, "file_sha256", lambda path: "rehashed")
+
+    assert file_state(a, previous)["sha256"] == previous["sha256"]
@@ -0,0 +1,71 @@
+from openpyxl import load_workbook
+
+from utils.batch_checkpoint import BatchCheckpoint
+from utils.batch_workbook import excel_cell, write_workbook
+from utils.contract import to_contract
+
+SHEETS = ("READY_TO_FILL", "PENDING_REVIEW")
+
+
+def _meta(date_conf):
+    return {
+        "Program Title": "Advanced Leadership Workshop",
+        "Program Title Confidence": "High",
+        "Program Date": "21 July 2025",
+        "Program Date Confidence": date_conf,
+        "Venue": "Grand Hall",
+        "Venue Confidence": "Medium",
+        "Cost Amount": "1200",
+        "Cost Currency": "RM",
+        "Cost Confidence": "High",
+        "Trainer": "Jane Doe",
+        "Trainer Confidence": "Low",
+        "Training Organiser": "Acme",
+        "Organiser Confidence": "High",
+        "LMS Category": "Leadership",
+        "LMS Category Confidence": "High",
+    }
+
+
+def test_excel_cell_converts_non_scalars():
+    assert excel_cell(["DATE_UNCERTAIN", "VENUE_UNCERTAIN"]) == "DATE_UNCERTAIN; VENUE_UNCERTAIN"
+    assert excel_cell({"a": 1}) == '{"a": 1}'
+    assert excel_cell(None) is None
+    assert excel_cell(3.5) == 3.5
+
+
+def test_workbook_from_contract_payloads(tmp_path):
+    checkpoint = BatchCheckpoint(str(tmp_path / "checkpoint.jsonl"))
+    ready = to_contract(_meta("High"), source_file="a.pdf", method="native")
+    review = to_contract(_meta("Low"), source_file="b.pdf", method="native")
+    assert isinstance(ready["review_flags"], list)
+
+    with checkpoint.open():
+        checkpoint.add("a.pdf", ready)
+        checkpoint.add("b.pdf", review)
+
+    out = tmp_path / "out.xlsx"
+    assert write_workbook(checkpoint, str(out), SHEETS) == 2
+
+    wb = load_workbook(out)
+    rows = {name: list(wb[name].values) for name in SHEETS}
+    header = rows["READY_TO_FILL"][0]
+    flags_col = header.index("review_flags")
+
+    assert [r[header.index("file")] for r in rows["READY_TO_FILL"][1:]] == ["a.pdf"]
+    assert [r[header.index("file")] for r in rows["PENDING_REVIEW"][1:]] == ["b.pdf"]
+    assert rows["READY_TO_FILL"][1][flags_col] == "; ".join(ready["review_flags"])
+
+
+def test_workbook_keeps_latest_payload_per_file(tmp_path):
+    checkpoint = BatchCheckpoint(str(tmp_path / "checkpoint.jsonl"))
+    with checkpoint.open():
+        checkpoint.add("a.pdf", to_contract(_meta("Low"), source_file="a.pdf"))
+        checkpoint.add("a.pdf", to_contract(_meta("High"), source_file="a.pdf"))
+
+    out = tmp_path / "out.xlsx"
+    assert write_workbook(checkpoint, str(out), SHEETS) == 1
+
+    wb = load_workbook(out)
+    assert len(list(wb["READY_TO_FILL"].values)) == 2
+    assert len(list(wb["PENDING_REVIEW"].values)) == 1
@@ -0,0 +1,16 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("rank_bm25")
+
+from category_classification.category_index import _topk_unordered
+
+
+def test_topk_unordered():
+    scores = np.array([[0.1, 0.9, 0.5, 0.7], [0.8, 0.2, 0.6, 0.4]])
+
+    assert [sorted(row) for row in _topk_unordered(scores, 2).tolist()] == [[1, 3], [0, 2]]
+    assert _topk_unordered(scores, 10).shape == (2, 4)
+    assert _topk_unordered(scores, 0).shape == (2, 0)
+    assert _topk_unordered(scores, -1).shape == (2, 0)
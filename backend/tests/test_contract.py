@@ -0,0 +1,10 @@
+from layer3_llm.gemini_fallback import GEMINI_ERROR_FLAG, GEMINI_SKIPPED_FLAG
+from utils.contract import review_flags, to_contract
+
+
+def test_llm_skipped_and_error_are_review_flags():
+    assert "LLM_SKIPPED" in review_flags({"Flags": GEMINI_SKIPPED_FLAG})
+    assert "LLM_ERROR" in review_flags({"Flags": GEMINI_ERROR_FLAG})
+
+    flags = to_contract({"Flags": ";LAYOUT_TITLE"}, source_file="a.pdf")["review_flags"]
+    assert "LLM_SKIPPED" not in flags and "LLM_ERROR" not in flags
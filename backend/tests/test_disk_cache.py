@@ -0,0 +1,33 @@
+import os
+
+from utils.disk_cache import JsonDiskCache
+
+
+def _files(directory, suffix):
+    return [n for _, _, names in os.walk(directory) for n in names if n.endswith(suffix)]
+
+
+def test_put_get_roundtrip_leaves_no_temp_files(tmp_path):
+    cache = JsonDiskCache(str(tmp_path), max_bytes=1 << 20)
+    cache.put("ab" * 32, {"x": 1})
+    cache.put("ab" * 32, {"x": 2})
+
+    assert cache.get("ab" * 32) == {"x": 2}
+    assert _files(tmp_path, ".tmp") == []
+
+
+def test_size_cap_counts_other_writers(tmp_path):
+    # Two instances on one directory stand in for two worker processes
+    a = JsonDiskCache(str(tmp_path), max_bytes=4000, resync_seconds=0)
+    b = JsonDiskCache(str(tmp_path), max_bytes=4000, resync_seconds=0)
+    payload = {"v": "x" * 400}
+
+    for i in range(10):
+        (a if i % 2 else b).put(f"{i:064x}", payload)
+
+    total = sum(
+        os.path.getsize(os.path.join(root, n))
+        for root, _, names in os.walk(tmp_path) for n in names
+    )
+    assert total <= 4000
+    assert a.evictions + b.evictions > 0
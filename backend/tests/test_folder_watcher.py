@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+from utils import folder_watcher
+from utils.folder_watcher import FolderWatcher, is_brochure
+
+PDF = b"%PDF-1.4\n" + b"x" * 100 + b"\n%%EOF\n"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def watcher(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(folder_watcher, "WATCH_SETTLE_SECONDS", 2)
+    monkeypatch.setattr(folder_watcher, "WATCH_CLOSED_SETTLE_SECONDS", 0.5)
+    monkeypatch.setattr(folder_watcher, "WATCH_INCOMPLETE_SECONDS", 60)
+    w = FolderWatcher(str(tmp_path), use_inotify=False, clock=clock)
+    yield w
+    w.close()
+
+
+def _write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_is_brochure():
+    assert is_brochure("Course.PDF")
+    assert not is_brochure("~$Course.pdf")
+    assert not is_brochure(".hidden.pdf")
+    assert not is_brochure("notes.txt")
+
+
+def test_file_is_ready_only_after_it_stops_changing(watcher, tmp_path, clock):
+    path = tmp_path / "a.pdf"
+    _write(path, PDF[:20])
+    watcher.scan()
+    assert watcher.ready() == []
+
+    # Still growing: the settle clock restarts
+    clock.sleep(1.5)
+    _write(path, PDF)
+    assert watcher.ready() == []
+    clock.sleep(1.5)
+    assert watcher.ready() == []
+
+    clock.sleep(0.5)
+    assert watcher.ready() == [("a.pdf", str(path))]
+    assert watcher.ready() == []
+
+
+def test_closed_files_settle_faster(watcher, tmp_path, clock):
+    _write(tmp_path / "a.pdf", PDF)
+    watcher.touch("a.pdf", closed=True)
+    clock.sleep(0.4)
+    assert watcher.ready() == []
+
+    clock.sleep(0.1)
+    assert [f for f, _ in watcher.ready()] == ["a.pdf"]
+
+
+def test_file_without_trailer_waits_for_incomplete_timeout(watcher, tmp_path, clock):
+    _write(tmp_path / "a.pdf", PDF[:50])
+    watcher.scan()
+    clock.sleep(59)
+    assert watcher.ready() == []
+
+    clock.sleep(1)
+    assert [f for f, _ in watcher.ready()] == ["a.pdf"]
+
+
+def test_rescan_reports_only_changed_files(watcher, tmp_path, clock):
+    _write(tmp_path / "a.pdf", PDF)
+    _write(tmp_path / "notes.txt", b"ignored")
+    watcher.scan()
+    clock.sleep(2)
+    assert [f for f, _ in watcher.ready()] == ["a.pdf"]
+
+    watcher.scan()
+    assert watcher.candidates == {}
+
+    _write(tmp_path / "a.pdf", PDF + b"%%EOF\n")
+    watcher.scan()
+    assert list(watcher.candidates) == ["a.pdf"]
+
+
+def test_deleted_candidate_is_dropped(watcher, tmp_path):
+    _write(tmp_path / "a.pdf", PDF)
+    watcher.scan()
+    os.remove(tmp_path / "a.pdf")
+    assert watcher.ready() == []
+    assert watcher.candidates == {}
@@ -0,0 +1,19 @@
+from layer3_llm import llm_cache
+from layer3_llm.llm_cache import LLMResponseCache, cached_generate, llm_cache_key
+
+
+def test_backends_do_not_share_cached_answers(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(llm_cache, "_CACHE", LLMResponseCache(str(tmp_path), 1024 * 1024, ttl_seconds=3600))
+
+    fake = cached_generate("m", {}, "prompt", lambda p: '{"title": "Not detected"}', backend="fake")
+    real = cached_generate("m", {}, "prompt", lambda p: '{"title": "Leadership"}', backend="gemini")
+    assert (fake, real) == ('{"title": "Not detected"}', '{"title": "Leadership"}')
+
+    # Later Gemini calls hit the Gemini entry only
+    assert cached_generate("m", {}, "prompt", lambda p: "miss", backend="gemini") == real
+
+
+def test_cache_key_includes_backend():
+    assert llm_cache_key("m", {}, "p") != llm_cache_key("m", {}, "p", "gemini")
+    assert llm_cache_key("m", {}, "p", "fake") != llm_cache_key("m", {}, "p", "gemini")
@@ -0,0 +1,13 @@
+from utils import ocr_engine
+
+
+def test_in_process_ocr_skips_failing_page(monkeypatch):
+    def fake_ocr_page(pdf_path, page_number, dpi=ocr_engine.OCR_DPI):
+        if page_number == 1:
+            raise RuntimeError("bad page")
+        return f"page {page_number}"
+
+    monkeypatch.setattr(ocr_engine, "ocr_page", fake_ocr_page)
+    monkeypatch.setattr(ocr_engine, "_can_use_pool", lambda: False)
+
+    assert ocr_engine.ocr_pdf("x.pdf", 3) == ["page 0", "page 2"]
@@ -0,0 +1,104 @@
+import random
+import re
+
+from layer1_text.metadata_extraction import extract_cost
+from utils.price_index import PriceIndex
+
+
+def _regex_extract_cost(text):
+    # The per-rule regex scans extract_cost() ran before the PriceIndex,
+    # kept as the reference the index must reproduce
+    t = re.sub(r"\s+", " ", text.lower())
+
+    promo = re.search(r"(promo fee|promotional fee|promo price|early bird).{0,60}"
+                      r"(rm|usd)\s?([\d,]+(?:\.\d{2})?)", t, re.I)
+    if promo:
+        return promo.group(3).replace(",", ""), promo.group(2).upper(), "High"
+
+    non_member = re.search(r"(non[- ]member).{0,60}(rm|usd)\s?([\d,]+(?:\.\d{2})?)", t, re.I)
+    if non_member:
+        return non_member.group(3).replace(",", ""), non_member.group(2).upper(), "High"
+
+    wa = re.search(r"(rm|usd)\s?([\d,]+(?:\.\d{2})?).{0,60}without (hotel )?accommodation", t, re.I)
+    if wa:
+        return wa.group(2).replace(",", ""), wa.group(1).upper(), "High"
+
+    pax = re.search(r"(rm|usd)\s?([\d,]+(?:\.\d{2})?)\s*(per pax|per person)", t, re.I)
+    if pax:
+        return pax.group(2).replace(",", ""), pax.group(1).upper(), "Medium"
+
+    parsed = []
+    for cur, amt in re.findall(r"(rm|usd)\s?([\d,]+(?:\.\d{2})?)", t, re.I):
+        try:
+            parsed.append((cur.upper(), float(amt.replace(",", ""))))
+        except ValueError:
+            pass
+    if parsed:
+        currency, amount = sorted(parsed, key=lambda x: x[1])[0]
+        return str(amount), currency, "Low"
+
+    return "N/A", "N/A", "Low"
+
+
+def test_after_anchor_takes_farthest_price_in_window():
+    index = PriceIndex.from_text("early bird fee: rm1,200.00 or rm 900 per pax")
+    assert index.after_anchor("promo").amount == "900"
+
+    # Beyond the window only the nearer price counts
+    index = PriceIndex.from_text("promo fee rm 500" + " " * 60 + "rm 100")
+    assert index.after_anchor("promo").amount == "500"
+
+
+def test_after_anchor_stays_on_the_anchor_line():
+    index = PriceIndex.from_text("promo fee\nrm 500")
+    assert index.after_anchor("promo") is None
+
+
+def test_after_anchor_falls_through_to_next_anchor():
+    index = PriceIndex.from_text("promo fee tba" + " " * 70 + "early bird rm 750")
+    assert index.after_anchor("promo").amount == "750"
+
+
+def test_suffix_anchor_and_per_pax_context():
+    index = PriceIndex.from_text("rm 3,000 with hotel, rm 2,400 without hotel accommodation, usd 500 per person")
+    assert [m.amount for m in index if "without_accommodation" in m.context] == ["3000", "2400"]
+    assert index.first_with("without_accommodation").amount == "3000"
+    assert index.first_with("per_pax").currency == "USD"
+
+
+def test_lowest_skips_non_numeric_and_keeps_first_tie():
+    index = PriceIndex.from_text("rm , then usd 800 then rm 800.00 then rm 1,000")
+    lowest = index.lowest()
+    assert (lowest.currency, lowest.amount) == ("USD", "800")
+
+    assert PriceIndex.from_text("rm ,").lowest() is None
+    assert PriceIndex.from_text("no prices here").lowest() is None
+
+
+def test_extract_cost_matches_regex_rules():
+    cases = [
+        "Promo fee: RM 1,800.00 per pax. Normal fee RM 2,000",
+        "Member RM 1,500 | Non-member RM 1,800 | Early bird RM 1,200",
+        "RM 3,500 with accommodation\nRM 2,800 without accommodation",
+        "Fee: USD 450 per person",
+        "Investment RM 2,500.00 or RM 2,000.00",
+        "Price RM , to be confirmed",
+        "Non member\nfee RM 900",
+        "No fee mentioned",
+    ]
+
+    rng = random.Random(7)
+    parts = ["promo fee", "early bird", "non-member", "non member", "without accommodation",
+             "without hotel accommodation", "per pax", "per person", "rm", "usd", "rm ,", "\n",
+             "fee", "member", "hotel", "lunch provided"]
+    for _ in range(500):
+        words = []
+        for _ in range(rng.randint(1, 14)):
+            word = rng.choice(parts)
+            if word in ("rm", "usd"):
+                word += rng.choice(["", " "]) + rng.choice(["1,200", "950.00", "3000", "80", "2,500.50"])
+            words.append(word)
+        cases.append(" ".join(words))
+
+    for text in cases:
+        assert extract_cost(text) == _regex_extract_cost(text), text
@@ -0,0 +1,86 @@
+import os
+import time
+
+from utils.worker_pool import TaskTimeout, WorkerCrashed, WorkerPool
+
+
+# Worker functions live at module level so they pickle under spawn too
+def _work(item):
+    if item == "sleep":
+        time.sleep(30)
+    elif item == "die":
+        os._exit(3)
+    elif item == "raise":
+        raise ValueError("bad item")
+    elif isinstance(item, float):
+        time.sleep(item)
+    return item, os.getpid()
+
+
+def test_map_yields_in_input_order():
+    items = [0.3, 0.0, 0.2, 0.0, 0.1]
+    with WorkerPool(_work, 3, timeout=10, max_tasks=0) as pool:
+        out = list(pool.map(items))
+
+    assert [item for item, _, _ in out] == items
+    assert all(ok for _, ok, _ in out)
+    assert [value[0] for _, _, value in out] == items
+
+
+def test_errors_come_back_without_losing_the_worker():
+    with WorkerPool(_work, 1, timeout=10, max_tasks=0) as pool:
+        out = list(pool.map(["raise", "a"]))
+        assert pool.stats["started"] == 1
+
+    (_, ok, error), (_, ok2, value) = out
+    assert not ok and "ValueError: bad item" in str(error)
+    assert ok2 and value[0] == "a"
+
+
+def test_timeout_kills_and_replaces_the_worker():
+    with WorkerPool(_work, 1, timeout=0.5, max_tasks=0) as pool:
+        started = time.monotonic()
+        out = list(pool.map(["sleep", "a"]))
+        elapsed = time.monotonic() - started
+        stats = dict(pool.stats)
+
+    (_, ok, error), (_, ok2, value) = out
+    assert not ok and isinstance(error, TaskTimeout)
+    assert ok2 and value[0] == "a"
+    assert elapsed < 10
+    assert stats["timeouts"] == 1 and stats["started"] == 2
+
+
+def test_crashed_worker_is_replaced():
+    with WorkerPool(_work, 1, timeout=10, max_tasks=0) as pool:
+        out = list(pool.map(["die", "a"]))
+        stats = dict(pool.stats)
+
+    (_, ok, error), (_, ok2, value) = out
+    assert not ok and isinstance(error, WorkerCrashed)
+    assert ok2 and value[0] == "a"
+    assert stats["crashed"] == 1 and stats["started"] == 2
+
+
+def test_workers_are_recycled_after_max_tasks():
+    with WorkerPool(_work, 1, timeout=10, max_tasks=2) as pool:
+        out = list(pool.map(["a", "b", "c", "d", "e"]))
+        stats = dict(pool.stats)
+
+    pids = [value[1] for _, _, value in out]
+    assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4]
+    assert stats["recycled"] == 2 and stats["started"] == 3
+
+
+def test_submit_poll_returns_items_as_they_finish():
+    with WorkerPool(_work, 2, timeout=10, max_tasks=0, keep_warm=True) as pool:
+        slow = pool.submit(0.5)
+        fast = pool.submit("a")
+        assert pool.pending == 2
+
+        finished = []
+        deadline = time.monotonic() + 10
+        while pool.pending and time.monotonic() < deadline:
+            finished.extend(task_id for task_id, _, _, _ in pool.poll(timeout=0.1))
+
+    assert finished == [fast, slow]
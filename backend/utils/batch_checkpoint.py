@@ -0,0 +1,144 @@
+import os
+import json
+import time
+
+
+# ======================================================
+# APPEND-ONLY BATCH CHECKPOINT
+# ======================================================
+
+class BatchCheckpoint:
+    """
+    JSONL file with one record per finished brochure:
+        {"file": <pdf file name>, "at": <unix time>, "payload": {...},
+         "source": <manifest entry, see utils/batch_manifest.py>}
+
+    Records are appended (flushed and fsynced) as each brochure finishes,
+    so a crashed batch keeps everything written so far and a restart
+    skips those files. A file may appear more than once (reprocessed
+    after a change or an ERROR); the last record wins. A torn last line
+    from a crash is ignored on read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = None
+
+    # --------------------------------------------------
+    # Writing
+    # --------------------------------------------------
+    def open(self, resume=True):
+        """
+        resume=False starts a new checkpoint (the old file is replaced).
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        if not resume and os.path.exists(self.path):
+            os.remove(self.path)
+
+        self._fh = open(self.path, "a", encoding="utf-8")
+
+        # Terminate a line torn by a crash so the next record stays parseable
+        if self._fh.tell() > 0 and not _ends_with_newline(self.path):
+            self._fh.write("\n")
+            self._fh.flush()
+        return self
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def add(self, file, payload, source=None):
+        record = {"file": file, "at": round(time.time(), 3), "payload": payload, "source": source}
+        self._fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    # --------------------------------------------------
+    # Reading
+    # --------------------------------------------------
+    def records(self):
+        """
+        Every parseable record, in file order.
+        """
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    record["file"], record["payload"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+                yield record
+
+    def latest_records(self, files=None):
+        """
+        The last record of each file (only those in `files` if given), in
+        the order those records were written. Streams the file twice
+        instead of holding the payloads.
+        """
+        last = {}
+        for i, r in enumerate(self.records()):
+            if files is None or r["file"] in files:
+                last[r["file"]] = i
+
+        for i, r in enumerate(self.records()):
+            if last.get(r["file"]) == i:
+                yield r
+
+    def latest_payloads(self, files=None):
+        for r in self.latest_records(files):
+            yield r["payload"]
+
+    def compact(self, files=None):
+        """
+        Rewrite the checkpoint with only the latest record per file (and
+        only files in `files` if given). Must not be open for writing.
+        Returns (records before, records after).
+        """
+        before = sum(1 for _ in self.records())
+        tmp = f"{self.path}.tmp"
+        after = 0
+        with open(tmp, "w", encoding="utf-8") as f:
+            for r in self.latest_records(files):
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+                after += 1
+            # Durable before it replaces the only copy of the manifest
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        _fsync_dir(os.path.dirname(self.path) or ".")
+        return before, after
+
+
+def _fsync_dir(directory):
+    # Persist the rename itself (not supported on every platform)
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
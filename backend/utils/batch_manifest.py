@@ -0,0 +1,116 @@
+import os
+from fnmatch import fnmatch
+
+from utils.result_cache import file_sha256
+
+
+# ======================================================
+# BATCH MANIFEST
+# ======================================================
+# What each brochure looked like when its last result was produced:
+#     {"path", "size", "mtime_ns", "sha256", "fingerprint"}
+# Entries are stored next to the payload in every batch checkpoint record
+# ("source"), so results and manifest are written together and survive a
+# crash together.
+
+NEW = "new"
+CHANGED = "changed"
+VERSION = "version"     # pipeline / LMS catalog / model fingerprint changed
+RETRY = "retry"         # last result was an ERROR
+FORCED = "forced"
+
+
+def file_state(path, previous=None):
+    """
+    Manifest entry (without fingerprint) for the file at path. The
+    content hash is reused from `previous` when size and mtime match.
+    """
+    st = os.stat(path)
+    if previous and previous.get("size") == st.st_size and previous.get("mtime_ns") == st.st_mtime_ns:
+        sha256 = previous["sha256"]
+    else:
+        sha256 = file_sha256(path)
+
+    return {
+        "path": path,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": sha256,
+    }
+
+
+class BatchManifest:
+    """
+    Latest manifest entry and result status per file name.
+    """
+
+    def __init__(self, entries=None, records=0):
+        # file -> {"source": entry or None, "status": payload status}
+        self.entries = entries or {}
+        # checkpoint records read, superseded ones included
+        self.records = records
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint):
+        entries = {}
+        records = 0
+        for r in checkpoint.records():
+            entries[r["file"]] = {
+                "source": r.get("source"),
+                "status": r["payload"].get("status"),
+            }
+            records += 1
+        return cls(entries, records)
+
+    def record(self, file, source, status):
+        """
+        Note a result written for file (long-running callers keep the
+        manifest current without rereading the checkpoint).
+        """
+        self.entries[file] = {"source": source, "status": status}
+        self.records += 1
+
+    def plan(self, pdf_paths, fingerprint, force=()):
+        """
+        Split pdf_paths into work and reuse.
+
+        force: file name globs to reprocess regardless of the manifest.
+
+        Returns:
+            todo:   [(path, state, reason)] to (re)process
+            reused: [file] whose last result still applies
+        """
+        todo = []
+        reused = []
+
+        for path in pdf_paths:
+            file = os.path.basename(path)
+            known = self.entries.get(file)
+            source = (known or {}).get("source")
+            state = file_state(path, source)
+
+            if any(fnmatch(file, pattern) for pattern in force):
+                reason = FORCED
+            elif not source:
+                reason = NEW
+            elif source.get("sha256") != state["sha256"]:
+                reason = CHANGED
+            elif source.get("fingerprint") != fingerprint:
+                reason = VERSION
+            elif known["status"] == "ERROR":
+                reason = RETRY
+            else:
+                reused.append(file)
+                continue
+
+            todo.append((path, {**state, "fingerprint": fingerprint}, reason))
+
+        return todo, reused
+
+
+def plan_summary(todo, reused):
+    counts = {}
+    for _, _, reason in todo:
+        counts[reason] = counts.get(reason, 0) + 1
+    parts = [f"{n} {reason}" for reason, n in counts.items()]
+    return f"{len(todo)} to process ({', '.join(parts) or 'none'}), {len(reused)} unchanged"
@@ -0,0 +1,54 @@
+import json
+
+from openpyxl import Workbook
+
+
+# ======================================================
+# STREAMED BATCH WORKBOOK
+# ======================================================
+
+def excel_cell(value):
+    """
+    Payload value as something openpyxl can store: lists (e.g.
+    review_flags) are joined with "; ", dicts become JSON and any other
+    non-scalar is str()'d, as the old pandas writer did.
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple, set)):
+        return "; ".join(str(v) for v in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def write_workbook(checkpoint, path, sheet_names, files=None):
+    """
+    One sheet per payload status in sheet_names, built from the
+    checkpoint's latest payload per brochure (only those in `files` if
+    given) with openpyxl's write-only (streaming) workbook. Columns are
+    every payload key in first-seen order.
+    Returns the number of brochures written out.
+    """
+    columns = {}
+    count = 0
+    for payload in checkpoint.latest_payloads(files):
+        columns.update(dict.fromkeys(payload))
+        count += 1
+
+    if not count:
+        return 0
+
+    columns = list(columns)
+    wb = Workbook(write_only=True)
+    sheets = {status: wb.create_sheet(status) for status in sheet_names}
+    for ws in sheets.values():
+        ws.append(columns)
+
+    for payload in checkpoint.latest_payloads(files):
+        ws = sheets.get(payload.get("status"))
+        if ws is not None:
+            ws.append([excel_cell(payload.get(c)) for c in columns])
+
+    wb.save(path)
+    return count
@@ -1,5 +1,6 @@
 from utils.date_parsing import parse_start_date, parse_end_date
 from layer1_text.hrdc_detection import detect_hrdc_logo
+from layer3_llm.gemini_fallback import llm_review_flag
 
 def decide_status(meta):
     if meta.get("Program Date Confidence") == "High":
@@ -27,10 +28,20 @@ def review_flags(meta):
     if meta.get("Organiser Confidence") != "High":
         flags.append("ORGANISER_UNCERTAIN")
 
+    # Layer 3 skipped (circuit open) or failed: low confidence may be
+    # an outage rather than the brochure
+    llm_flag = llm_review_flag(meta)
+    if llm_flag:
+        flags.append(llm_flag)
+
     return flags
 
 
 def to_contract(meta, source_file, pdf_path=None, method=None):
+    """
+    pdf_path: file path or PdfSession; with a session the HRDC logo
+    result from Layer 1 is reused instead of re-scanning the PDF.
+    """
     return {
         "file": source_file,
 
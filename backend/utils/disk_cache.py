@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import tempfile
+import threading
+
+
+# Other processes (batch / watch-folder workers) write to the same
+# directory, so the running size estimate is re-read from disk this often
+SIZE_RESYNC_SECONDS = 30
+
+
+# ======================================================
+# SIZE-BOUNDED JSON DISK CACHE
+# ======================================================
+
+class JsonDiskCache:
+    """
+    Directory of JSON entries keyed by hex digests.
+
+    Entries live at <directory>/<key[:2]>/<key>.json. A file's mtime is its
+    last access time: hits touch it, and when the directory grows past
+    max_bytes the least recently used entries are deleted first.
+    With ttl_seconds set, entries older than that (by write time) are
+    treated as misses and removed.
+
+    Safe to share between processes: writes go through a unique temp file
+    and an atomic rename, and the size estimate is resynced from disk
+    every resync_seconds so other writers count towards max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes, ttl_seconds=None, resync_seconds=SIZE_RESYNC_SECONDS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.resync_seconds = resync_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.expired = 0
+
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        self._synced_at = 0.0
+
+    # --------------------------------------------------
+    # Public API
+    # --------------------------------------------------
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            created_at = entry["created_at"]
+            value = entry["value"]
+        except (OSError, ValueError, KeyError, TypeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds:
+            self.delete(key)
+            with self._lock:
+                self.expired += 1
+                self.misses += 1
+            return None
+
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        entry = {"created_at": time.time(), "value": value}
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f"{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+        except BaseException:
+            _remove_quietly(tmp)
+            raise
+
+        with self._lock:
+            old_size = _file_size(path)
+            os.replace(tmp, path)
+            self.writes += 1
+            self._ensure_total()
+            self._total_bytes += len(data) - old_size
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, key):
+        path = self._path(key)
+        with self._lock:
+            size = _file_size(path)
+            try:
+                os.remove(path)
+            except OSError:
+                return
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+
+    def stats(self):
+        with self._lock:
+            self._ensure_total()
+            lookups = self.hits + self.misses
+            return {
+                "directory": self.directory,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "ttl_seconds": self.ttl_seconds,
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    # --------------------------------------------------
+    # Internals
+    # --------------------------------------------------
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _entries(self):
+        out = []
+        if not os.path.isdir(self.directory):
+            return out
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                out.append((st.st_mtime, st.st_size, path))
+        return out
+
+    def _ensure_total(self):
+        stale = time.monotonic() - self._synced_at >= self.resync_seconds
+        if self._total_bytes is None or stale:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+            self._synced_at = time.monotonic()
+
+    def _evict(self):
+        # Shrink to 90% so every put doesn't trigger a directory scan
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+        self._total_bytes = total
+        self._synced_at = time.monotonic()
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
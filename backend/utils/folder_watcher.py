@@ -0,0 +1,178 @@
+import os
+import time
+
+# Optional: inotify on Linux; everything else polls the folder
+try:
+    from inotify_simple import INotify, flags
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# Polling fallback (and, with inotify, a periodic safety rescan)
+WATCH_POLL_SECONDS = float(os.environ.get("WATCH_POLL_SECONDS", 2))
+WATCH_RESCAN_SECONDS = float(os.environ.get("WATCH_RESCAN_SECONDS", 300))
+
+# A file is picked up once its size and mtime have not moved for this
+# long (shorter after inotify reports it closed / moved into place)
+WATCH_SETTLE_SECONDS = float(os.environ.get("WATCH_SETTLE_SECONDS", 2))
+WATCH_CLOSED_SETTLE_SECONDS = float(os.environ.get("WATCH_CLOSED_SETTLE_SECONDS", 0.5))
+
+# A stable file without a PDF trailer (%%EOF) is still being written;
+# after this long it is processed anyway
+WATCH_INCOMPLETE_SECONDS = float(os.environ.get("WATCH_INCOMPLETE_SECONDS", 60))
+
+
+# ======================================================
+# FOLDER WATCHER
+# ======================================================
+
+def is_brochure(name):
+    return name.lower().endswith(".pdf") and not name.startswith((".", "~$"))
+
+
+def has_pdf_trailer(path, tail=2048):
+    """
+    True once the file ends with a PDF trailer (%%EOF), i.e. the writer
+    got to the end of the document.
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - tail))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False
+
+
+class FolderWatcher:
+    """
+    Reports brochures in `folder` once they have finished arriving.
+
+    Changes come from inotify when available (close-after-write, moves
+    into the folder, modifications) plus a rescan every
+    WATCH_RESCAN_SECONDS; otherwise the folder is rescanned every
+    WATCH_POLL_SECONDS. A changed file becomes a candidate and is only
+    returned by ready() after its size / mtime have been stable for the
+    settle time and it carries a PDF trailer.
+    """
+
+    def __init__(self, folder, use_inotify=INOTIFY_AVAILABLE, clock=time.monotonic):
+        self.folder = folder
+        self.clock = clock     # injectable for tests
+        self.inotify = None
+        self.known = {}        # file -> (size, mtime_ns) last handed out
+        self.candidates = {}   # file -> [size, mtime_ns, stable_since, closed]
+        self.last_scan = 0.0
+
+        if use_inotify:
+            try:
+                self.inotify = INotify()
+                self.inotify.add_watch(
+                    folder,
+                    flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.MODIFY,
+                )
+            except OSError as e:
+                print(f"[Watch] inotify unavailable ({e}); polling")
+                self.inotify = None
+
+    @property
+    def mode(self):
+        return "inotify" if self.inotify is not None else "polling"
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
+
+    def forget(self, file):
+        """
+        Let the next change of file be reported again.
+        """
+        self.known.pop(file, None)
+
+    def poll(self):
+        """
+        Collect folder changes since the last call (non-blocking).
+        """
+        now = self.clock()
+
+        if self.inotify is not None:
+            for event in self.inotify.read(timeout=0):
+                if event.name and is_brochure(event.name):
+                    closed = bool(event.mask & (flags.CLOSE_WRITE | flags.MOVED_TO))
+                    self.touch(event.name, closed)
+
+        interval = WATCH_RESCAN_SECONDS if self.inotify is not None else WATCH_POLL_SECONDS
+        if now - self.last_scan >= interval:
+            self.last_scan = now
+            self.scan()
+
+    def scan(self):
+        try:
+            entries = list(os.scandir(self.folder))
+        except OSError as e:
+            print(f"[Watch] Cannot list {self.folder}: {e}")
+            return
+
+        for entry in entries:
+            if not is_brochure(entry.name) or entry.name in self.candidates:
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            if self.known.get(entry.name) != (st.st_size, st.st_mtime_ns):
+                self.touch(entry.name, closed=False)
+
+    def ready(self):
+        """
+        Files whose writes have settled, as [(file, path)].
+        """
+        now = self.clock()
+        out = []
+
+        for file, cand in list(self.candidates.items()):
+            path = os.path.join(self.folder, file)
+            try:
+                st = os.stat(path)
+            except OSError:
+                del self.candidates[file]     # deleted / renamed away
+                continue
+
+            if (st.st_size, st.st_mtime_ns) != (cand[0], cand[1]):
+                cand[0], cand[1], cand[2] = st.st_size, st.st_mtime_ns, now
+                continue
+
+            settle = WATCH_CLOSED_SETTLE_SECONDS if cand[3] else WATCH_SETTLE_SECONDS
+            stable_for = now - cand[2]
+            if stable_for < settle or st.st_size == 0:
+                continue
+            if not has_pdf_trailer(path) and stable_for < WATCH_INCOMPLETE_SECONDS:
+                continue
+
+            del self.candidates[file]
+            self.known[file] = (st.st_size, st.st_mtime_ns)
+            out.append((file, path))
+
+        return out
+
+    def touch(self, file, closed):
+        path = os.path.join(self.folder, file)
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.candidates.pop(file, None)
+            return
+
+        cand = self.candidates.get(file)
+        if cand is None:
+            self.candidates[file] = [st.st_size, st.st_mtime_ns, self.clock(), closed]
+        else:
+            if (st.st_size, st.st_mtime_ns) != (cand[0], cand[1]):
+                cand[0], cand[1], cand[2] = st.st_size, st.st_mtime_ns, self.clock()
+            cand[3] = cand[3] or closed
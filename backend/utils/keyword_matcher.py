@@ -0,0 +1,126 @@
+import re
+from functools import lru_cache
+
+
+# ======================================================
+# MULTI-PATTERN KEYWORD MATCHER
+# ======================================================
+
+# Boundary modes for a keyword class
+SUBSTRING = None          # plain `kw in text`
+WORD = "word"             # regex \b semantics (\w = alphanumeric or "_")
+ALPHA = "alpha"           # whole [a-z]+ token, as in re.findall(r"[a-z]+", text)
+
+SCAN_MEMO_SIZE = 8192
+
+
+class KeywordMatcher:
+    """
+    Finds every keyword class present in a string in one left-to-right scan.
+
+    All keywords are compiled into a single trie-shaped regex (Aho-Corasick
+    style: at each position only the branches that match the next character
+    are followed). The scan yields the longest keyword starting at each
+    position; shorter keywords that are prefixes of it are added from a
+    precomputed table, so overlapping hits ("fee"/"fees") are all reported.
+
+    Matching is on lowercased text. scan() results are memoised, since
+    the same lines/blocks are tested repeatedly.
+    """
+
+    def __init__(self, classes):
+        """
+        classes: {name: (keywords, boundary)} with boundary one of
+        SUBSTRING / WORD / ALPHA.
+        """
+        self.classes = {}
+        owners = {}
+        for name, (keywords, boundary) in classes.items():
+            words = [k.lower() for k in keywords]
+            self.classes[name] = (tuple(words), boundary)
+            for w in words:
+                owners.setdefault(w, []).append((name, boundary))
+
+        self._owners = {w: tuple(v) for w, v in owners.items()}
+        self._prefixes = {
+            w: tuple(k for k in owners if w.startswith(k))
+            for w in owners
+        }
+        self._regex = re.compile("(?=(" + _trie_regex(owners) + "))")
+        self.scan = lru_cache(maxsize=SCAN_MEMO_SIZE)(self._scan)
+
+    def _scan(self, text):
+        """
+        {class name: frozenset(keywords found)} for `text`. Treat as read-only.
+        """
+        t = text.lower()
+        found = {}
+        n = len(t)
+
+        for m in self._regex.finditer(t):
+            start = m.start()
+            for kw in self._prefixes[m.group(1)]:
+                end = start + len(kw)
+                for name, boundary in self._owners[kw]:
+                    if boundary is not None and not _at_boundary(t, start, end, n, boundary):
+                        continue
+                    found.setdefault(name, set()).add(kw)
+
+        return {name: frozenset(kws) for name, kws in found.items()}
+
+    def has(self, text, name):
+        return name in self.scan(text)
+
+    def first(self, text, name):
+        """
+        First keyword of class `name` (in the class's declared order)
+        present in text, or None.
+        """
+        hits = self.scan(text).get(name)
+        if not hits:
+            return None
+        for kw in self.classes[name][0]:
+            if kw in hits:
+                return kw
+        return None
+
+
+def _trie_regex(words):
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        alt = "(?:" + "|".join(branches) + ")"
+        # Greedy optional: prefer the longer keyword, fall back to this one
+        return alt + "?" if "" in node else alt
+
+    return build(trie)
+
+
+def _is_word_char(c):
+    return c.isalnum() or c == "_"
+
+
+def _is_alpha_char(c):
+    return "a" <= c <= "z"
+
+
+def _at_boundary(t, start, end, n, boundary):
+    is_inner = _is_word_char if boundary == WORD else _is_alpha_char
+
+    if boundary == WORD:
+        # \b before/after: word-ness must change across the edge
+        left_ok = start == 0 or is_inner(t[start - 1]) != is_inner(t[start])
+        right_ok = end == n or is_inner(t[end - 1]) != is_inner(t[end])
+        return left_ok and right_ok
+
+    return (start == 0 or not is_inner(t[start - 1])) and (end == n or not is_inner(t[end]))
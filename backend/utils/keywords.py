@@ -0,0 +1,92 @@
+# KEYWORD LISTS SHARED BY LAYER 1 AND LAYER 2
+# All lists are compiled into one KeywordMatcher, so a line/block is
+# scanned once for every class instead of once per keyword.
+from utils.keyword_matcher import KeywordMatcher, SUBSTRING, WORD, ALPHA
+
+# ======================================================
+# LAYER 1 — PERSON / TRAINER
+# ======================================================
+
+# Common non-name words that appear in headings/topics (whole words)
+PERSON_TOPIC_BLOCK = [
+    "risk","management","allocation","negotiation","strategy","planning",
+    "chatgpt","ai","office","productivity","contract","leadership",
+    "development","programme","program","course","session","module",
+    "overview","outcomes","objectives","agenda","introduction"
+]
+
+# Role/label words (substring)
+PERSON_ROLE_BLOCK = ["trainer","speaker","facilitator","profile","expert","management"]
+
+# Trainer role labels in priority order (whole words)
+ROLE_LABELS = [
+    "lead trainer", "course leader", "courseleader", "facilitator",
+    "speaker", "conducted by", "presented by", "trainer profile", "trainer"
+]
+GENERIC_TRAINER_ROLE = "trainer"
+
+# ======================================================
+# LAYER 2 — LAYOUT
+# ======================================================
+
+VENUE_KEYWORDS = [
+    "hall", "hotel", "centre", "center",
+    "campus", "auditorium"
+]
+
+TITLE_SIGNAL_WORDS = [
+    "training", "workshop", "programme", "program",
+    "course", "leadership", "management", "digital",
+    "advanced", "introduction", "fundamentals",
+    "resilience", "sustainability"
+]
+
+NON_TITLE_WORDS = [
+    "ABOUT", "OVERVIEW", "OBJECTIVES", "WHO SHOULD ATTEND",
+    "REGISTRATION", "FORM", "CONTACT", "EMAIL", "PHONE",
+    "SDN BHD", "FEES", "PACKAGE", "PARTICIPANT"
+]
+
+COST_SIGNAL_WORDS = [
+    "promo", "promotion", "special", "early bird",
+    "fees", "fee", "price", "cost"
+]
+
+# "normal price" / crossed-out prices
+COST_PENALTY_WORDS = ["normal", "was"]
+
+ORGANISER_HINT_WORDS = [
+    "organised by",
+    "organized by",
+    "conducted by",
+    "delivered by",
+    "hosted by"
+]
+
+CONFERENCE_WORDS = [
+    "conference", "summit", "forum",
+    "congress", "symposium", "expo"
+]
+
+TRAINING_WORDS = [
+    "training", "workshop", "course",
+    "programme", "program", "masterclass"
+]
+
+TRAINER_SECTION_WORDS = ["TRAINER PROFILE", "FACULTY PROFILE"]
+
+
+KEYWORDS = KeywordMatcher({
+    "person_topic": (PERSON_TOPIC_BLOCK, ALPHA),
+    "person_role": (PERSON_ROLE_BLOCK, SUBSTRING),
+    "role": (ROLE_LABELS, WORD),
+    "venue": (VENUE_KEYWORDS, SUBSTRING),
+    "title_signal": (TITLE_SIGNAL_WORDS, SUBSTRING),
+    "non_title": (NON_TITLE_WORDS, SUBSTRING),
+    "cost_signal": (COST_SIGNAL_WORDS, SUBSTRING),
+    "cost_penalty": (COST_PENALTY_WORDS, SUBSTRING),
+    "organiser_hint": (ORGANISER_HINT_WORDS, SUBSTRING),
+    "conference": (CONFERENCE_WORDS, SUBSTRING),
+    "training": (TRAINING_WORDS, SUBSTRING),
+    "trainer_section": (TRAINER_SECTION_WORDS, SUBSTRING),
+})
@@ -0,0 +1,214 @@
+import sys
+
+import numpy as np
+
+
+# ======================================================
+# ARRAY-BACKED LAYOUT PAGE
+# ======================================================
+
+class LayoutPage:
+    """
+    One page of text spans stored as a struct of arrays:
+        x0, y0, x1, y1, size   float64 NumPy arrays
+        texts                  list of interned strings
+
+    Indexing/iteration yields LayoutBlock views that read like the old
+    {"text", "size", "bbox"} dicts (b["text"], b["bbox"], b.get("size")),
+    so Layer 2 rules consume the page directly without per-span dicts.
+    """
+
+    __slots__ = ("page_number", "texts", "x0", "y0", "x1", "y1", "size")
+
+    def __init__(self, texts, x0, y0, x1, y1, size, page_number=None):
+        self.page_number = page_number
+        self.texts = texts
+        self.x0 = np.asarray(x0, dtype=np.float64)
+        self.y0 = np.asarray(y0, dtype=np.float64)
+        self.x1 = np.asarray(x1, dtype=np.float64)
+        self.y1 = np.asarray(y1, dtype=np.float64)
+        self.size = np.asarray(size, dtype=np.float64)
+
+    # --------------------------------------------------
+    # Builders
+    # --------------------------------------------------
+    @classmethod
+    def from_page_dict(cls, page_dict, page_number=None):
+        """
+        From page.get_text("dict") output: one entry per non-empty span,
+        image blocks skipped.
+        """
+        texts, x0, y0, x1, y1, size = [], [], [], [], [], []
+
+        for block in page_dict["blocks"]:
+            if block["type"] != 0:  # skip images
+                continue
+
+            for line in block["lines"]:
+                for span in line["spans"]:
+                    text = span["text"].strip()
+                    if not text:
+                        continue
+
+                    bx0, by0, bx1, by1 = span["bbox"]
+                    texts.append(sys.intern(text))
+                    x0.append(bx0)
+                    y0.append(by0)
+                    x1.append(bx1)
+                    y1.append(by1)
+                    size.append(span["size"])
+
+        return cls(texts, x0, y0, x1, y1, size, page_number)
+
+    @classmethod
+    def from_blocks(cls, blocks, page_number=None):
+        """
+        From already-normalised {"text", "bbox", "size"} mappings.
+        """
+        texts, x0, y0, x1, y1, size = [], [], [], [], [], []
+        for b in blocks:
+            bx0, by0, bx1, by1 = b["bbox"]
+            texts.append(sys.intern(b["text"]))
+            x0.append(bx0)
+            y0.append(by0)
+            x1.append(bx1)
+            y1.append(by1)
+            size.append(b["size"])
+        return cls(texts, x0, y0, x1, y1, size, page_number)
+
+    # --------------------------------------------------
+    # Sequence protocol
+    # --------------------------------------------------
+    def __len__(self):
+        return len(self.texts)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            idx = range(len(self.texts))[i]
+            return [LayoutBlock(self, j) for j in idx]
+        if i < 0:
+            i += len(self.texts)
+        if not 0 <= i < len(self.texts):
+            raise IndexError(i)
+        return LayoutBlock(self, i)
+
+    def __iter__(self):
+        for i in range(len(self.texts)):
+            yield LayoutBlock(self, i)
+
+    def bbox(self, i):
+        return (float(self.x0[i]), float(self.y0[i]), float(self.x1[i]), float(self.y1[i]))
+
+    def columns(self):
+        """
+        (x0, y0, x1, y1, size) as Python lists, for tight scalar loops.
+        """
+        return (self.x0.tolist(), self.y0.tolist(), self.x1.tolist(), self.y1.tolist(), self.size.tolist())
+
+    def nbytes(self):
+        arrays = self.x0.nbytes + self.y0.nbytes + self.x1.nbytes + self.y1.nbytes + self.size.nbytes
+        return arrays + sys.getsizeof(self.texts)
+
+    def __repr__(self):
+        return f"LayoutPage(page={self.page_number}, spans={len(self.texts)})"
+
+
+class LayoutBlock:
+    """
+    Read-only view of one span of a LayoutPage.
+    """
+
+    __slots__ = ("page", "index")
+
+    _KEYS = ("text", "size", "bbox")
+
+    def __init__(self, page, index):
+        self.page = page
+        self.index = index
+
+    @property
+    def text(self):
+        return self.page.texts[self.index]
+
+    @property
+    def size(self):
+        return float(self.page.size[self.index])
+
+    @property
+    def bbox(self):
+        return self.page.bbox(self.index)
+
+    # Mapping-style access, as used by the Layer 2 rules
+    def __getitem__(self, key):
+        if key == "text":
+            return self.text
+        if key == "size":
+            return self.size
+        if key == "bbox":
+            return self.bbox
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self._KEYS
+
+    def keys(self):
+        return self._KEYS
+
+    def __repr__(self):
+        return f"LayoutBlock({self.text!r}, size={self.size}, bbox={self.bbox})"
+
+
+# ======================================================
+# LAZY PAGE SEQUENCE
+# ======================================================
+
+class LazyPages:
+    """
+    Read-only sequence of `count` pages where page i is built by load(i)
+    the first time it is asked for and memoised after that.
+
+    Layer 2 reads page 0 for most rules and only walks later pages in the
+    trainer / organiser scans, so pages that are never asked for are
+    never extracted.
+    """
+
+    __slots__ = ("_count", "_load", "_pages")
+
+    def __init__(self, count, load):
+        self._count = count
+        self._load = load
+        self._pages = {}
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(self._count)[i]]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        if i not in self._pages:
+            self._pages[i] = self._load(i)
+        return self._pages[i]
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    @property
+    def loaded(self):
+        """
+        Indices of the pages built so far.
+        """
+        return sorted(self._pages)
+
+    def __repr__(self):
+        return f"LazyPages(pages={self._count}, loaded={self.loaded})"
@@ -0,0 +1,173 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+try:
+    import pytesseract
+    OCR_AVAILABLE = True
+except ImportError:
+    OCR_AVAILABLE = False
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+OCR_DPI = 300
+
+# Worker processes used for OCR (1 = run in-process)
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+
+# Pages rendered/OCR'd at the same time. Each in-flight page holds one
+# rendered image, so this bounds peak memory.
+OCR_MAX_IN_FLIGHT = int(os.environ.get("OCR_MAX_IN_FLIGHT", OCR_WORKERS * 2))
+
+
+# ======================================================
+# PAGE WORKER
+# ======================================================
+
+def render_page(doc, page_number, dpi=OCR_DPI):
+    """
+    Rasterise one page straight to a PIL image (no PNG round-trip).
+    """
+    pix = doc[page_number].get_pixmap(dpi=dpi, alpha=False)
+    return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+
+def ocr_page(pdf_path, page_number, dpi=OCR_DPI):
+    """
+    Render and OCR a single page. Runs inside a pool worker, so only the
+    page number crosses the process boundary and the image never leaves it.
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        img = render_page(doc, page_number, dpi)
+    finally:
+        doc.close()
+
+    try:
+        return pytesseract.image_to_string(img)
+    finally:
+        img.close()
+
+
+# ======================================================
+# SHARED POOL
+# ======================================================
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            # spawn: the pool is created from API worker threads after
+            # torch is loaded, where forking is unsafe
+            _POOL = ProcessPoolExecutor(
+                max_workers=OCR_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _POOL
+
+
+def _reset_pool():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+
+
+def shutdown_ocr_pool():
+    _reset_pool()
+
+
+def _can_use_pool():
+    # Daemonic processes (e.g. batch workers) may not start children
+    return OCR_WORKERS > 1 and not multiprocessing.current_process().daemon
+
+
+# ======================================================
+# STREAMING OCR
+# ======================================================
+
+def iter_ocr_pages(pdf_path, page_count, dpi=OCR_DPI, max_in_flight=None):
+    """
+    Yield (page_number, text) in page order.
+
+    Pages are rendered and OCR'd by a bounded process pool; at most
+    `max_in_flight` pages are queued at once and finished pages are
+    yielded as soon as every earlier page is done.
+    """
+    if page_count <= 0:
+        return
+
+    if page_count == 1 or not _can_use_pool():
+        for i in range(page_count):
+            yield i, _ocr_page_in_process(pdf_path, i, dpi)
+        return
+
+    max_in_flight = max(1, max_in_flight or OCR_MAX_IN_FLIGHT)
+
+    try:
+        pool = _get_pool()
+        futures = {}
+        done_text = {}
+        next_submit = 0
+        next_yield = 0
+
+        while next_yield < page_count:
+            while next_submit < page_count and len(futures) < max_in_flight:
+                fut = pool.submit(ocr_page, pdf_path, next_submit, dpi)
+                futures[fut] = next_submit
+                next_submit += 1
+
+            finished, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+            for fut in finished:
+                page_number = futures.pop(fut)
+                try:
+                    done_text[page_number] = fut.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    print(f"[ERROR] OCR failed on page {page_number + 1}: {e}")
+                    done_text[page_number] = ""
+
+            while next_yield in done_text:
+                yield next_yield, done_text.pop(next_yield)
+                next_yield += 1
+
+    except BrokenProcessPool:
+        print("[ERROR] OCR pool crashed; continuing in-process")
+        _reset_pool()
+        for i in range(next_yield, page_count):
+            yield i, _ocr_page_in_process(pdf_path, i, dpi)
+
+
+def _ocr_page_in_process(pdf_path, page_number, dpi):
+    # Same per-page isolation as the pool path: a bad page costs only
+    # its own text
+    try:
+        return ocr_page(pdf_path, page_number, dpi)
+    except Exception as e:
+        print(f"[ERROR] OCR failed on page {page_number + 1}: {e}")
+        return ""
+
+
+def ocr_pdf(pdf_path, page_count, dpi=OCR_DPI):
+    """
+    OCR every page; returns the list of non-empty page texts in page order.
+    """
+    texts = []
+    for _, text in iter_ocr_pages(pdf_path, page_count, dpi):
+        if text.strip():
+            texts.append(text)
+    return texts
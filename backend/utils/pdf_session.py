@@ -0,0 +1,187 @@
+import os
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import fitz  # PyMuPDF
+import pdfplumber
+
+from utils.ocr_engine import render_page
+from utils.layout_page import LayoutPage
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# Rendered page images are large; keep only the most recent few per
+# document (page 1 is reused by several Layer 2 rules and never evicted)
+PAGE_IMAGE_CACHE_SIZE = 4
+
+# get_text("dict") without image payloads (only spans are used)
+LAYOUT_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+# ======================================================
+# PDF SESSION
+# ======================================================
+
+class PdfSession:
+    """
+    One open PDF shared by every layer of the pipeline.
+
+    Owns a single PyMuPDF document handle (and a lazily opened pdfplumber
+    handle) and memoises the per-page work the layers repeat:
+        - plain text           page_text(i)
+        - span layout          layout_page(i)
+        - image inventories    page_images(i)
+        - rendered images      page_image(i, dpi)
+
+    `results` holds per-document answers (e.g. HRDC logo detection) and
+    stays readable after close().
+    """
+
+    def __init__(self, pdf_path):
+        self.pdf_path = pdf_path
+        self.doc = fitz.open(pdf_path)
+        self.results = {}
+
+        self._plumber = None
+        self._text = {}
+        self._layouts = {}
+        self._images = {}
+        self._plumber_text = {}
+        self._page_images = OrderedDict()
+
+    # --------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------
+    def close(self):
+        if self._plumber is not None:
+            try:
+                self._plumber.close()
+            except Exception:
+                pass
+            self._plumber = None
+
+        if self.doc is not None:
+            self.doc.close()
+            self.doc = None
+
+        self._text.clear()
+        self._layouts.clear()
+        self._images.clear()
+        self._plumber_text.clear()
+        for img in self._page_images.values():
+            img.close()
+        self._page_images.clear()
+
+    @property
+    def closed(self):
+        return self.doc is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # --------------------------------------------------
+    # Document info
+    # --------------------------------------------------
+    @property
+    def name(self):
+        return os.path.basename(self.pdf_path)
+
+    @property
+    def page_count(self):
+        return len(self.doc)
+
+    def page(self, page_number):
+        return self.doc[page_number]
+
+    # --------------------------------------------------
+    # Memoised per-page data
+    # --------------------------------------------------
+    def page_text(self, page_number):
+        if page_number not in self._text:
+            self._text[page_number] = self.doc[page_number].get_text()
+        return self._text[page_number]
+
+    def layout_page(self, page_number):
+        """
+        Page spans as an array-backed LayoutPage (the dict itself is not kept).
+        """
+        if page_number not in self._layouts:
+            page_dict = self.doc[page_number].get_text("dict", flags=LAYOUT_TEXT_FLAGS)
+            self._layouts[page_number] = LayoutPage.from_page_dict(page_dict, page_number)
+        return self._layouts[page_number]
+
+    def page_images(self, page_number):
+        if page_number not in self._images:
+            self._images[page_number] = self.doc[page_number].get_images(full=True)
+        return self._images[page_number]
+
+    def plumber_page_count(self):
+        return len(self._plumber_doc().pages)
+
+    def plumber_page_text(self, page_number):
+        if page_number not in self._plumber_text:
+            pages = self._plumber_doc().pages
+            text = pages[page_number].extract_text() if page_number < len(pages) else ""
+            self._plumber_text[page_number] = text or ""
+        return self._plumber_text[page_number]
+
+    def page_image(self, page_number, dpi=200):
+        """
+        Rendered page as an RGB PIL image, built straight from the pixmap
+        samples. Callers must not modify or close the returned image.
+        """
+        key = (page_number, dpi)
+        if key in self._page_images:
+            self._page_images.move_to_end(key)
+            return self._page_images[key]
+
+        img = render_page(self.doc, page_number, dpi)
+        self._page_images[key] = img
+
+        evictable = [k for k in self._page_images if k[0] != 0]
+        while len(self._page_images) > PAGE_IMAGE_CACHE_SIZE and evictable:
+            self._page_images.pop(evictable.pop(0)).close()
+        return img
+
+    def _plumber_doc(self):
+        if self._plumber is None:
+            self._plumber = pdfplumber.open(self.pdf_path)
+        return self._plumber
+
+
+# ======================================================
+# HELPERS
+# ======================================================
+
+@contextmanager
+def pdf_session(source):
+    """
+    Yield a PdfSession for `source`.
+    An existing session is reused (and left open); a path opens a
+    temporary session that is closed on exit.
+    """
+    if isinstance(source, PdfSession):
+        yield source
+        return
+
+    session = PdfSession(source)
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def source_path(source):
+    """
+    File path of a PdfSession or plain path.
+    """
+    if isinstance(source, PdfSession):
+        return source.pdf_path
+    return source
@@ -0,0 +1,204 @@
+import re
+from bisect import bisect_left, bisect_right
+
+
+# ======================================================
+# PRICE MENTION INDEX
+# ======================================================
+# One pass over the text (or layout blocks) finds every currency mention;
+# the Layer 1 cost rules, Layer 2 layout scoring / label lookup and the
+# Layer 3 Gemini cost check all query the same mentions.
+
+PRICE_PATTERN = r"(rm|usd)\s?([\d,]+(?:\.\d{2})?)"
+PRICE_RE = re.compile(PRICE_PATTERN, re.I)
+
+# Context anchors (lowercased text). A price "belongs" to an anchor that
+# ends at most CONTEXT_WINDOW characters before it (or, for suffix anchors,
+# starts at most CONTEXT_WINDOW characters after it) on the same line.
+CONTEXT_WINDOW = 60
+
+PREFIX_ANCHORS = {
+    "promo": re.compile(r"(promo fee|promotional fee|promo price|early bird)", re.I),
+    "non_member": re.compile(r"(non[- ]member)", re.I),
+}
+SUFFIX_ANCHORS = {
+    "without_accommodation": re.compile(r"without (hotel )?accommodation", re.I),
+}
+PER_PAX_SUFFIX = re.compile(r"\s*(per pax|per person)", re.I)
+
+
+class PriceMention:
+    """
+    One currency mention.
+        currency  "RM" / "USD"
+        amount    digits as written, commas removed ("1200.00")
+        raw       matched text
+        well_formed  amount starts with a digit (not "RM ,5")
+        start/end offsets in the indexed text (or in the block's text)
+        context   set of context classes: promo, non_member,
+                  without_accommodation, per_pax (text index) or the
+                  block's keyword classes (layout index)
+        block, bbox, size  layout position when built from blocks
+    """
+
+    __slots__ = ("currency", "amount", "raw", "start", "end", "context", "block", "bbox", "size", "well_formed")
+
+    def __init__(self, m, context=None, block=None, bbox=None, size=None):
+        self.currency = m.group(1).upper()
+        self.amount = m.group(2).replace(",", "")
+        self.raw = m.group(0)
+        self.well_formed = m.group(2)[:1].isdigit()
+        self.start = m.start()
+        self.end = m.end()
+        self.context = context if context is not None else set()
+        self.block = block
+        self.bbox = bbox
+        self.size = size
+
+    def value(self):
+        """
+        Amount as float, or None when it isn't a number (e.g. "RM ,").
+        """
+        try:
+            return float(self.amount)
+        except ValueError:
+            return None
+
+    def __repr__(self):
+        return f"PriceMention({self.currency} {self.amount} @{self.start} {sorted(self.context)})"
+
+
+class PriceIndex:
+    """
+    Every currency mention of a text, in document order, with context.
+
+    from_text(text): positions are offsets into text; prefix/suffix anchors
+    are located once and matched to mentions by window.
+    from_blocks(blocks): one mention list per layout block, carrying
+    the block's bbox / font size.
+    """
+
+    def __init__(self, text, mentions, anchors=None):
+        self.text = text
+        self.mentions = mentions
+        self.anchors = anchors or {}
+        self._starts = [m.start for m in mentions]
+        self._by_block = {}
+        for m in mentions:
+            if m.block is not None:
+                self._by_block.setdefault(m.block, []).append(m)
+
+    # --------------------------------------------------
+    # Builders
+    # --------------------------------------------------
+    @classmethod
+    def from_text(cls, text):
+        text = text or ""
+        mentions = [PriceMention(m) for m in PRICE_RE.finditer(text)]
+
+        anchors = {}
+        if mentions:
+            for name, pattern in {**PREFIX_ANCHORS, **SUFFIX_ANCHORS}.items():
+                anchors[name] = [(m.start(), m.end()) for m in pattern.finditer(text)]
+
+        index = cls(text, mentions, anchors)
+        index._tag_context()
+        return index
+
+    @classmethod
+    def from_blocks(cls, blocks, classify=None):
+        """
+        blocks: normalised layout blocks ({text, bbox, size}).
+        classify(text) -> iterable of context classes for a block.
+        """
+        mentions = []
+        for i, b in enumerate(blocks):
+            text = b["text"]
+            found = list(PRICE_RE.finditer(text))
+            if not found:
+                continue
+            context = set(classify(text)) if classify else set()
+            for m in found:
+                mentions.append(PriceMention(m, context, block=i, bbox=b.get("bbox"), size=b.get("size")))
+        return cls(None, mentions)
+
+    # --------------------------------------------------
+    # Queries
+    # --------------------------------------------------
+    def __len__(self):
+        return len(self.mentions)
+
+    def __iter__(self):
+        return iter(self.mentions)
+
+    def first(self, predicate=None):
+        for m in self.mentions:
+            if predicate is None or predicate(m):
+                return m
+        return None
+
+    def in_block(self, block):
+        return self._by_block.get(block, [])
+
+    def between(self, lo, hi):
+        """
+        Mentions starting in [lo, hi], in document order.
+        """
+        return self.mentions[bisect_left(self._starts, lo):bisect_right(self._starts, hi)]
+
+    def after_anchor(self, name, window=CONTEXT_WINDOW):
+        """
+        Price for the first `name` anchor followed (within window, same
+        line) by a price: the farthest such price, as a greedy
+        "anchor.{0,window}price" regex would pick.
+        """
+        for _, a_end in self.anchors.get(name, []):
+            hits = [m for m in self.between(a_end, a_end + window) if self._same_line(a_end, m.start)]
+            if hits:
+                return hits[-1]
+        return None
+
+    def first_with(self, context):
+        """
+        First price tagged with a context class (e.g. "per_pax").
+        """
+        return self.first(lambda m: context in m.context)
+
+    def lowest(self):
+        """
+        Lowest numeric price (first one on ties), or None.
+        """
+        best = None
+        best_value = None
+        for m in self.mentions:
+            v = m.value()
+            if v is None:
+                continue
+            if best is None or v < best_value:
+                best, best_value = m, v
+        return best
+
+    # --------------------------------------------------
+    # Internals
+    # --------------------------------------------------
+    def _same_line(self, a, b):
+        return "\n" not in self.text[a:b]
+
+    def _tag_context(self):
+        for name in PREFIX_ANCHORS:
+            for _, a_end in self.anchors.get(name, []):
+                for m in self.between(a_end, a_end + CONTEXT_WINDOW):
+                    if self._same_line(a_end, m.start):
+                        m.context.add(name)
+
+        for name in SUFFIX_ANCHORS:
+            anchor_starts = [s for s, _ in self.anchors.get(name, [])]
+            for m in self.mentions:
+                i = bisect_left(anchor_starts, m.end)
+                if i < len(anchor_starts) and anchor_starts[i] - m.end <= CONTEXT_WINDOW \
+                        and self._same_line(m.end, anchor_starts[i]):
+                    m.context.add(name)
+
+        for m in self.mentions:
+            if PER_PAX_SUFFIX.match(self.text, m.end):
+                m.context.add("per_pax")
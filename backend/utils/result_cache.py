@@ -0,0 +1,107 @@
+import os
+import hashlib
+import threading
+
+from utils.disk_cache import JsonDiskCache
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# Bump whenever extraction rules change in a way that alters results
+PIPELINE_VERSION = "2026.10-3"
+
+RESULT_CACHE_DIR = os.path.join("cache", "results")
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_MB", 200)) * 1024 * 1024
+RESULT_CACHE_ENABLED = os.environ.get("RESULT_CACHE", "1") != "0"
+
+
+# ======================================================
+# HASHING
+# ======================================================
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+_FINGERPRINTS = {}
+_FINGERPRINT_LOCK = threading.Lock()
+
+
+def pipeline_fingerprint(catalog_path, *extra):
+    """
+    Hash of everything besides the PDF that determines a result:
+    pipeline version, LMS catalog content and any extra settings
+    (model name, extraction mode, ...). Cached per catalog mtime.
+    """
+    try:
+        mtime = os.stat(catalog_path).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    key = (os.path.abspath(catalog_path), mtime, extra)
+    with _FINGERPRINT_LOCK:
+        if key in _FINGERPRINTS:
+            return _FINGERPRINTS[key]
+
+    catalog_hash = file_sha256(catalog_path) if mtime is not None else "missing"
+    parts = [PIPELINE_VERSION, catalog_hash, *[str(e) for e in extra]]
+    fingerprint = hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    with _FINGERPRINT_LOCK:
+        _FINGERPRINTS[key] = fingerprint
+    return fingerprint
+
+
+# ======================================================
+# RESULT CACHE
+# ======================================================
+
+class ResultCache:
+    """
+    Final payloads of process_single_pdf keyed by
+    sha256(PDF bytes) + pipeline fingerprint.
+    """
+
+    def __init__(self, directory=RESULT_CACHE_DIR, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.store = JsonDiskCache(directory, max_bytes)
+
+    def key_for(self, pdf_path, fingerprint):
+        content = file_sha256(pdf_path)
+        return hashlib.sha256(f"{content}|{fingerprint}".encode("utf-8")).hexdigest()
+
+    def get(self, key, source_file=None):
+        payload = self.store.get(key)
+        if payload is None:
+            return None
+
+        # Same bytes may arrive under another file name
+        if source_file is not None and "file" in payload:
+            payload["file"] = source_file
+        return payload
+
+    def put(self, key, payload):
+        # Never cache failures; they may be transient
+        if payload.get("status") == "ERROR":
+            return
+        self.store.put(key, payload)
+
+    def stats(self):
+        return self.store.stats()
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_result_cache():
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = ResultCache()
+        return _CACHE
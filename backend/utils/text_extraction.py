@@ -1,6 +1,8 @@
-import fitz  # PyMuPDF
-import pdfplumber
 import os
+import re
+
+from utils.pdf_session import PdfSession, pdf_session, source_path
+from utils.layout_page import LayoutPage, LazyPages
 
 # ======================================================
 # OPTIONAL OCR SUPPORT
@@ -8,18 +10,14 @@ import os
 # OCR requires:
 #   - pytesseract (Python package)
 #   - tesseract-ocr (system binary)
-#   - poppler (for pdf2image)
 #
 # These are NOT available on Railway by default.
 # So we safely detect OCR availability instead of crashing.
+# Pages are rendered with PyMuPDF and OCR'd by a bounded
+# process pool (see utils/ocr_engine.py).
 # ======================================================
 
-try:
-    import pytesseract
-    from pdf2image import convert_from_path
-    OCR_AVAILABLE = True
-except ImportError:
-    OCR_AVAILABLE = False
+from utils.ocr_engine import OCR_AVAILABLE, OCR_DPI, ocr_pdf
 
 
 # ======================================================
@@ -27,59 +25,55 @@ except ImportError:
 # ======================================================
 
 TEXT_LENGTH_THRESHOLD = 300
-OCR_DPI = 300
+
+# "adaptive": PyMuPDF first, pdfplumber only for weak pages
+# "combined": legacy mode, both extractors over every page
+TEXT_EXTRACTION_MODE = os.environ.get("TEXT_EXTRACTION_MODE", "adaptive")
+
+# A PyMuPDF page below either threshold is re-read with pdfplumber
+PAGE_MIN_CHARS = 40
+PAGE_MIN_QUALITY = 0.7
+
+_GOOD_CHAR_RE = re.compile(r"[^\W_]|[\s.,:;!?()/&%@'\"\-–—+$€£•*#|_]")
+_CID_RE = re.compile(r"\(cid:\d+\)")
 
 
 # ======================================================
 # MAIN FUNCTION
 # ======================================================
 
-def extract_text_with_fallback(pdf_path):
+def extract_text_with_fallback(pdf):
     """
     Extract text from PDF using:
-    1) Native text extraction (PyMuPDF + pdfplumber)
+    1) Native text extraction (adaptive PyMuPDF/pdfplumber, see
+       TEXT_EXTRACTION_MODE)
     2) OCR fallback if text is insufficient
 
+    pdf: file path or an open PdfSession. In adaptive mode the per-page
+    report of extract_native_pages is kept in session.results["text_pages"].
+
     Returns:
         full_text (str)
         method ("TEXT" | "OCR" | "MIXED")
     """
 
-    text_chunks = []
+    pdf_path = source_path(pdf)
+    combined_text = ""
+    page_count = 0
 
-    # --------------------------------------------------
-    # 1. PyMuPDF extraction
-    # --------------------------------------------------
     try:
-        doc = fitz.open(pdf_path)
-        for page in doc:
-            page_text = page.get_text()
-            if page_text:
-                text_chunks.append(page_text)
-    except Exception as e:
-        print(f"[ERROR] PyMuPDF failed: {e}")
+        with pdf_session(pdf) as session:
+            page_count = session.page_count
+            if TEXT_EXTRACTION_MODE == "combined":
+                combined_text = _extract_native_combined(session)
+            else:
+                pages = extract_native_pages(session)
+                session.results["text_pages"] = pages
+                combined_text = "\n".join(p["text"] for p in pages if p["text"]).strip()
+                _log_page_methods(pages)
 
-    text_pymupdf = "\n".join(text_chunks).strip()
-
-    # --------------------------------------------------
-    # 2. pdfplumber extraction
-    # --------------------------------------------------
-    text_plumber = []
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_plumber.append(page_text)
     except Exception as e:
-        print(f"[ERROR] pdfplumber failed: {e}")
-
-    text_plumber = "\n".join(text_plumber).strip()
-
-    # --------------------------------------------------
-    # Combine native text
-    # --------------------------------------------------
-    combined_text = "\n".join([text_pymupdf, text_plumber]).strip()
+        print(f"[ERROR] PDF open failed: {e}")
 
     # --------------------------------------------------
     # Decide if OCR is needed
@@ -98,11 +92,7 @@ def extract_text_with_fallback(pdf_path):
 
     ocr_text = []
     try:
-        images = convert_from_path(pdf_path, dpi=OCR_DPI)
-        for img in images:
-            text = pytesseract.image_to_string(img)
-            if text.strip():
-                ocr_text.append(text)
+        ocr_text = ocr_pdf(pdf_path, page_count, dpi=OCR_DPI)
     except Exception as e:
         print(f"[ERROR] OCR failed: {e}")
 
@@ -120,46 +110,166 @@ def extract_text_with_fallback(pdf_path):
 
 
 # ======================================================
-# LAYOUT-AWARE EXTRACTION (NATIVE PDFs ONLY)
+# NATIVE TEXT EXTRACTION
 # ======================================================
 
-def extract_layout_blocks_native(pdf_path):
+def extract_native_pages(pdf):
     """
-    Extract layout-aware text blocks using PyMuPDF.
-    Only valid for native (non-OCR) PDFs.
+    Adaptive per-page native extraction.
+    PyMuPDF is used by default; pdfplumber runs only for pages whose
+    PyMuPDF yield or quality is poor, and the two are merged line by line
+    without duplicates.
 
     Returns:
-        pages: list[list[dict]]
+        list of {"page", "text", "method", "chars", "quality"}
+        method: "PYMUPDF" | "PDFPLUMBER" | "MERGED" | "EMPTY"
     """
-
     pages = []
 
+    with pdf_session(pdf) as session:
+        for i in range(session.page_count):
+            try:
+                text = session.page_text(i).strip()
+            except Exception as e:
+                print(f"[ERROR] PyMuPDF failed on page {i + 1}: {e}")
+                text = ""
+
+            quality = text_quality(text)
+            method = "PYMUPDF" if text else "EMPTY"
+
+            if len(text) < PAGE_MIN_CHARS or quality < PAGE_MIN_QUALITY:
+                try:
+                    plumber_text = session.plumber_page_text(i).strip()
+                except Exception as e:
+                    print(f"[ERROR] pdfplumber failed on page {i + 1}: {e}")
+                    plumber_text = ""
+
+                if plumber_text:
+                    if text and quality >= PAGE_MIN_QUALITY:
+                        text = merge_page_texts(text, plumber_text)
+                        method = "MERGED"
+                    elif text_quality(plumber_text) >= quality or not text:
+                        text = plumber_text
+                        method = "PDFPLUMBER"
+
+            pages.append({
+                "page": i + 1,
+                "text": text,
+                "method": method,
+                "chars": len(text),
+                "quality": round(text_quality(text), 3)
+            })
+
+    return pages
+
+
+def text_quality(text):
+    """
+    Share of characters that look like real text (0..1).
+    Broken font maps show up as (cid:NN) runs or replacement characters.
+    """
+    if not text:
+        return 0.0
+
+    cleaned = _CID_RE.sub("\ufffd", text)
+    good = len(_GOOD_CHAR_RE.findall(cleaned))
+    return good / len(cleaned)
+
+
+def merge_page_texts(primary, secondary):
+    """
+    Append the lines of `secondary` that `primary` does not already have
+    (whitespace/case-insensitive).
+    """
+    def key(line):
+        return re.sub(r"\s+", " ", line).strip().lower()
+
+    merged = primary.splitlines()
+    seen = {key(l) for l in merged if l.strip()}
+
+    for line in secondary.splitlines():
+        k = key(line)
+        if k and k not in seen:
+            seen.add(k)
+            merged.append(line)
+
+    return "\n".join(merged).strip()
+
+
+def _extract_native_combined(session):
+    text_chunks = []
+    text_plumber = []
+
+    # --------------------------------------------------
+    # 1. PyMuPDF extraction
+    # --------------------------------------------------
     try:
-        doc = fitz.open(pdf_path)
+        for i in range(session.page_count):
+            page_text = session.page_text(i)
+            if page_text:
+                text_chunks.append(page_text)
+    except Exception as e:
+        print(f"[ERROR] PyMuPDF failed: {e}")
+
+    # --------------------------------------------------
+    # 2. pdfplumber extraction
+    # --------------------------------------------------
+    try:
+        for i in range(session.plumber_page_count()):
+            page_text = session.plumber_page_text(i)
+            if page_text:
+                text_plumber.append(page_text)
+    except Exception as e:
+        print(f"[ERROR] pdfplumber failed: {e}")
 
-        for page in doc:
-            page_blocks = []
-            blocks = page.get_text("dict")["blocks"]
+    text_pymupdf = "\n".join(text_chunks).strip()
+    text_plumber = "\n".join(text_plumber).strip()
+
+    return "\n".join([text_pymupdf, text_plumber]).strip()
 
-            for block in blocks:
-                if block["type"] != 0:  # skip images
-                    continue
 
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        text = span["text"].strip()
-                        if not text:
-                            continue
+def _log_page_methods(pages):
+    counts = {}
+    for p in pages:
+        counts[p["method"]] = counts.get(p["method"], 0) + 1
+    summary = ", ".join(f"{m}x{n}" for m, n in counts.items())
+    print(f"[INFO] Native text pages: {summary or 'none'}")
 
-                        page_blocks.append({
-                            "text": text,
-                            "size": span["size"],
-                            "bbox": span["bbox"]  # (x0, y0, x1, y1)
-                        })
 
-            pages.append(page_blocks)
+# ======================================================
+# LAYOUT-AWARE EXTRACTION (NATIVE PDFs ONLY)
+# ======================================================
+
+def extract_layout_blocks_native(pdf):
+    """
+    Extract layout-aware text spans using PyMuPDF.
+    Only valid for native (non-OCR) PDFs.
+
+    pdf: file path or an open PdfSession
+
+    Returns:
+        pages: sequence of LayoutPage (utils/layout_page.py)
+
+    With an open PdfSession the pages are a LazyPages sequence: a page's
+    spans are extracted the first time Layer 2 asks for it. A path opens
+    a temporary session, so every page is extracted before it closes.
+    """
+
+    try:
+        if isinstance(pdf, PdfSession):
+            return LazyPages(pdf.page_count, lambda i: _layout_page(pdf, i))
+
+        with pdf_session(pdf) as session:
+            return [_layout_page(session, i) for i in range(session.page_count)]
 
     except Exception as e:
         print(f"[ERROR] Layout extraction failed: {e}")
+        return []
 
-    return pages
+
+def _layout_page(session, page_number):
+    try:
+        return session.layout_page(page_number)
+    except Exception as e:
+        print(f"[ERROR] Layout extraction failed on page {page_number + 1}: {e}")
+        return LayoutPage.from_blocks([], page_number)
@@ -0,0 +1,358 @@
+import os
+import time
+import signal
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# Seconds one item may run before its worker is killed (0 = no limit)
+WORKER_TASK_TIMEOUT = float(os.environ.get("WORKER_TASK_TIMEOUT", 600))
+
+# Items a worker handles before it is replaced by a fresh process, so
+# PyMuPDF / torch memory growth is given back to the OS (0 = never)
+WORKER_MAX_TASKS = int(os.environ.get("WORKER_MAX_TASKS", 50))
+
+# multiprocessing start method ("fork", "spawn", ...; empty = platform default)
+WORKER_START_METHOD = os.environ.get("WORKER_START_METHOD") or None
+
+
+class TaskTimeout(Exception):
+    pass
+
+
+class WorkerCrashed(Exception):
+    pass
+
+
+# ======================================================
+# WORKER PROCESS
+# ======================================================
+
+def _worker_main(conn, fn, initializer, max_tasks):
+    """
+    Child loop: run initializer once, report ready, then handle
+    (task_id, item) messages until told to stop or max_tasks is reached.
+    Ctrl-C is left to the parent, which stops the pool.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    try:
+        if initializer is not None:
+            initializer()
+    except Exception as e:
+        conn.send(("init_error", f"{type(e).__name__}: {e}"))
+        conn.close()
+        return
+
+    conn.send(("ready", None))
+
+    done = 0
+    while not max_tasks or done < max_tasks:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        if msg is None:
+            break
+
+        task_id, item = msg
+        try:
+            conn.send(("ok", (task_id, fn(item))))
+        except Exception as e:
+            conn.send(("error", (task_id, f"{type(e).__name__}: {e}")))
+        done += 1
+
+    conn.close()
+
+
+class _Worker:
+    """
+    Parent-side handle of one worker process.
+    """
+
+    def __init__(self, ctx, fn, initializer, max_tasks):
+        self.conn, child_conn = ctx.Pipe()
+        # Daemonic: dies with the parent and runs OCR in-process
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, fn, initializer, max_tasks),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+        self.max_tasks = max_tasks
+        self.ready = False
+        self.closed = False     # pipe hit EOF: the process is gone
+        self.task = None        # (task_id, item) in progress
+        self.started_at = None
+        self.done = 0
+
+    @property
+    def idle(self):
+        return self.ready and self.task is None
+
+    @property
+    def retiring(self):
+        return bool(self.max_tasks) and self.done >= self.max_tasks
+
+    def assign(self, task_id, item):
+        self.task = (task_id, item)
+        self.started_at = time.monotonic()
+        self.conn.send((task_id, item))
+
+    def finish(self):
+        self.task = None
+        self.started_at = None
+        self.done += 1
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+# ======================================================
+# POOL
+# ======================================================
+
+class WorkerPool:
+    """
+    Fixed-size pool of worker processes running fn(item).
+
+    Unlike ProcessPoolExecutor each worker is a separately owned process,
+    which gives the batch runner what it needs:
+        - initializer() runs once per worker (warm models), before the
+          worker takes its first item
+        - an item running longer than `timeout` seconds has its worker
+          killed and comes back as TaskTimeout
+        - a worker is replaced after `max_tasks` items, or when it dies
+          (WorkerCrashed for the item it held)
+
+    map() yields (item, ok, result_or_exception) in input order.
+    submit() / poll() feed items in as they arrive and hand back each one
+    as soon as it finishes (long-running callers such as watch_folder.py).
+    keep_warm: start all workers up front and replace retired ones right
+    away instead of when the next item needs them.
+    """
+
+    def __init__(self, fn, workers, initializer=None, timeout=WORKER_TASK_TIMEOUT,
+                 max_tasks=WORKER_MAX_TASKS, start_method=WORKER_START_METHOD,
+                 keep_warm=False):
+        self.fn = fn
+        self.size = max(1, int(workers))
+        self.initializer = initializer
+        self.timeout = timeout or None
+        self.max_tasks = max_tasks or None
+        self.keep_warm = keep_warm
+        self.ctx = multiprocessing.get_context(start_method)
+
+        self._workers = []
+        self._queue = deque()   # task ids not yet assigned
+        self._items = {}        # task id -> item, until its result is returned
+        self._next_id = 0
+        self.stats = {"started": 0, "recycled": 0, "timeouts": 0, "crashed": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        for w in self._workers:
+            w.stop(kill=w.task is not None)
+        self._workers = []
+
+    def _spawn(self):
+        w = _Worker(self.ctx, self.fn, self.initializer, self.max_tasks)
+        self._workers.append(w)
+        self.stats["started"] += 1
+        return w
+
+    def _retire(self, w, kill=False):
+        self._workers.remove(w)
+        w.stop(kill=kill)
+
+    # --------------------------------------------------
+    # Submit / poll
+    # --------------------------------------------------
+    def submit(self, item):
+        task_id = self._next_id
+        self._next_id += 1
+        self._items[task_id] = item
+        self._queue.append(task_id)
+        return task_id
+
+    @property
+    def pending(self):
+        """
+        Items submitted whose result has not been returned yet.
+        """
+        return len(self._items)
+
+    def poll(self, timeout=None):
+        """
+        Hand queued items to idle workers, wait up to `timeout` seconds
+        (None = until something happens) and return the items that
+        finished as [(task_id, item, ok, result_or_exception)].
+        """
+        self._fill()
+
+        if not self._workers:
+            if timeout:
+                time.sleep(timeout)
+            return []
+
+        for w in self._workers:
+            if w.idle and self._queue:
+                task_id = self._queue.popleft()
+                w.assign(task_id, self._items[task_id])
+
+        results = {}
+        self._collect(results, timeout)
+        return [
+            (task_id, self._items.pop(task_id), ok, value)
+            for task_id, (ok, value) in results.items()
+        ]
+
+    def _fill(self):
+        in_flight = sum(1 for w in self._workers if w.task is not None)
+        want = self.size if self.keep_warm else min(self.size, len(self._queue) + in_flight)
+        while len(self._workers) < want:
+            self._spawn()
+
+    # --------------------------------------------------
+    # Ordered map
+    # --------------------------------------------------
+    def map(self, items):
+        ids = [self.submit(item) for item in items]
+        results = {}
+        next_yield = 0
+
+        try:
+            while next_yield < len(ids):
+                for task_id, item, ok, value in self.poll():
+                    results[task_id] = (item, ok, value)
+
+                while next_yield < len(ids) and ids[next_yield] in results:
+                    yield results.pop(ids[next_yield])
+                    next_yield += 1
+        finally:
+            self.close()
+
+    def _collect(self, results, timeout=None):
+        """
+        Wait for the next message (or the nearest deadline / timeout) and
+        record finished / timed-out / crashed items in results.
+        """
+        now = time.monotonic()
+        wait_for = timeout
+        if self.timeout:
+            deadlines = [w.started_at + self.timeout for w in self._workers if w.task is not None]
+            if deadlines:
+                remaining = max(0.0, min(deadlines) - now)
+                wait_for = remaining if wait_for is None else min(wait_for, remaining)
+
+        by_conn = {w.conn: w for w in self._workers}
+        sentinels = {w.process.sentinel: w for w in self._workers}
+        ready = wait(list(by_conn) + list(sentinels), timeout=wait_for)
+
+        for obj in ready:
+            w = by_conn.get(obj)
+            if w is None or w not in self._workers:
+                continue
+            try:
+                kind, payload = w.conn.recv()
+            except (EOFError, OSError):
+                w.closed = True   # handled below as a dead worker
+                continue
+
+            if kind == "ready":
+                w.ready = True
+            elif kind == "init_error":
+                raise RuntimeError(f"Worker initialisation failed: {payload}")
+            else:
+                task_id, value = payload
+                if kind == "ok":
+                    results[task_id] = (True, value)
+                else:
+                    results[task_id] = (False, RuntimeError(value))
+                w.finish()
+                if w.retiring:
+                    self.stats["recycled"] += 1
+                    self._retire(w)
+
+        now = time.monotonic()
+        for w in list(self._workers):
+            if w.task is not None and self.timeout and now - w.started_at >= self.timeout:
+                task_id, item = w.task
+                print(f"[Pool] Task {task_id} timed out after {self.timeout:.0f}s; replacing worker")
+                results[task_id] = (False, TaskTimeout(f"Timed out after {self.timeout:.0f}s"))
+                self.stats["timeouts"] += 1
+                self._retire(w, kill=True)
+            elif w.closed or (not w.process.is_alive() and not w.conn.poll()):
+                if w.task is not None:
+                    task_id, _ = w.task
+                    code = w.process.exitcode
+                    print(f"[Pool] Worker exited (code {code}) during task {task_id}; replacing worker")
+                    results[task_id] = (False, WorkerCrashed(f"Worker exited with code {code}"))
+                    self.stats["crashed"] += 1
+                elif not w.ready:
+                    raise RuntimeError("Worker exited during initialisation")
+                self._retire(w)
+
+
+# ======================================================
+# PROGRESS
+# ======================================================
+
+class Progress:
+    """
+    One-line progress / throughput readout for long runs.
+    """
+
+    def __init__(self, total, label="Batch"):
+        self.total = total
+        self.label = label
+        self.done = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+
+    def update(self, ok=True, name=""):
+        self.done += 1
+        if not ok:
+            self.failed += 1
+
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else 0.0
+        print(
+            f"[{self.label}] {self.done}/{self.total} "
+            f"({self.failed} failed) {rate:.2f} docs/s, ETA {eta:.0f}s"
+            + (f" - {name}" if name else "")
+        )
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            "done": self.done,
+            "failed": self.failed,
+            "seconds": round(elapsed, 2),
+            "docs_per_sec": round(self.done / elapsed, 3) if elapsed > 0 else 0.0,
+        }
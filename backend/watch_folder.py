@@ -0,0 +1,185 @@
+import os
+import time
+import signal
+
+from run_pipeline import (
+    BROCHURE_FOLDER,
+    BATCH_CHECKPOINT,
+    OUTPUT_EXCEL,
+    process_batch_item,
+    error_payload,
+    result_fingerprint,
+    warm_models,
+    write_batch_excel,
+)
+from utils.batch_checkpoint import BatchCheckpoint
+from utils.batch_manifest import BatchManifest
+from utils.folder_watcher import FolderWatcher, is_brochure
+from utils.result_cache import RESULT_CACHE_ENABLED
+from utils.worker_pool import WorkerPool
+
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+WATCH_WORKERS = int(os.environ.get("WATCH_WORKERS", 2))
+
+# Main loop tick: how often worker results and folder events are checked
+WATCH_TICK_SECONDS = float(os.environ.get("WATCH_TICK_SECONDS", 0.25))
+
+# Rewrite the workbook at most this often while results keep arriving
+WATCH_EXCEL_SECONDS = float(os.environ.get("WATCH_EXCEL_SECONDS", 30))
+
+
+# ======================================================
+# INGESTION DAEMON
+# ======================================================
+
+class IngestDaemon:
+    """
+    Long-running batch mode: brochures that settle in `folder` go through
+    a warm WorkerPool (process_single_pdf per file) and each result is
+    appended to the batch checkpoint as soon as it finishes, with its
+    manifest entry, exactly as run_pipeline.py records it. Unchanged
+    files (same content and result fingerprint) are not reprocessed,
+    including across restarts. The workbook is rewritten from the
+    checkpoint at most every WATCH_EXCEL_SECONDS.
+    """
+
+    def __init__(self, folder=BROCHURE_FOLDER, workers=WATCH_WORKERS,
+                 checkpoint_path=BATCH_CHECKPOINT, excel_path=OUTPUT_EXCEL):
+        self.folder = folder
+        self.excel_path = excel_path
+        self.checkpoint = BatchCheckpoint(checkpoint_path)
+        self.manifest = BatchManifest.from_checkpoint(self.checkpoint)
+        self.watcher = FolderWatcher(folder)
+        self.pool = WorkerPool(process_batch_item, workers, initializer=warm_models, keep_warm=True)
+
+        self.in_progress = {}    # task id -> (file, source, queued_at)
+        self.busy_files = set()
+        self.deferred = set()
+        self.dirty = False
+        self.last_excel = 0.0
+        self.stopping = False
+        self.stats = {"processed": 0, "failed": 0, "skipped": 0}
+
+    def stop(self, *_):
+        self.stopping = True
+
+    def run(self):
+        os.makedirs(self.folder, exist_ok=True)
+        print(
+            f"[Watch] Watching {self.folder} ({self.watcher.mode}) "
+            f"with {self.pool.size} workers → {self.checkpoint.path}"
+        )
+
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        if self.manifest.records > 2 * max(1, len(self.manifest.entries)):
+            before, after = self.checkpoint.compact()
+            print(f"[Watch] Compacted checkpoint: {before} → {after} records")
+
+        with self.checkpoint.open():
+            try:
+                self.watcher.scan()
+                while not self.stopping:
+                    self.tick()
+            finally:
+                self.pool.close()
+                self.watcher.close()
+
+        if self.in_progress:
+            print(f"[Watch] Stopped with {len(self.in_progress)} brochures in flight (picked up on restart)")
+        self.write_excel()
+        print(f"[Watch] Stopped: {self.stats}")
+
+    def tick(self):
+        self.watcher.poll()
+
+        fingerprint = result_fingerprint()
+        for file, path in self.watcher.ready():
+            if file in self.busy_files:
+                # Changed again while processing: look at it once the
+                # current run is done
+                self.deferred.add(file)
+                continue
+            self.enqueue(file, path, fingerprint)
+
+        for task_id, (path, _), ok, result in self.pool.poll(timeout=WATCH_TICK_SECONDS):
+            self.finish(task_id, path, ok, result)
+
+        now = time.monotonic()
+        if self.dirty and now - self.last_excel >= WATCH_EXCEL_SECONDS:
+            self.write_excel()
+
+    def enqueue(self, file, path, fingerprint):
+        try:
+            todo, _ = self.manifest.plan([path], fingerprint)
+        except OSError as e:
+            print(f"[Watch] Cannot read {file}: {e}")
+            self.watcher.forget(file)
+            return
+
+        if not todo:
+            self.stats["skipped"] += 1
+            return
+
+        _, source, reason = todo[0]
+        task_id = self.pool.submit((path, RESULT_CACHE_ENABLED))
+        self.in_progress[task_id] = (file, source, time.monotonic())
+        self.busy_files.add(file)
+        print(f"[Watch] Queued {file} ({reason}); {self.pool.pending} pending")
+
+    def finish(self, task_id, path, ok, result):
+        file, source, queued_at = self.in_progress.pop(task_id)
+        self.busy_files.discard(file)
+        if file in self.deferred:
+            self.deferred.discard(file)
+            self.watcher.touch(file, closed=True)
+
+        payload = result if ok else error_payload(path, result)
+        status = payload.get("status")
+
+        self.checkpoint.add(file, payload, source)
+        self.manifest.record(file, source, status)
+        self.dirty = True
+
+        self.stats["processed"] += 1
+        if status == "ERROR":
+            self.stats["failed"] += 1
+        latency = time.monotonic() - queued_at
+        print(f"[Watch] {file} → {status} in {latency:.1f}s")
+
+    def write_excel(self):
+        """
+        Rewrite the workbook if results arrived since the last write. A
+        failure is logged and retried next interval; the checkpoint
+        already holds every result, so the daemon keeps running.
+        """
+        self.last_excel = time.monotonic()
+        if not self.dirty:
+            return
+
+        try:
+            current = {e.name for e in os.scandir(self.folder) if is_brochure(e.name)}
+            count = write_batch_excel(self.checkpoint, self.excel_path, files=current)
+        except Exception as e:
+            print(f"[Watch] Workbook update failed: {e}")
+            return
+
+        self.dirty = False
+        print(f"[Watch] Wrote {count} brochures → {self.excel_path}")
+
+
+# ENTRY POINT
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Watch brochures/ and process PDFs as they arrive")
+    parser.add_argument("--folder", default=BROCHURE_FOLDER)
+    parser.add_argument("--workers", type=int, default=WATCH_WORKERS)
+    args = parser.parse_args()
+
+    IngestDaemon(folder=args.folder, workers=args.workers).run()
@@ -3,6 +3,26 @@ import "./App.css";
 
 const API_BASE = import.meta.env.VITE_API_URL;
 
+// Job Polling Helper
+const POLL_INTERVAL_MS = 1000;
+
+async function waitForJob(jobId) {
+  for (;;) {
+    const res = await fetch(`${API_BASE}/jobs/${jobId}`);
+
+    if (!res.ok) {
+      const text = await res.text();
+      throw new Error(text);
+    }
+
+    const job = await res.json();
+    if (job.status === "DONE") return job.result;
+    if (job.status === "FAILED") throw new Error(job.error);
+
+    await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+  }
+}
+
 // Upload Helper
 async function uploadFile(file, setResult, setLoading) {
   setLoading(true);
@@ -21,7 +41,8 @@ async function uploadFile(file, setResult, setLoading) {
       throw new Error(text);
     }
 
-    const data = await res.json();
+    const { job_id } = await res.json();
+    const data = await waitForJob(job_id);
     setResult(data);
   } catch (err) {
     alert("Upload failed");